@@ -1,21 +1,60 @@
-import pandas as pd
+import os
+
 import streamlit as st
-from utils.data_loader import load_cafe_data
+from utils.data_source import DatasetHandle
 from utils.revenue import display_revenue_section
 from utils.feedback import display_feedback_section
+from utils.topics import display_topics_section
 from utils.analysis import display_ai_section
+from utils.explorer import display_transaction_explorer
+from utils.snapshot import preload_snapshot
+from utils.text_index import get_text_index
+from utils.comment_scores import get_comment_scores
+from utils.instrumentation import rerun_trace, span
+from utils.debug_panel import debug_enabled, display_debug_panel
+
+# data to show: a CSV, or a directory or glob of per-store exports (see utils.data_source)
+SOURCE = os.environ.get("CAFE_DATA", 'data/CafeData.csv')
+
+@st.cache_resource
+def get_dataset(source):
+    """One handle on the dataset per process, shared by every session (see DatasetHandle)."""
+    return DatasetHandle(source)
+
+# Every rerun is timed stage by stage (see utils.instrumentation)
+with rerun_trace() as trace:
+    # Page chrome goes out before any data is loaded
+    st.set_page_config(layout="wide")
 
-# data to show
-filepath = 'data/CafeData.csv'
-data = load_cafe_data(filepath)
+    st.title("☕ Cafe Sales Dashboard")
 
-st.set_page_config(layout="wide")
+    with span("load_data") as s:
+        data = get_dataset(SOURCE).get()
+        s["rows"] = len(data)
+    # Views precomputed by `python -m utils.snapshot`, if there is a current snapshot
+    with span("preload_snapshot"):
+        preload_snapshot(data, SOURCE)
+    # Comment search index, built once per data version and extended when rows are appended
+    with span("text_index"):
+        get_text_index(data)
+    # Sentiment and topics of every comment, scored once per FeedbackID and cached on disk
+    with span("comment_scores"):
+        scores = get_comment_scores(data, SOURCE)
 
-st.title("☕ Cafe Sales Dashboard")
+    with span("revenue_section"):
+        display_revenue_section(data)
+    with span("feedback_section"):
+        display_feedback_section(data)
+    with span("topics_section"):
+        display_topics_section(data, scores)
+    with st.sidebar:
+        with span("ai_section"):
+            display_ai_section(data)
 
-display_revenue_section(data)
-display_feedback_section(data)
-with st.sidebar:
-    display_ai_section(data)
+    with span("transactions_section"):
+        display_transaction_explorer(data)
 
-st.write(data)
\ No newline at end of file
+    # Add ?debug=<CAFE_DEBUG_TOKEN> to the URL for the timings of this rerun and of the whole process
+    if debug_enabled():
+        with st.sidebar:
+            display_debug_panel(trace)
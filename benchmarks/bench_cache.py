@@ -0,0 +1,66 @@
+"""
+Report cold, warm and append load times for the on-disk cache of the cleaned dataset.
+
+Usage:
+    python benchmarks/bench_cache.py [--copies 20]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_loader import SOURCE, build_input  # noqa: E402
+from utils.data_cache import load_cached_cafe_data  # noqa: E402
+from utils.data_loader import load_cafe_data  # noqa: E402
+from utils.locations import encode_locations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20, help="how many times to repeat the sample data")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "CafeData.csv"
+        build_input(args.copies, path)
+
+        start = time.perf_counter()
+        uncached = encode_locations(load_cafe_data(path))
+        parse_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_cached_cafe_data(path)
+        cold_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = load_cached_cafe_data(path)
+        warm_secs = time.perf_counter() - start
+
+        # Append one more copy of the sample rows and pick them up incrementally
+        lines = SOURCE.read_text(encoding="utf-8").splitlines(keepends=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(lines[1:]))
+        start = time.perf_counter()
+        appended = load_cached_cafe_data(path)
+        append_secs = time.perf_counter() - start
+        full = encode_locations(load_cafe_data(path))
+
+    pd.testing.assert_frame_equal(uncached, warm)
+    pd.testing.assert_frame_equal(full, appended)
+
+    print(f"rows:            {len(warm):,}")
+    print(f"no cache:        {parse_secs:8.3f}s")
+    print(f"cold (+ write):  {cold_secs:8.3f}s")
+    print(f"warm:            {warm_secs:8.3f}s")
+    print(f"warm speedup:    {parse_secs / warm_secs:8.1f}x")
+    print(f"append {len(appended) - len(warm):,} rows: {append_secs:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
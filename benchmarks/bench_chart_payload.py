@@ -0,0 +1,72 @@
+"""
+Compare the daily revenue chart data built point by point in Python (full
+series) with the vectorized, downsampled version: number of points, JSON
+payload size, build time and serialization time.
+
+Usage:
+    python benchmarks/bench_chart_payload.py [--max-points 800] [--method lttb]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.downsample import METHODS, chart_points  # noqa: E402
+
+# Two years daily, two years hourly, ten years hourly
+SERIES = [("2y daily", "D", 730), ("2y hourly", "h", 17_520), ("10y hourly", "h", 87_600)]
+
+
+def legacy_points(series, fmt):
+    """Full series converted element by element, as the chart used to be built."""
+    x_data = [str(d) for d in series.index.strftime(fmt)]
+    y_data = [float(x) for x in series]
+    return x_data, y_data
+
+
+def synthetic_series(freq, n, seed=0):
+    rng = np.random.default_rng(seed)
+    days = np.arange(n)
+    values = 5000 + 1500 * np.sin(days / 7 * 2 * np.pi) + rng.gamma(2.0, 400.0, n)
+    return pd.Series(values, index=pd.date_range("2023-01-01", periods=n, freq=freq, name="Date"))
+
+
+def measure(build):
+    started = time.perf_counter()
+    x_data, y_data = build()
+    built = time.perf_counter()
+    payload = json.dumps({"x": x_data, "y": y_data})
+    serialized = time.perf_counter()
+    return len(x_data), len(payload), built - started, serialized - built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-points", type=int, default=800)
+    parser.add_argument("--method", choices=METHODS, default="lttb")
+    args = parser.parse_args()
+
+    for label, freq, n in SERIES:
+        series = synthetic_series(freq, n)
+        fmt, unit = ("%Y-%m-%d", "D") if freq == "D" else ("%Y-%m-%dT%H:%M", "m")
+        runs = {
+            "legacy": lambda: legacy_points(series, fmt),
+            args.method: lambda: chart_points(series, args.max_points, args.method, unit),
+        }
+        for name, build in runs.items():
+            points, size, build_time, dump_time = measure(build)
+            print(
+                f"{label:<11} {name:<7} points={points:<7} payload={size / 1024:8.1f} KiB "
+                f"build={build_time * 1000:7.2f} ms serialize={dump_time * 1000:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Time the offline comment scoring of utils.comment_scores on a synthetic
+CafeData file: a cold run (empty score cache) in one process and across a
+process pool, a warm run (every FeedbackID cached) and a run after rows were
+appended (only the new rows scored). Throughput is reported in distinct
+comments per second per core.
+
+Synthetic comments are drawn from the real ones, so most of them repeat;
+--distinct makes every comment unique (a row number is appended to each),
+so every row has to be scored.
+
+Usage:
+    python benchmarks/bench_comment_scores.py [--rows 1000000] [--workers 4] [--append 0.01] [--distinct]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_cafedata import generate_cafedata  # noqa: E402
+from utils.comment_scores import score_dataset  # noqa: E402
+from utils.data_cache import load_cached_cafe_data  # noqa: E402
+
+
+def report(name, stats, seconds):
+    rate = f"{stats['per_core']:10,.0f} comments/s per core" if stats["per_core"] else " " * 30
+    print(
+        f"  {name:<22} {seconds:7.2f}s   {stats['cached']:>10,} cached   {stats['scored']:>10,} scored "
+        f"({stats['distinct']:,} distinct) on {stats['workers']} process(es)   {rate}"
+    )
+
+
+def timed_score(df, path, workers):
+    started = time.perf_counter()
+    scores = score_dataset(df, path, workers)
+    return scores.stats, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes for the parallel run")
+    parser.add_argument("--append", type=float, default=0.01, help="share of rows appended for the incremental run")
+    parser.add_argument("--distinct", action="store_true", help="make every comment unique")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=Path(tempfile.gettempdir()) / "cafedata-bench",
+                        help="where generated files are kept and reused")
+    args = parser.parse_args()
+
+    path = Path(args.data_dir) / f"cafedata_{args.rows}_{args.seed}.csv"
+    if not path.exists():
+        print(f"generating {args.rows:,} rows...", flush=True)
+        generate_cafedata(path, args.rows, args.seed)
+    df = load_cached_cafe_data(path)
+    if args.distinct:
+        df = df.copy()
+        df['Comment'] = df['Comment'] + " #" + np.arange(len(df)).astype(str)
+    print(f"{len(df):,} rows, {df['Comment'].nunique():,} distinct comments, {os.cpu_count()} CPUs")
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache = Path(folder) / "scores.feather"
+        for name, workers in [("cold, 1 process", 1), (f"cold, {args.workers} workers", args.workers)]:
+            cache.unlink(missing_ok=True)
+            report(name, *timed_score(df, cache, workers))
+        report("warm", *timed_score(df, cache, args.workers))
+
+        split = len(df) - int(len(df) * args.append)
+        cache.unlink(missing_ok=True)
+        score_dataset(df.iloc[:split], cache, args.workers)
+        report(f"{len(df) - split:,} rows appended", *timed_score(df, cache, args.workers))
+
+
+if __name__ == "__main__":
+    main()
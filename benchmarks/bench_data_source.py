@@ -0,0 +1,71 @@
+"""
+Time loading a directory of per-store CafeData exports through
+utils.data_source, one file after another against a process pool, with cold
+per-file caches (every CSV cleaned) and warm ones.
+
+Consecutive stores share a share of their feedback ids (--overlap), as when
+a row is exported twice, so the FeedbackID deduplication has work to do.
+
+Usage:
+    python benchmarks/bench_data_source.py [--stores 8] [--rows 200000] [--overlap 0.05] [--workers 4]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_cafedata import FIRST_ID, generate_cafedata  # noqa: E402
+from utils.data_source import load_data_source, source_cache_dir  # noqa: E402
+
+
+def store_files(data_dir, stores, rows, overlap):
+    """Write (or reuse) one export per store; ids of store i + 1 start before those of store i end."""
+    folder = Path(data_dir) / f"stores_{stores}x{rows}_{overlap:g}"
+    stride = int(rows * (1 - overlap))
+    for store in range(stores):
+        path = folder / f"store_{store:02d}.csv"
+        if not path.exists():
+            print(f"generating {path.name}...", flush=True)
+            generate_cafedata(path, rows, seed=store, first_id=FIRST_ID + store * stride)
+    return folder
+
+
+def timed_load(folder, workers):
+    started = time.perf_counter()
+    df = load_data_source(folder, workers=workers)
+    return df, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stores", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200_000, help="rows per store file")
+    parser.add_argument("--overlap", type=float, default=0.05, help="share of each file re-exported in the next one")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes for the parallel load")
+    parser.add_argument("--data-dir", default=Path(tempfile.gettempdir()) / "cafedata-bench",
+                        help="where generated files are kept and reused")
+    args = parser.parse_args()
+
+    folder = store_files(args.data_dir, args.stores, args.rows, args.overlap)
+    total_rows = args.stores * args.rows
+    print(f"{args.stores} files, {total_rows:,} rows, {os.cpu_count()} CPUs")
+
+    for name, workers in [("serial", 1), (f"{args.workers} workers", args.workers)]:
+        shutil.rmtree(source_cache_dir(folder), ignore_errors=True)
+        df, cold = timed_load(folder, workers)
+        _, warm = timed_load(folder, workers)
+        print(
+            f"  {name:<12} cold {cold:7.2f}s ({total_rows / cold:10,.0f} rows/s)   "
+            f"warm {warm:6.2f}s   {len(df):,} rows after dropping {total_rows - len(df):,} "
+            f"duplicate or unusable rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
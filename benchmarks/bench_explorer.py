@@ -0,0 +1,94 @@
+"""
+Measure the transaction explorer on synthetic CafeData files of increasing
+size: the bytes st.write(data) used to send against one page, and the
+latency of typical page queries (filters, sorts, a deep page).
+
+Indexes are built once per dataset (timed separately); every query then runs
+without the cached counts and sorted selections, as on a first visit.
+
+Usage:
+    python benchmarks/bench_explorer.py [--sizes 100000 1000000] [--page-size 50]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_cafedata import generate_cafedata  # noqa: E402
+from utils.column_index import get_column_index  # noqa: E402
+from utils.data_cache import load_cached_cafe_data  # noqa: E402
+from utils.location_index import get_location_index  # noqa: E402
+from utils.locations import REGION_LOCATIONS  # noqa: E402
+from utils.transactions import SORT_COLUMNS, transactions_page  # noqa: E402
+from utils.view_cache import ViewCache  # noqa: E402
+
+
+def queries(df):
+    """(name, transactions_page keyword arguments) for a range of selections."""
+    region = max(REGION_LOCATIONS, key=lambda r: len(REGION_LOCATIONS[r]))
+    last = df['TransactionDateTime'].max().normalize()
+    return [
+        ("newest, no filter", {}),
+        ("page 1000, no filter", {"page": 999}),
+        ("region by value", {"region": region, "sort_by": 'TransactionValue'}),
+        ("location, rating 1-2", {"region": region, "location": REGION_LOCATIONS[region][0], "ratings": (1, 2)}),
+        ("last month, > $30, by rating", {
+            "start": last - pd.DateOffset(months=1), "end": last, "values": (30.0, None), "sort_by": 'Rating',
+        }),
+        ("rating 5, oldest first", {"ratings": (5, 5), "ascending": True}),
+    ]
+
+
+def median_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=Path(tempfile.gettempdir()) / "cafedata-bench",
+                        help="where generated files are kept and reused")
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        path = Path(args.data_dir) / f"cafedata_{rows}_{args.seed}.csv"
+        if not path.exists():
+            print(f"generating {rows:,} rows...", flush=True)
+            generate_cafedata(path, rows, args.seed)
+        df = load_cached_cafe_data(path)
+
+        started = time.perf_counter()
+        get_location_index(df)
+        for column in SORT_COLUMNS:
+            get_column_index(df, column)
+        build = time.perf_counter() - started
+
+        full = pa.Table.from_pandas(df, preserve_index=False).nbytes
+        print(f"{len(df):,} rows: st.write payload {full / 2**20:,.1f} MiB, indexes built in {build:.2f}s")
+        for name, kwargs in queries(df):
+            result, seconds = median_time(
+                lambda: transactions_page(df, page_size=args.page_size, cache=ViewCache(), **kwargs)
+            )
+            payload = pa.Table.from_pandas(result["rows"], preserve_index=False).nbytes
+            print(
+                f"  {name:<30} {seconds * 1000:8.2f} ms   {result['total']:>10,} matches   "
+                f"page {payload / 1024:6.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
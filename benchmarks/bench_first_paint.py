@@ -0,0 +1,126 @@
+"""
+Measure the dashboard's time to first paint with the AI summary generated in
+the script run (blocking) and in a background job (streaming), using a local
+stub in place of the OpenAI client.
+
+Each mode starts from an empty AI cache, so the first session has to wait for
+(or start) the summary. Further sessions are opened straight after: they find
+it cached when blocking, or share the job still in flight, and a single
+upstream call should be counted either way.
+
+Usage:
+    python benchmarks/bench_first_paint.py [--latency 3] [--tokens 50] [--sessions 3]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import openai  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import utils.analysis  # noqa: E402
+from utils.analysis_cache import AnalysisCache  # noqa: E402
+from utils.analysis_jobs import ANALYSIS_JOBS  # noqa: E402
+
+# app.py with the AI section mode switchable
+APP = """
+import streamlit as st
+from utils.data_cache import load_cached_cafe_data
+from utils.revenue import display_revenue_section
+from utils.feedback import display_feedback_section
+from utils.analysis import display_ai_section
+
+data = load_cached_cafe_data("{data}")
+st.set_page_config(layout="wide")
+st.title("Cafe Sales Dashboard")
+display_revenue_section(data)
+display_feedback_section(data)
+with st.sidebar:
+    display_ai_section(data, background={background})
+st.write(data)
+"""
+
+
+class StubOpenAI:
+    """Stands in for OpenAI(): waits latency seconds in total, streaming tokens when asked to."""
+
+    latency = 3.0
+    tokens = 50
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, api_key=None):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, max_tokens, stream=False):
+        with StubOpenAI._lock:
+            StubOpenAI.calls += 1
+        words = [f"word{i} " for i in range(self.tokens)]
+        if not stream:
+            time.sleep(self.latency)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="".join(words)))])
+        return self._stream(words)
+
+    def _stream(self, words):
+        for word in words:
+            time.sleep(self.latency / len(words))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+
+
+def page_load(background):
+    """Seconds until the script run (and so the first paint) completes."""
+    at = AppTest.from_string(APP.format(data=ROOT / "data" / "CafeData.csv", background=background), default_timeout=120)
+    at.secrets["OPENAI_API_KEY"] = "stub"
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def wait_for_jobs():
+    while len(ANALYSIS_JOBS):
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=3.0, help="simulated seconds per completion")
+    parser.add_argument("--tokens", type=int, default=50, help="streamed chunks per completion")
+    parser.add_argument("--sessions", type=int, default=3, help="sessions opened while the job runs")
+    args = parser.parse_args()
+
+    StubOpenAI.latency = args.latency
+    StubOpenAI.tokens = args.tokens
+    openai.OpenAI = StubOpenAI
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm the data and view caches so only the AI section differs between modes
+        utils.analysis.get_analysis_cache = lambda: AnalysisCache(Path(tmp) / "warmup.sqlite3")
+        page_load(background=True)
+        wait_for_jobs()
+
+        for background in (False, True):
+            cache = AnalysisCache(Path(tmp) / f"{background}.sqlite3")
+            utils.analysis.get_analysis_cache = lambda: cache
+            StubOpenAI.calls = 0
+            loads = [page_load(background) for _ in range(args.sessions)]
+            mode = "background" if background else "blocking"
+            print(
+                f"{mode:<10} first paint: first session {loads[0]:.3f}s, "
+                f"mean of {args.sessions} sessions {sum(loads) / len(loads):.3f}s, upstream calls {StubOpenAI.calls}"
+            )
+            # Let the shared job finish before the temporary cache goes away
+            wait_for_jobs()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare the chunked, vectorized load_cafe_data against the original
+row-by-row loader and report rows/sec for each.
+
+Usage:
+    python benchmarks/bench_loader.py [--copies 20]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.data_loader import load_cafe_data  # noqa: E402
+
+SOURCE = ROOT / "data" / "CafeData.csv"
+
+
+def legacy_load_cafe_data(filepath):
+    """The original iterrows() based loader, kept here as the reference implementation."""
+    df_raw = pd.read_csv(filepath, header=None, engine="python")
+    cleaned_rows = []
+    for _, row in df_raw.iloc[1:].iterrows():
+        values = row.dropna().tolist()
+        if len(values) == 6:
+            cleaned = values
+        elif len(values) == 5:
+            cleaned = [values[0], values[1], "", values[2], values[3], values[4]]
+        elif len(values) == 7:
+            if pd.to_datetime(values[3], errors='coerce') is pd.NaT:
+                values[3] = None
+            try:
+                transaction_value = float(str(values[4]).replace('$', '').replace(',', ''))
+                if transaction_value > 1000:
+                    values[4] = '0'
+            except (ValueError, IndexError):
+                values[4] = '0'
+            cleaned = [values[0], values[1], values[2], values[3], values[4], values[6]]
+        elif len(values) == 8:
+            cleaned = [values[0], values[1], values[2], values[4], values[5], values[7]]
+        cleaned_rows.append(cleaned)
+
+    cleaned_df = pd.DataFrame(cleaned_rows, columns=[
+        "Location", "Rating", "Comment", "TransactionDateTime", "TransactionValue", "FeedbackID"
+    ])
+    cleaned_df['TransactionDateTime'] = pd.to_datetime(cleaned_df['TransactionDateTime'], dayfirst=True, errors='coerce')
+    cleaned_df['TransactionValue'] = pd.to_numeric(cleaned_df['TransactionValue'].astype(str).str.replace('$', '', regex=False), errors='coerce')
+    cleaned_df['Rating'] = pd.to_numeric(cleaned_df['Rating'], errors='coerce')
+    cleaned_df['FeedbackID'] = pd.to_numeric(cleaned_df['FeedbackID'], errors='coerce')
+    cleaned_df['Location'] = cleaned_df['Location'].str.strip()
+    return cleaned_df
+
+
+def build_input(copies, target):
+    """Write a CSV made of the header plus the real data rows repeated `copies` times."""
+    lines = SOURCE.read_text(encoding="utf-8").splitlines(keepends=True)
+    header, body = lines[0], "".join(lines[1:])
+    if not body.endswith("\n"):
+        body += "\n"
+    with open(target, "w", encoding="utf-8") as f:
+        f.write(header)
+        for _ in range(copies):
+            f.write(body)
+
+
+def timed(loader, path):
+    start = time.perf_counter()
+    df = loader(path)
+    return df, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20, help="how many times to repeat the sample data")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "CafeData.csv"
+        build_input(args.copies, path)
+
+        legacy, legacy_secs = timed(legacy_load_cafe_data, path)
+        current, current_secs = timed(load_cafe_data, path)
+
+    pd.testing.assert_frame_equal(legacy, current)
+
+    rows = len(current)
+    print(f"rows:       {rows:,}")
+    print(f"legacy:     {legacy_secs:8.3f}s  {rows / legacy_secs:12,.0f} rows/sec")
+    print(f"vectorized: {current_secs:8.3f}s  {rows / current_secs:12,.0f} rows/sec")
+    print(f"speedup:    {legacy_secs / current_secs:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
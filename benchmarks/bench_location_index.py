@@ -0,0 +1,76 @@
+"""
+Compare region/location filtering through LocationIndex with the
+isin/equality scans over the Location column, on a synthetic dataset.
+
+Usage:
+    python benchmarks/bench_location_index.py [--rows 10000000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.location_index import LocationIndex  # noqa: E402
+
+LOCATIONS = [
+    "Albany", "Auckland Central", "Botany", "Domain", "Henderson", "Sylvia Park",
+    "Ashburton", "Hornby", "Timaru", "Dunedin", "Oamaru", "Queenstown",
+    "Newtown", "Petone", "Porirua", "Upper Hutt", "Wellington central", "Richmond",
+]
+REGION = ["Dunedin", "Oamaru", "Queenstown"]
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Location": pd.array(rng.choice(LOCATIONS, rows), dtype="str"),
+        "Rating": rng.integers(1, 6, rows),
+        "TransactionValue": rng.gamma(2.0, 6.0, rows).round(2),
+    })
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"rows: {len(df):,}")
+
+    index, build_secs = best_of(lambda: LocationIndex(df["Location"]), repeat=1)
+    print(f"index build:             {build_secs:8.3f}s")
+
+    scan, scan_secs = best_of(lambda: df[df["Location"] == "Timaru"])
+    indexed, index_secs = best_of(lambda: index.select(df, ["Timaru"]))
+    assert scan.index.equals(indexed.index)
+    print(f"location  scan {scan_secs:8.3f}s  index {index_secs:8.3f}s  ({scan_secs / index_secs:6.1f}x)")
+
+    scan, scan_secs = best_of(lambda: df[df["Location"].isin(REGION)])
+    # The first region lookup merges the location slices, later ones reuse it
+    indexed, first_secs = best_of(lambda: index.select(df, REGION), repeat=1)
+    indexed, index_secs = best_of(lambda: index.select(df, REGION))
+    assert scan.index.equals(indexed.index)
+    print(f"region    scan {scan_secs:8.3f}s  index {index_secs:8.3f}s  ({scan_secs / index_secs:6.1f}x, first lookup {first_secs:.3f}s)")
+
+    _, scan_secs = best_of(lambda: (df["Location"] == "Timaru").to_numpy().nonzero()[0])
+    _, index_secs = best_of(lambda: index.rows(["Timaru"]))
+    print(f"row ids   scan {scan_secs:8.3f}s  index {index_secs:8.6f}s")
+
+
+if __name__ == "__main__":
+    main()
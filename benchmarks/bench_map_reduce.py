@@ -0,0 +1,72 @@
+"""
+Run the map-reduce AI summary offline against a local stub client that
+simulates model latency and occasional failures, and report per-stage timings
+for sequential and concurrent map stages.
+
+Usage:
+    python benchmarks/bench_map_reduce.py [--latency 0.5] [--workers 4] [--fail-rate 0.1]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.data_cache import load_cached_cafe_data  # noqa: E402
+from utils.summarize import summarize_map_reduce  # noqa: E402
+
+
+class StubClient:
+    """Stands in for OpenAI(): same chat.completions.create call, no network."""
+
+    def __init__(self, latency, fail_rate, seed=0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, max_tokens):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.fail_rate
+            if fail:
+                self.failures += 1
+        time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("simulated upstream error")
+        words = len(messages[-1]["content"].split())
+        content = f"Summary of {words} words of input."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per request")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="share of requests that fail and are retried")
+    args = parser.parse_args()
+
+    df = load_cached_cafe_data(ROOT / "data" / "CafeData.csv")
+
+    for workers in (1, args.workers):
+        client = StubClient(args.latency, args.fail_rate)
+        _, timings = summarize_map_reduce(
+            df, client, "Summarise.", max_workers=workers, backoff=0.05,
+        )
+        print(
+            f"workers={workers:<3} chunks={timings['chunks']:<3} calls={client.calls:<3} retried={client.failures:<3} "
+            f"split={timings['split']:.3f}s map={timings['map']:.3f}s "
+            f"reduce={timings['reduce']:.3f}s total={timings['total']:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
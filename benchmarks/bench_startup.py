@@ -0,0 +1,91 @@
+"""
+Measure the dashboard's startup cost in fresh interpreters: the import time
+of the heavy dependencies and of the app's own modules, and the time from
+process start to the first complete page and to the next rerun.
+
+The first paint is measured with openai imported on demand (as app.py does)
+and imported up front (as it used to be), and reports which of the optional
+modules were loaded by then. The cleaned data cache is assumed warm; run the
+app or `python -m utils.snapshot` once beforehand.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 3]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = ["pandas", "streamlit", "openai", "utils.metrics", "utils.revenue", "utils.analysis"]
+
+OPTIONAL = ["openai", "streamlit_echarts"]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started, "loaded": [m for m in {optional!r} if m in sys.modules]}}))
+"""
+
+FIRST_PAINT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{preload}
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=300)
+at.run()
+first_paint = time.perf_counter() - started
+loaded = [m for m in {optional!r} if m in sys.modules]
+rerun_started = time.perf_counter()
+at.run()
+print(json.dumps({{
+    "seconds": first_paint,
+    "rerun": time.perf_counter() - rerun_started,
+    "loaded": loaded,
+    "exception": [e.message for e in at.exception],
+}}))
+"""
+
+
+def probe(code):
+    """Run code in a fresh interpreter from the repo root and parse the JSON it prints last."""
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median_probe(code, repeat):
+    runs = [probe(code) for _ in range(repeat)]
+    summary = dict(runs[-1])
+    for field in ("seconds", "rerun"):
+        if field in summary:
+            summary[field] = statistics.median(run[field] for run in runs)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement, the median is shown")
+    args = parser.parse_args()
+
+    print("import time in a fresh interpreter:")
+    for module in MODULES:
+        result = median_probe(IMPORT_PROBE.format(module=module, optional=OPTIONAL), args.repeat)
+        loaded = ", ".join(m for m in result["loaded"] if m != module) or "-"
+        print(f"  {module:<16} {result['seconds'] * 1000:8.0f} ms   also loads: {loaded}")
+
+    print("process start to first page (AppTest):")
+    for name, preload in [("on demand", ""), ("up front", "import openai")]:
+        result = median_probe(FIRST_PAINT_PROBE.format(preload=preload, optional=OPTIONAL), args.repeat)
+        print(
+            f"  openai {name:<10} first paint {result['seconds']:6.2f}s   rerun {result['rerun'] * 1000:6.0f} ms   "
+            f"loaded: {', '.join(result['loaded']) or '-'}"
+            + (f"   exception: {result['exception']}" if result["exception"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Time every stage of the dashboard's data pipeline on synthetic CafeData files
+of increasing size, record peak memory per stage, and write the results as
+JSON so runs can be compared.
+
+Stages: read (CSV tokenizing only), load_clean (load_cafe_data plus the
+location encoding, i.e. a cache rebuild), filter (location index and one
+region), aggregate (revenue engine and rollup), revenue_views and
+feedback_views (every region/location view of the two sections through
+utils.metrics, the latter being the top-K feedback selection).
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 10000 100000 1000000] [--output results.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_cafedata import generate_cafedata  # noqa: E402
+from utils.data_loader import load_cafe_data  # noqa: E402
+from utils.location_index import get_location_index  # noqa: E402
+from utils.locations import REGION_LOCATIONS, encode_locations  # noqa: E402
+from utils.metrics import feedback_summary, get_revenue_engine, get_revenue_rollup, revenue_chart, selections  # noqa: E402
+from utils.data_cache import dataset_version  # noqa: E402
+from utils.view_cache import VIEW_CACHE  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def _rss():
+    """Current resident set size in bytes (peak so far where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class PeakMemory:
+    """Samples the process RSS in a background thread while the block runs."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+
+    def __enter__(self):
+        self.start = self.peak = _rss()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, _rss())
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss())
+
+
+def run_stage(name, fn):
+    VIEW_CACHE.clear()
+    with PeakMemory() as memory:
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+    return result, {
+        "stage": name,
+        "seconds": seconds,
+        "peak_rss_mb": memory.peak / 2**20,
+        "peak_increase_mb": (memory.peak - memory.start) / 2**20,
+    }
+
+
+def read_only(path):
+    """Tokenize the CSV into string columns without any cleaning."""
+    width = pd.read_csv(path, header=None, nrows=1, dtype=str).shape[1]
+    rows = 0
+    for raw in pd.read_csv(path, header=None, names=range(width), skiprows=1, dtype=str, chunksize=100_000):
+        rows += len(raw)
+    return rows
+
+
+def benchmark_size(path, rows):
+    results = []
+
+    _, stats = run_stage("read", lambda: read_only(path))
+    results.append(stats)
+
+    df, stats = run_stage("load_clean", lambda: encode_locations(load_cafe_data(path)))
+    results.append(stats)
+    df.attrs["version"] = dataset_version(df)
+    df.attrs["rows"] = len(df)
+
+    region = max(REGION_LOCATIONS, key=lambda r: len(REGION_LOCATIONS[r]))
+    _, stats = run_stage("filter", lambda: get_location_index(df).select(df, REGION_LOCATIONS[region]))
+    results.append(stats)
+
+    def aggregate():
+        version = dataset_version(df)
+        return get_revenue_engine(df, version), get_revenue_rollup(df, version)
+
+    _, stats = run_stage("aggregate", aggregate)
+    results.append(stats)
+
+    pairs = selections(df)
+    _, stats = run_stage("revenue_views", lambda: [revenue_chart(df, r, l) for r, l in pairs])
+    results.append(stats)
+    _, stats = run_stage("feedback_views", lambda: [feedback_summary(df, r, l) for r, l in pairs])
+    results.append(stats)
+
+    for stats in results:
+        stats.update({"rows": rows, "clean_rows": len(df), "file_mb": path.stat().st_size / 1e6})
+        stats["rows_per_sec"] = rows / stats["seconds"] if stats["seconds"] else None
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    """Print the time ratio of every stage against a previous run (>1 is slower)."""
+    with open(baseline_path) as f:
+        baseline = {(r["rows"], r["stage"]): r for r in json.load(f)["results"]}
+    print(f"\ncompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["rows"], r["stage"]))
+        if old is None:
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"{r['rows']:>11,} {r['stage']:<15} {old['seconds']:9.3f}s -> {r['seconds']:9.3f}s  x{ratio:5.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="rows per synthetic file, up to 50M")
+    parser.add_argument("--data-dir", default=Path(tempfile.gettempdir()) / "cafedata-bench",
+                        help="where generated files are kept and reused")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON results file, defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    results = []
+    for rows in args.sizes:
+        path = data_dir / f"cafedata_{rows}_{args.seed}.csv"
+        if not path.exists():
+            print(f"generating {rows:,} rows...", flush=True)
+            generate_cafedata(path, rows, args.seed)
+        for stats in benchmark_size(path, rows):
+            results.append(stats)
+            print(
+                f"{rows:>11,} {stats['stage']:<15} {stats['seconds']:9.3f}s "
+                f"peak {stats['peak_rss_mb']:8.0f} MB (+{stats['peak_increase_mb']:.0f})",
+                flush=True,
+            )
+
+    env = environment()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{env['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Time keyword search over feedback comments on synthetic CafeData files of
+increasing size: building the inverted index (utils.text_index), extending it
+with appended rows, and ranked queries with filters against a pandas scan of
+the Comment column (str.contains per word).
+
+Synthetic comments are drawn from the real ones, so most of them repeat;
+--distinct makes every comment unique (a row number is appended to each),
+the worst case for building the index.
+
+Usage:
+    python benchmarks/bench_text_index.py [--sizes 100000 1000000] [--append 0.01] [--distinct]
+"""
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_cafedata import generate_cafedata  # noqa: E402
+from utils.comment_search import comment_search  # noqa: E402
+from utils.data_cache import dataset_version, load_cached_cafe_data  # noqa: E402
+from utils.location_index import get_location_index  # noqa: E402
+from utils.locations import REGION_LOCATIONS  # noqa: E402
+from utils.text_index import TextIndex, query_terms  # noqa: E402
+from utils.view_cache import VIEW_CACHE, ViewCache  # noqa: E402
+
+
+def queries():
+    """(name, comment_search keyword arguments) for a range of selections."""
+    region = max(REGION_LOCATIONS, key=lambda r: len(REGION_LOCATIONS[r]))
+    return [
+        ("coffee", {"query": "coffee"}),
+        ("friendly staff", {"query": "friendly staff"}),
+        ("cold coffee, rating 1-2", {"query": "cold coffee", "ratings": (1, 2)}),
+        ("great service, region", {"query": "great service", "region": region}),
+        ("slow, one location", {"query": "slow", "region": region, "location": REGION_LOCATIONS[region][0]}),
+    ]
+
+
+def pandas_search(df, query, region="All", location="All", ratings=None):
+    """Number of matches found by scanning every comment, unranked."""
+    mask = np.ones(len(df), dtype=bool)
+    for term in query_terms(query):
+        mask &= df['Comment'].str.contains(rf"\b{re.escape(term)}\b", case=False, na=False).to_numpy()
+    if location != "All":
+        mask &= (df['Location'] == location).to_numpy()
+    elif region != "All":
+        mask &= df['Location'].isin(REGION_LOCATIONS[region]).to_numpy()
+    if ratings is not None:
+        mask &= df['Rating'].between(*ratings).to_numpy()
+    return int(mask.sum())
+
+
+def median_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--append", type=float, default=0.01, help="share of rows appended for the extend timing")
+    parser.add_argument("--distinct", action="store_true", help="make every comment unique")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=Path(tempfile.gettempdir()) / "cafedata-bench",
+                        help="where generated files are kept and reused")
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        path = Path(args.data_dir) / f"cafedata_{rows}_{args.seed}.csv"
+        if not path.exists():
+            print(f"generating {rows:,} rows...", flush=True)
+            generate_cafedata(path, rows, args.seed)
+        df = load_cached_cafe_data(path)
+        if args.distinct:
+            df = df.copy()
+            df['Comment'] = df['Comment'] + " #" + np.arange(len(df)).astype(str)
+            df.attrs["version"] = f"{df.attrs['version']}-distinct"
+        get_location_index(df)
+
+        comments = df['Comment']
+        split = len(df) - int(len(df) * args.append)
+        index, build = median_time(lambda: TextIndex.from_comments(comments), repeat=1)
+        base = TextIndex.from_comments(comments.iloc[:split])
+        _, extend = median_time(lambda: base.with_rows(comments.iloc[split:]), repeat=3)
+        print(
+            f"{len(df):,} rows, {comments.nunique():,} distinct comments: "
+            f"index built in {build:.2f}s, extended with {len(df) - split:,} rows in {extend * 1000:.1f} ms"
+        )
+
+        # Queries run against the freshly built index
+        VIEW_CACHE.update([(("text_index", dataset_version(df)), index)])
+        for name, kwargs in queries():
+            result, seconds = median_time(lambda: comment_search(df, cache=ViewCache(), **kwargs))
+            total, scan = median_time(lambda: pandas_search(df, **kwargs), repeat=1)
+            # A regex also matches inside words the tokenizer keeps whole ("coffee's")
+            differs = f"   (scan: {total:,})" if total != result["total"] else ""
+            print(
+                f"  {name:<26} {seconds * 1000:8.2f} ms   {result['total']:>10,} matches   "
+                f"str.contains {scan * 1000:9.1f} ms ({scan / seconds:,.0f}x){differs}"
+            )
+
+
+if __name__ == "__main__":
+    main()
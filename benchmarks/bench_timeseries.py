@@ -0,0 +1,66 @@
+"""
+Time the multi-resolution revenue engine on a synthetic dataset: full build,
+extending it with appended rows versus rebuilding, and answering each
+resolution/metric query compared with resampling the raw transactions.
+
+Usage:
+    python benchmarks/bench_timeseries.py [--rows 5000000] [--append 0.01]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_location_index import LOCATIONS, REGION, best_of  # noqa: E402
+from utils.timeseries import RESOLUTIONS, RevenueEngine  # noqa: E402
+
+
+def synthetic_transactions(rows, seed=0):
+    """Transactions spread over two years, sorted by time like the appended CSV."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2023-01-01T00:00", "s")
+    seconds = np.sort(rng.integers(0, 2 * 365 * 86400, rows))
+    return pd.DataFrame({
+        "Location": pd.Categorical(rng.choice(LOCATIONS, rows), categories=sorted(LOCATIONS)),
+        "TransactionDateTime": start + seconds.astype("timedelta64[s]"),
+        "TransactionValue": rng.gamma(2.0, 6.0, rows).round(2),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--append", type=float, default=0.01, help="share of rows appended at the end")
+    args = parser.parse_args()
+
+    df = synthetic_transactions(args.rows)
+    split = len(df) - int(len(df) * args.append)
+    base, tail = df.iloc[:split], df.iloc[split:]
+    print(f"rows: {len(df):,} (appending {len(tail):,})")
+
+    engine, build_secs = best_of(lambda: RevenueEngine.from_frame(df), repeat=1)
+    base_engine = RevenueEngine.from_frame(base)
+    _, append_secs = best_of(lambda: base_engine.with_rows(tail))
+    print(f"full build:           {build_secs:8.3f}s")
+    print(f"append to base:       {append_secs:8.3f}s")
+
+    for resolution in RESOLUTIONS:
+        _, engine_secs = best_of(lambda: engine.series(resolution, "revenue", REGION, "2024-01-01", "2024-12-31"))
+        _, scan_secs = best_of(lambda: (
+            df[df["Location"].isin(REGION) & (df["TransactionDateTime"] >= "2024-01-01")]
+            .set_index("TransactionDateTime")["TransactionValue"]
+            .resample(RESOLUTIONS[resolution]).sum()
+        ))
+        print(f"{resolution:<6} engine {engine_secs * 1000:8.2f} ms   raw resample {scan_secs * 1000:8.2f} ms")
+    for metric in ("rolling_7", "rolling_28", "wow"):
+        _, engine_secs = best_of(lambda: engine.series("day", metric, REGION))
+        print(f"{metric:<10} engine {engine_secs * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compare picking the most recent, best and worst K feedback rows with partial
+selection (select_top_k), and on plain column arrays (top_k_positions, as the
+feedback view does), against three full sort_values passes.
+
+Usage:
+    python benchmarks/bench_top_k.py [--rows 5000000] [--k 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.metrics import top_k_positions  # noqa: E402
+
+
+def select_top_k(data, column, k, largest=True):
+    """
+    The k rows with the largest (or smallest) values in column, without sorting
+    the whole frame (how the feedback view selected rows before top_k_positions).
+
+    Uses a partial selection (nlargest/nsmallest), so the cost is linear in the
+    number of rows. Ties keep their original row order and rows with a missing
+    value only fill in when there are fewer than k others.
+    """
+    if largest:
+        selected = data.nlargest(k, column, keep='first')
+    else:
+        selected = data.nsmallest(k, column, keep='first')
+    if len(selected) < k:
+        missing = data[data[column].isna()].head(k - len(selected))
+        selected = pd.concat([selected, missing])
+    return selected
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2024-01-01T00:00:00")
+    return pd.DataFrame({
+        "Rating": rng.choice([1, 2, 3, 4, 5], rows, p=[0.03, 0.03, 0.06, 0.18, 0.70]),
+        "TransactionDateTime": start + rng.integers(0, 2 * 365 * 24 * 3600, rows).astype("timedelta64[s]"),
+        "TransactionValue": rng.gamma(2.0, 6.0, rows).round(2),
+    })
+
+
+def full_sort(data, k):
+    return (
+        data.sort_values(by='TransactionDateTime', ascending=False).head(k),
+        data.sort_values(by='Rating', ascending=False).head(k),
+        data.sort_values(by='Rating', ascending=True).head(k),
+    )
+
+
+def partial(data, k):
+    return (
+        select_top_k(data, 'TransactionDateTime', k),
+        select_top_k(data, 'Rating', k),
+        select_top_k(data, 'Rating', k, largest=False),
+    )
+
+
+def positions(data, k):
+    dates = data['TransactionDateTime'].to_numpy()
+    ratings = data['Rating'].to_numpy()
+    return (
+        data.iloc[top_k_positions(dates, k)],
+        data.iloc[top_k_positions(ratings, k)],
+        data.iloc[top_k_positions(ratings, k, largest=False)],
+    )
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    sorted_views, sort_secs = best_of(lambda: full_sort(df, args.k))
+    partial_views, partial_secs = best_of(lambda: partial(df, args.k))
+    position_views, position_secs = best_of(lambda: positions(df, args.k))
+
+    # Ties make the chosen rows differ, the selected values must not
+    for (a, b), column in zip(zip(sorted_views, partial_views), ['TransactionDateTime', 'Rating', 'Rating']):
+        assert a[column].tolist() == b[column].tolist()
+    for a, b in zip(partial_views, position_views):
+        assert a.index.tolist() == b.index.tolist()
+
+    print(f"rows: {len(df):,}  k: {args.k}")
+    print(f"full sorts:        {sort_secs:8.3f}s")
+    print(f"partial selection: {partial_secs:8.3f}s")
+    print(f"column positions:  {position_secs:8.3f}s")
+    print(f"speedup:           {sort_secs / partial_secs:8.1f}x (partial), {sort_secs / position_secs:.1f}x (positions)")
+
+
+if __name__ == "__main__":
+    main()
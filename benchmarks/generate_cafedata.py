@@ -0,0 +1,155 @@
+"""
+Generate a synthetic CafeData CSV of any size with the quirks of the real
+file: the two trailing empty header columns, 5-field rows without a comment,
+7-field rows with an e-mail in the date column, an outlier "$221,020,..."
+value and an extra code, 8-field web rows, locations with trailing spaces,
+unparseable dates and a few unusable short rows.
+
+Locations, ratings and comments are sampled from data/CafeData.csv; dates
+run forward in time and feedback ids increase, like the appended export.
+
+Usage:
+    python benchmarks/generate_cafedata.py OUTPUT [--rows 1000000] [--seed 0] [--years 4]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.data_loader import load_cafe_data  # noqa: E402
+
+SOURCE = ROOT / "data" / "CafeData.csv"
+
+HEADER = "Location,Rating,Comment,Transaction Date and Time,Transaction Value,feedback_id,,\n"
+
+# Share of each row shape; the rest are regular 6-field rows
+QUIRKS = {
+    "no_comment": 0.004,   # 5 fields
+    "email": 0.002,        # 7 fields, e-mail instead of a date and an outlier value
+    "web": 0.001,          # 8 fields, "WEB" source column, value without "$"
+    "bad_date": 0.002,     # 6 fields with a date that does not parse
+    "short": 0.001,        # 2 fields, dropped by the loader
+}
+
+# Share of locations written with trailing spaces
+PADDED_LOCATIONS = 0.05
+
+FIRST_ID = 4_900_000
+START = np.datetime64("2020-10-19T06:00", "s")
+
+# Transactions are spread evenly over this many years, whatever the row count
+DEFAULT_YEARS = 4
+
+
+def _sample_source():
+    """Locations, ratings and comments of the real file to sample from."""
+    real = load_cafe_data(SOURCE)
+    comments = real["Comment"].fillna("").astype(str)
+    return (
+        real["Location"].astype(str).to_numpy(dtype=object),
+        real["Rating"].astype(str).to_numpy(dtype=object),
+        comments[comments != ""].to_numpy(dtype=object),
+    )
+
+
+def _codes(rng, n):
+    letters = rng.integers(ord("A"), ord("Z") + 1, (n, 7), dtype=np.uint8)
+    return letters.view("S7").ravel().astype(str).astype(object)
+
+
+def _chunk_lines(rng, n, first_row, step, source, first_id=FIRST_ID):
+    """CSV lines for rows first_row .. first_row + n - 1."""
+    locations, ratings, comments = source
+    pick = rng.integers(0, len(locations), n)
+    location = pd.Series(locations[pick], dtype=object)
+    padded = rng.random(n) < PADDED_LOCATIONS
+    location[padded] = location[padded] + "  "
+    rating = pd.Series(ratings[pick], dtype=object)
+    comment = pd.Series(comments[rng.integers(0, len(comments), n)], dtype=object)
+    comment = '"' + comment.str.replace('"', '""', regex=False) + '"'
+
+    rows = first_row + np.arange(n)
+    seconds = (rows * step + rng.random(n) * step).astype(np.int64)
+    stamps = pd.DatetimeIndex(START + seconds.astype("timedelta64[s]"))
+    # Day first, hour without a leading zero: 19/10/2024 6:03:00 AM
+    date = pd.Series(stamps.strftime("%d/%m/%Y %I:%M:%S %p"), dtype=object).str.replace(r" 0(\d):", r" \1:", regex=True)
+    amount = pd.Series(np.round(rng.gamma(2.0, 6.0, n) + 1, 2)).map("{:.2f}".format).astype(object)
+    feedback_id = pd.Series((first_id + rows).astype(str), dtype=object)
+
+    lines = location + "," + rating + "," + comment + "," + date + ",$" + amount + "," + feedback_id + ",,"
+
+    shape = rng.random(n)
+    edges = np.cumsum(list(QUIRKS.values()))
+    kind = np.searchsorted(edges, shape, side="right")
+    names = list(QUIRKS)
+
+    mask = kind == names.index("no_comment")
+    lines[mask] = (location + "," + rating + ",," + date + ",$" + amount + "," + feedback_id + ",,")[mask]
+
+    mask = kind == names.index("email")
+    if mask.any():
+        m = int(mask.sum())
+        emails = pd.Series(_codes(rng, m), dtype=object).str.lower() + "@example.co.nz"
+        huge = pd.Series(rng.integers(200_000_000_000, 240_000_000_000, m)).map('"${:,}.00"'.format).astype(object)
+        lines[mask] = (
+            location[mask] + "," + rating[mask] + "," + comment[mask] + ","
+            + emails.to_numpy() + "," + huge.to_numpy() + "," + _codes(rng, m) + "," + feedback_id[mask] + ","
+        )
+
+    mask = kind == names.index("web")
+    if mask.any():
+        lines[mask] = (
+            location[mask] + "," + rating[mask] + "," + comment[mask] + ",WEB," + date[mask] + ","
+            + amount[mask] + "," + _codes(rng, int(mask.sum())) + "," + feedback_id[mask]
+        )
+
+    mask = kind == names.index("bad_date")
+    lines[mask] = (location + "," + rating + "," + comment + ",32/13/2024 25:61:00 PM,$" + amount + "," + feedback_id + ",,")[mask]
+
+    mask = kind == names.index("short")
+    lines[mask] = (location + "," + rating + ",,,,,,")[mask]
+
+    return "\n".join(lines.tolist()) + "\n"
+
+
+def generate_cafedata(path, rows, seed=0, years=DEFAULT_YEARS, chunk_rows=500_000, first_id=FIRST_ID):
+    """
+    Write a synthetic CafeData CSV with the given number of data rows, with
+    feedback ids counting up from first_id.
+
+    Returns:
+        int: Size of the written file in bytes.
+    """
+    rng = np.random.default_rng(seed)
+    source = _sample_source()
+    step = years * 365.25 * 86400 / max(rows, 1)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER)
+        for first_row in range(0, rows, chunk_rows):
+            f.write(_chunk_lines(rng, min(chunk_rows, rows - first_row), first_row, step, source, first_id))
+    return path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=float, default=DEFAULT_YEARS, help="time span of the transactions")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    size = generate_cafedata(args.output, args.rows, args.seed, args.years)
+    print(f"{args.rows:,} rows, {size / 1e6:.1f} MB written to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import stat
+
+import pytest
+
+from utils.analysis_cache import AnalysisCache, analysis_key
+
+
+def test_round_trip(tmp_path):
+    cache = AnalysisCache(tmp_path / "analysis.sqlite3")
+    key = analysis_key("v1", "prompt", "model", mode="single")
+    assert cache.get(key) is None
+    cache.set(key, "summary", {"chunks": 2})
+    assert cache.get(key) == ("summary", {"chunks": 2})
+    cache.invalidate(key)
+    assert cache.get(key) is None
+
+
+@pytest.mark.skipif(os.name != "posix" or os.geteuid() == 0, reason="root ignores directory permissions")
+def test_read_only_folder_disables_the_cache(tmp_path):
+    tmp_path.chmod(stat.S_IRUSR | stat.S_IXUSR)
+    try:
+        cache = AnalysisCache(tmp_path / ".cache" / "analysis.sqlite3")
+        cache.set("key", "summary")
+        assert cache.get("key") is None
+        assert len(cache) == 0
+    finally:
+        tmp_path.chmod(stat.S_IRWXU)
+
+
+def test_unusable_path_disables_the_cache(tmp_path):
+    # A file where the cache folder should be: mkdir fails as on a read-only deployment
+    (tmp_path / "data").write_text("")
+    cache = AnalysisCache(tmp_path / "data" / "analysis.sqlite3")
+    assert not cache.enabled
+    cache.set("key", "summary")
+    assert cache.get("key") is None
+    cache.invalidate("key")
+    assert len(cache) == 0
+
+
+def test_database_errors_are_not_raised(tmp_path, monkeypatch):
+    cache = AnalysisCache(tmp_path / "analysis.sqlite3")
+    cache.set("key", "summary")
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_connect", locked)
+    assert cache.get("key") is None
+    cache.set("key", "other")
+    cache.invalidate("key")
+    assert len(cache) == 0
@@ -0,0 +1,95 @@
+import threading
+
+from utils import analysis_jobs
+from utils.analysis_cache import AnalysisCache
+from utils.analysis_jobs import JobRegistry
+
+
+def wait(job, timeout=5):
+    assert job.wait(timeout), "job did not finish"
+    return job
+
+
+def test_failed_job_is_not_restarted_before_retry_after():
+    registry = JobRegistry()
+    calls = []
+
+    def work(update):
+        calls.append(1)
+        raise RuntimeError("The model returned an empty summary")
+
+    job = wait(registry.start("key", work))
+    assert isinstance(job.error, RuntimeError)
+    assert job.finished_at is not None
+    # Every rerun polling the job gets the same failure, without a new upstream call
+    for _ in range(5):
+        assert registry.start("key", work) is job
+    assert len(calls) == 1
+
+
+def test_failed_job_is_retried_after_retry_after(monkeypatch):
+    registry = JobRegistry()
+    results = iter([RuntimeError("boom"), ("summary", None)])
+
+    def work(update):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    failed = wait(registry.start("key", work))
+    monkeypatch.setattr(analysis_jobs, "RETRY_AFTER", -1)
+    retried = wait(registry.start("key", work))
+    assert retried is not failed
+    assert (retried.error, retried.text) == (None, "summary")
+
+
+def test_concurrent_starts_share_one_job():
+    registry = JobRegistry()
+    release = threading.Event()
+    calls = []
+
+    def work(update):
+        calls.append(1)
+        update("partial")
+        release.wait(5)
+        return "done", {"chunks": 1}
+
+    jobs = [registry.start("key", work) for _ in range(3)]
+    assert all(job is jobs[0] for job in jobs)
+    release.set()
+    assert wait(jobs[0]).text == "done"
+    assert len(calls) == 1
+
+
+def test_result_is_served_from_the_job_when_the_cache_is_disabled(tmp_path):
+    # A read-only deployment: the analysis cache stores nothing
+    (tmp_path / "data").write_text("")
+    cache = AnalysisCache(tmp_path / "data" / "analysis.sqlite3")
+    assert not cache.enabled
+    registry = JobRegistry()
+    calls = []
+
+    def work(update):
+        calls.append(1)
+        cache.set("key", "summary")
+        return "summary", None
+
+    # Every rerun misses the cache and asks the registry, as display_ai_section does
+    for _ in range(5):
+        assert cache.get("key") is None
+        job = wait(registry.start("key", work))
+        assert (job.error, job.text) == (None, "summary")
+    assert len(calls) == 1
+
+    registry.forget("key")
+    wait(registry.start("key", work))
+    assert len(calls) == 2
+
+
+def test_results_expire_after_result_ttl(monkeypatch):
+    registry = JobRegistry()
+    first = wait(registry.start("key", lambda update: ("summary", None)))
+    assert registry.start("key", lambda update: ("other", None)) is first
+    monkeypatch.setattr(analysis_jobs, "RESULT_TTL", -1)
+    assert wait(registry.start("key", lambda update: ("other", None))).text == "other"
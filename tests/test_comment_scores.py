@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+from utils.comment_scores import SENTIMENT_THRESHOLD, TOPIC_NAMES, score_comment
+
+
+def sentiment(text):
+    return score_comment(text)[0]
+
+
+@pytest.mark.parametrize("text", [
+    "Great coffee",
+    "Not bad at all",
+    "No complaints, great coffee",
+    "Not sure. Was a good visit",
+    "Never had a bad experience here!",
+    "Didn't have to wait",
+])
+def test_positive(text):
+    assert sentiment(text) > SENTIMENT_THRESHOLD
+
+
+@pytest.mark.parametrize("text", [
+    "Rude staff",
+    "Not very friendly",
+    "Coffee wasn't good",
+    "Great location, but the coffee was cold and the staff rude",
+    "No smile. Terrible service",
+])
+def test_negative(text):
+    assert sentiment(text) < -SENTIMENT_THRESHOLD
+
+
+def test_negation_ends_at_clause_punctuation():
+    assert sentiment("No complaints, great coffee") > sentiment("No complaints great coffee")
+    assert sentiment("Not sure. Was a good visit") == pytest.approx(sentiment("Was a good visit"))
+
+
+def test_intensifier_ends_at_clause_punctuation():
+    assert sentiment("Very. Friendly") == pytest.approx(sentiment("Friendly"))
+    assert sentiment("Very friendly") > sentiment("Friendly")
+
+
+def test_missing_comment():
+    assert math.isnan(sentiment(None))
+    assert score_comment("   ") == (pytest.approx(math.nan, nan_ok=True), 0)
+
+
+def test_topics():
+    _, mask = score_comment("Friendly staff, quick service and a great latte")
+    topics = {name for bit, name in enumerate(TOPIC_NAMES) if mask >> bit & 1}
+    assert {"Coffee & drinks", "Service & staff"} <= topics
+    assert "Price & value" not in topics
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pandas.testing as tm
+import pytest
+
+from utils.data_cache import load_cached_cafe_data
+from utils.data_loader import load_cafe_data
+
+SAMPLE = Path(__file__).resolve().parent.parent / "data" / "CafeData.csv"
+
+
+@pytest.fixture
+def lines():
+    """Lines of the shipped CSV (header first); its last line has no trailing newline."""
+    return SAMPLE.read_bytes().splitlines(True)
+
+
+def assert_same_rows(cached, path):
+    expected = load_cafe_data(path)
+    assert len(cached) == len(expected)
+    for column in ['FeedbackID', 'Comment', 'Rating', 'TransactionDateTime', 'TransactionValue']:
+        tm.assert_series_equal(cached[column], expected[column], check_names=False)
+
+
+def test_append_after_a_line_without_newline(tmp_path, lines):
+    path = tmp_path / "CafeData.csv"
+    # The file ends like the shipped one: a complete last row without a newline
+    path.write_bytes(b"".join(lines[:1000]).rstrip(b"\n"))
+    assert_same_rows(load_cached_cafe_data(path), path)
+
+    path.write_bytes(b"".join(lines[:1500]))
+    appended = load_cached_cafe_data(path)
+    assert appended.attrs["base_rows"] < len(appended)
+    assert_same_rows(appended, path)
+
+
+def test_append_after_a_partly_written_line(tmp_path, lines):
+    path = tmp_path / "CafeData.csv"
+    # A writer stopped in the middle of the last row
+    path.write_bytes(b"".join(lines[:1000]) + lines[1000][:15])
+    load_cached_cafe_data(path)
+
+    path.write_bytes(b"".join(lines[:1001]) + lines[1001][:-1])
+    load_cached_cafe_data(path)
+
+    path.write_bytes(b"".join(lines))
+    assert_same_rows(load_cached_cafe_data(path), path)
+
+
+def test_unchanged_file_is_read_from_the_cache(tmp_path, lines):
+    path = tmp_path / "CafeData.csv"
+    path.write_bytes(b"".join(lines))
+    first = load_cached_cafe_data(path)
+    second = load_cached_cafe_data(path)
+    assert second.attrs["version"] == first.attrs["version"]
+    assert "base_rows" not in second.attrs
+    assert_same_rows(second, path)
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from utils.data_source import load_data_source
+
+SAMPLE = Path(__file__).resolve().parent.parent / "data" / "CafeData.csv"
+
+
+def write_export(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"".join(lines))
+
+
+def test_single_file_drops_duplicate_feedback(tmp_path):
+    lines = SAMPLE.read_bytes().splitlines(True)
+    # The same export holding a FeedbackID twice: the later row is kept
+    edited = lines[5].replace(b",5,", b",1,", 1)
+    write_export(tmp_path / "plain" / "a.csv", lines[:200])
+    write_export(tmp_path / "exports" / "a.csv", lines[:200] + [edited])
+
+    df = load_data_source(tmp_path / "exports")
+    assert df['FeedbackID'].is_unique
+    assert len(df) == len(load_data_source(tmp_path / "plain"))
+    assert df.attrs["rows"] == len(df)
+    assert df.loc[df['FeedbackID'] == df['FeedbackID'].iloc[-1], 'Rating'].tolist() == [1]
+
+
+def test_single_file_matches_several_files(tmp_path):
+    lines = SAMPLE.read_bytes().splitlines(True)
+    write_export(tmp_path / "one" / "a.csv", lines[:300] + lines[100:200])
+    write_export(tmp_path / "two" / "a.csv", lines[:300])
+    write_export(tmp_path / "two" / "b.csv", lines[:1] + lines[100:200])
+
+    one, two = load_data_source(tmp_path / "one"), load_data_source(tmp_path / "two")
+    assert len(one) == len(two)
+    assert sorted(one['FeedbackID']) == sorted(two['FeedbackID'])
+
+
+def test_single_file_without_duplicates_keeps_append_tags(tmp_path):
+    lines = SAMPLE.read_bytes().splitlines(True)
+    path = tmp_path / "a.csv"
+    write_export(path, lines[:200])
+    base = load_data_source(path)
+    write_export(path, lines[:300])
+
+    df = load_data_source(path)
+    assert df.attrs["base_rows"] == len(base) < len(df)
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import debug_panel
+
+
+@pytest.fixture
+def visit(monkeypatch):
+    monkeypatch.delenv("CAFE_DEBUG", raising=False)
+
+    def visit(query, token=None):
+        monkeypatch.setattr(debug_panel, "DEBUG_TOKEN", token)
+        monkeypatch.setattr(debug_panel, "st", SimpleNamespace(query_params=query))
+        return debug_panel.debug_enabled()
+
+    return visit
+
+
+def test_query_parameter_alone_does_not_open_the_panel(visit):
+    assert not visit({"debug": "1"})
+    assert not visit({})
+
+
+def test_token_opens_the_panel(visit):
+    assert visit({"debug": "s3cret"}, token="s3cret")
+    assert not visit({"debug": "1"}, token="s3cret")
+    assert not visit({}, token="s3cret")
+
+
+def test_cafe_debug_opens_it_for_everyone(visit, monkeypatch):
+    monkeypatch.setenv("CAFE_DEBUG", "1")
+    assert visit({})
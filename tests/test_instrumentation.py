@@ -0,0 +1,33 @@
+import threading
+
+from utils import instrumentation
+from utils.instrumentation import rerun_trace
+
+
+def test_overlapping_reruns_profile_one_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, "PROFILE_DIR", str(tmp_path))
+    entered, release = threading.Event(), threading.Event()
+    errors = []
+
+    def first():
+        try:
+            with rerun_trace("first"):
+                entered.set()
+                release.wait(5)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    assert entered.wait(5)
+    # Another session's rerun while the first one is profiled runs unprofiled
+    with rerun_trace("second"):
+        pass
+    release.set()
+    thread.join()
+
+    assert not errors
+    assert [path.name.split("-")[0] for path in tmp_path.glob("*.prof")] == ["first"]
+    with rerun_trace("third"):
+        pass
+    assert len(list(tmp_path.glob("third-*.prof"))) == 1
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils import snapshot as snapshot_module
+from utils.data_cache import load_cached_cafe_data
+from utils.metrics import date_bounds, feedback_summary, revenue_chart, selections
+from utils.snapshot import build_snapshot, default_snapshot_path, load_snapshot, preload_snapshot, write_snapshot
+from utils.view_cache import ViewCache
+
+SAMPLE = Path(__file__).resolve().parent.parent / "data" / "CafeData.csv"
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory):
+    path = tmp_path_factory.mktemp("data") / "CafeData.csv"
+    path.write_bytes(SAMPLE.read_bytes())
+    return path
+
+
+@pytest.fixture(scope="module")
+def df(source):
+    return load_cached_cafe_data(source)
+
+
+@pytest.fixture(scope="module")
+def snapshot(df):
+    return build_snapshot(df, all_charts=True)
+
+
+@pytest.fixture(autouse=True)
+def fresh_preload(monkeypatch):
+    monkeypatch.setattr(snapshot_module, "_preloaded", set())
+
+
+def test_round_trip_is_exact(snapshot, tmp_path):
+    path = tmp_path / "snapshot.json"
+    write_snapshot(snapshot, path)
+    loaded = load_snapshot(path)
+    assert loaded["views"].keys() == snapshot["views"].keys()
+    for key, view in snapshot["views"].items():
+        # Compared through repr: KPIs of selections without sales hold NaN
+        assert repr(loaded["views"][key]) == repr(view)
+    # Plain JSON, nothing that could run code when read
+    assert json.loads(path.read_text())["format"] == snapshot["format"]
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "snapshot.json"
+    assert load_snapshot(path) is None
+    path.write_bytes(b"\x80\x04not json")
+    assert load_snapshot(path) is None
+    path.write_text('{"format": 1, "views": []}')
+    assert load_snapshot(path) is None
+
+
+def test_preload_serves_every_view_on_a_small_cache(df, source, snapshot):
+    write_snapshot(snapshot, default_snapshot_path(source))
+    cache = ViewCache(maxsize=16)
+    assert len(snapshot["views"]) > cache.maxsize
+    assert preload_snapshot(df, source, cache) == len(snapshot["views"])
+    assert cache.stats()["evictions"] == 0
+
+    # The views the dashboard asks for in its default state are all hits, whatever the date
+    _, last_day, default_start = date_bounds(df, cache=cache)
+    for region, location in selections(df):
+        revenue_chart(df, region, location, "day", "revenue", default_start, last_day, cache=cache)
+        feedback_summary(df, region, location, cache=cache)
+    assert cache.stats()["misses"] == 0
+
+
+def test_default_range_does_not_depend_on_the_date(df):
+    first_day, last_day, default_start = date_bounds(df, cache=ViewCache())
+    assert first_day <= default_start <= last_day
+    assert default_start == max(first_day, last_day - pd.DateOffset(years=2))
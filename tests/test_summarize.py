@@ -0,0 +1,127 @@
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from utils.data_loader import load_cafe_data
+from utils.locations import encode_locations
+from utils.summarize import MAP_MAX_TOKENS, MAX_TOKENS, call_with_retry, is_retryable, split_feedback, summarize_map_reduce
+
+SAMPLE = Path(__file__).resolve().parent.parent / "data" / "CafeData.csv"
+
+
+@pytest.fixture(scope="module")
+def df():
+    return encode_locations(load_cafe_data(SAMPLE))
+
+
+class APIStatusError(Exception):
+    """Shaped like the openai package's errors: status_code and code attributes."""
+
+    def __init__(self, status_code, code=None):
+        super().__init__(f"{status_code} {code}")
+        self.status_code = status_code
+        self.code = code
+
+
+# Named like their openai counterparts, which is how is_retryable recognises them
+RateLimitError = type("RateLimitError", (APIStatusError,), {})
+AuthenticationError = type("AuthenticationError", (APIStatusError,), {})
+BadRequestError = type("BadRequestError", (APIStatusError,), {})
+InternalServerError = type("InternalServerError", (APIStatusError,), {})
+APITimeoutError = type("APITimeoutError", (Exception,), {})
+
+
+class StubClient:
+    """Stands in for OpenAI(): records every chat.completions.create call, no network."""
+
+    def __init__(self, errors=()):
+        self.calls = []
+        self.errors = list(errors)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, max_tokens, stream=False):
+        with self._lock:
+            self.calls.append((messages, max_tokens))
+            error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        content = f"summary {len(self.calls)}"
+        if stream:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))]) for word in content.split(" ")])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_map_and_reduce_calls(df):
+    client = StubClient()
+    streamed = []
+    summary, timings = summarize_map_reduce(df, client, "Summarise.", backoff=0, on_text=streamed.append)
+
+    chunks = split_feedback(df)
+    assert timings["chunks"] == len(chunks) == len(client.calls) - 1
+    assert set(timings) == {"chunks", "split", "map", "reduce", "total", "reduce_prompt_tokens"}
+    assert all(timings[stage] >= 0 for stage in ("split", "map", "reduce"))
+    assert timings["total"] >= timings["map"] + timings["reduce"]
+
+    # One map call per chunk, then one reduce call over their summaries with the system prompt
+    maps, (reduce_messages, reduce_tokens) = client.calls[:-1], client.calls[-1]
+    assert all(max_tokens == MAP_MAX_TOKENS for _, max_tokens in maps)
+    assert {messages[0]["content"].split(": ")[1].split(".")[0] for messages, _ in maps} == {label for label, _ in chunks}
+    assert reduce_tokens == MAX_TOKENS
+    assert reduce_messages[0]["content"] == "Summarise."
+    for label, _ in chunks:
+        assert f"### {label}\n" in reduce_messages[1]["content"]
+    assert streamed[-1] == summary
+
+
+def test_transient_errors_are_retried(df):
+    errors = [ConnectionError("reset"), RateLimitError(429), InternalServerError(503), APITimeoutError()]
+    client = StubClient(errors)
+    summary, timings = summarize_map_reduce(df, client, "Summarise.", max_retries=len(errors), backoff=0, max_workers=1)
+    assert summary
+    assert len(client.calls) == timings["chunks"] + 1 + len(errors)
+
+
+NOT_RETRYABLE = [
+    AuthenticationError(401),
+    BadRequestError(400, "context_length_exceeded"),
+    RateLimitError(429, "insufficient_quota"),
+    ValueError("bug"),
+]
+
+
+@pytest.mark.parametrize("error", NOT_RETRYABLE)
+def test_other_errors_are_not_retried(error):
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise error
+
+    with pytest.raises(type(error)):
+        call_with_retry(fail, backoff=0)
+    assert len(calls) == 1
+
+
+def test_failed_map_stage_stops_sending_chunks(df):
+    client = StubClient([AuthenticationError(401)] * 100)
+    with pytest.raises(AuthenticationError):
+        summarize_map_reduce(df, client, "Summarise.", backoff=0, max_workers=1)
+    # The failed chunk, plus at most the one the worker picked up meanwhile
+    assert len(client.calls) <= 2 < len(split_feedback(df))
+
+
+def test_retries_are_bounded():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise TimeoutError("slow")
+
+    with pytest.raises(TimeoutError):
+        call_with_retry(fail, max_retries=2, backoff=0)
+    assert len(calls) == 3
+    assert is_retryable(APIStatusError(502))
+    assert not is_retryable(APIStatusError(404))
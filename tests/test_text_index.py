@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cache import load_cached_cafe_data
+from utils.data_loader import load_cafe_data
+from utils.text_index import TextIndex, get_text_index, query_terms, tokenize
+
+SAMPLE = Path(__file__).resolve().parent.parent / "data" / "CafeData.csv"
+
+
+@pytest.fixture(scope="module")
+def comments():
+    return load_cafe_data(SAMPLE)['Comment']
+
+
+def queries(comments):
+    """Frequent and rare single words, and pairs of words found together."""
+    rng = np.random.default_rng(0)
+    words = pd.Series([word for text in comments for word in tokenize(text)]).value_counts()
+    single = list(words.index[:40]) + list(rng.choice(words.index[40:], 40, replace=False))
+    pairs = [" ".join(tokenize(text)[:2]) for text in rng.choice(comments.dropna().to_numpy(), 40)]
+    return single + pairs + ["coffee nonexistentword", ""]
+
+
+def assert_same_results(index, fresh, query):
+    rows, scores = index.search(query_terms(query))
+    fresh_rows, fresh_scores = fresh.search(query_terms(query))
+    order, fresh_order = np.argsort(rows), np.argsort(fresh_rows)
+    np.testing.assert_array_equal(rows[order], fresh_rows[fresh_order], err_msg=query)
+    np.testing.assert_allclose(scores[order], fresh_scores[fresh_order], err_msg=query)
+
+
+@pytest.mark.parametrize("splits", [[1200], [1, 2000], [500, 1000, 1500, 2000, 2400]])
+def test_appended_segments_match_full_build(comments, splits):
+    fresh = TextIndex.from_comments(comments)
+    bounds = [0] + splits + [len(comments)]
+    index = TextIndex.from_comments(comments.iloc[:bounds[1]])
+    for a, b in zip(bounds[1:], bounds[2:]):
+        index = index.with_rows(comments.iloc[a:b])
+
+    assert len(index.segments) == len(bounds) - 1
+    assert (index.rows, index.n_docs, index.total_length) == (fresh.rows, fresh.n_docs, fresh.total_length)
+    for query in queries(comments):
+        assert_same_results(index, fresh, query)
+
+
+def test_get_text_index_extends_after_append(tmp_path, comments):
+    lines = SAMPLE.read_bytes().splitlines(True)
+    path = tmp_path / "CafeData.csv"
+    path.write_bytes(b"".join(lines[:2000]))
+    get_text_index(load_cached_cafe_data(path))
+    path.write_bytes(b"".join(lines))
+
+    df = load_cached_cafe_data(path)
+    index = get_text_index(df)
+    assert len(index.segments) == 2
+    fresh = TextIndex.from_comments(df['Comment'])
+    for query in queries(comments)[:40]:
+        assert_same_results(index, fresh, query)
+
+
+def test_search_matches_every_term(comments):
+    index = TextIndex.from_comments(comments)
+    rows, scores = index.search(query_terms("friendly staff"))
+    assert len(rows) and (scores > 0).all()
+    for text in comments.iloc[rows]:
+        assert {"friendly", "staff"} <= set(tokenize(text))
+    expected = comments.map(lambda text: {"friendly", "staff"} <= set(tokenize(text)))
+    assert len(rows) == int(expected.sum())
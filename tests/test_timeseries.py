@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from utils.timeseries import METRICS, RESOLUTIONS, RevenueEngine
+
+
+def transactions(rows):
+    """A cleaned-dataset-like frame from (timestamp, location, value) tuples."""
+    dates, locations, values = zip(*rows)
+    return pd.DataFrame({
+        'TransactionDateTime': pd.to_datetime(list(dates)),
+        'Location': pd.Categorical(locations),
+        'TransactionValue': np.array(values, dtype=np.float64),
+    })
+
+
+# Sales on 2024-01-01..03, nothing for a week, then 2024-01-10..11 (one new location)
+OLD = [
+    ("2024-01-01 09:00", "Albany", 10.0),
+    ("2024-01-01 10:00", "Nelson", 12.0),
+    ("2024-01-02 11:00", "Albany", 20.0),
+    ("2024-01-03 08:00", "Nelson", 20.0),
+]
+NEW = [
+    ("2024-01-10 09:00", "Albany", 30.0),
+    ("2024-01-10 12:00", "Botany", 7.0),
+    ("2024-01-11 13:00", "Nelson", 15.0),
+    (None, "Nelson", 5.0),
+]
+
+
+@pytest.mark.parametrize("split", [len(OLD), 2, 1])
+def test_with_rows_matches_full_build(split):
+    rows = OLD + NEW
+    full = RevenueEngine.from_frame(transactions(rows))
+    incremental = RevenueEngine.from_frame(transactions(rows[:split])).with_rows(transactions(rows[split:]))
+
+    assert incremental.rows == full.rows
+    for resolution in RESOLUTIONS:
+        for metric in METRICS if resolution == "day" else ["revenue"]:
+            for locations in (None, ["Albany"], ["Botany", "Nelson"]):
+                tm.assert_series_equal(
+                    incremental.series(resolution, metric, locations),
+                    full.series(resolution, metric, locations),
+                    check_names=False,
+                )
+    for start, end in [(None, None), ("2024-01-02", "2024-01-10"), ("2024-01-04", "2024-01-09")]:
+        for locations in (None, ["Nelson"]):
+            assert incremental.kpis(locations, start, end) == pytest.approx(full.kpis(locations, start, end), nan_ok=True)
+
+
+def test_day_level_is_continuous_after_a_gap():
+    engine = RevenueEngine.from_frame(transactions(OLD)).with_rows(transactions(NEW))
+    days = engine.series("day")
+    assert len(days) == 11
+    assert days.loc["2024-01-05"] == 0
+    # 2024-01-04..10: only the sales of 2024-01-10 are in the window
+    assert engine.series("day", "rolling_7").loc["2024-01-10"] == 37.0
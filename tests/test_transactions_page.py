@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cache import load_cached_cafe_data
+from utils.location_index import selected_locations
+from utils.locations import REGION_LOCATIONS
+from utils.metrics import selections
+from utils.transactions import SORT_COLUMNS, transactions_page
+from utils.view_cache import QUERY_CACHE, VIEW_CACHE
+
+SAMPLE = Path(__file__).resolve().parent.parent / "data" / "CafeData.csv"
+
+
+@pytest.fixture(scope="module")
+def df(tmp_path_factory):
+    path = tmp_path_factory.mktemp("data") / "CafeData.csv"
+    path.write_bytes(SAMPLE.read_bytes())
+    return load_cached_cafe_data(path)
+
+
+def reference(df, region, location, start, end, ratings, values, sort_by, ascending):
+    """Positions of the matching rows in page order, by a pandas filter and a stable sort (missing values last)."""
+    mask = np.ones(len(df), dtype=bool)
+    locations = selected_locations(REGION_LOCATIONS, region, location)
+    if locations is not None:
+        mask &= df['Location'].isin(locations).to_numpy()
+    dates = df['TransactionDateTime']
+    if start is not None:
+        mask &= (dates >= start).fillna(False).to_numpy()
+    if end is not None:
+        mask &= (dates < pd.Timestamp(end) + pd.Timedelta(days=1)).fillna(False).to_numpy()
+    if ratings is not None:
+        mask &= df['Rating'].between(*ratings).fillna(False).to_numpy()
+    if values is not None:
+        value = df['TransactionValue']
+        if values[0] is not None:
+            mask &= (value >= values[0]).fillna(False).to_numpy()
+        if values[1] is not None:
+            mask &= (value <= values[1]).fillna(False).to_numpy()
+
+    positions = np.flatnonzero(mask)
+    column = df[sort_by].to_numpy()[positions]
+    missing = pd.isna(column)
+    present = positions[~missing]
+    present = present[np.lexsort((present, column[~missing]))]
+    if not ascending:
+        present = present[::-1]
+    return np.concatenate([present, positions[missing]])
+
+
+def random_query(rng, pairs, first_day, last_day):
+    region, location = pairs[rng.integers(len(pairs))] if rng.random() < 0.6 else ("All", "All")
+    start = end = None
+    if rng.random() < 0.5:
+        a = first_day + (last_day - first_day) * rng.random()
+        b = a + (last_day - first_day) * rng.random() * 0.5
+        start, end = [(a, b), (a, None), (None, b)][rng.integers(3)]
+    ratings = tuple(int(r) for r in sorted(rng.integers(1, 6, 2))) if rng.random() < 0.4 else None
+    values = None
+    if rng.random() < 0.3:
+        values = (float(rng.uniform(0, 20)), float(rng.uniform(20, 60)) if rng.random() < 0.5 else None)
+    return {
+        "region": region, "location": location,
+        "start": None if start is None else start.normalize(), "end": None if end is None else end.normalize(),
+        "ratings": ratings, "values": values,
+        "sort_by": SORT_COLUMNS[rng.integers(len(SORT_COLUMNS))], "ascending": bool(rng.random() < 0.5),
+    }
+
+
+def test_pages_match_pandas_reference(df):
+    rng = np.random.default_rng(0)
+    pairs = selections(df)
+    dates = df['TransactionDateTime']
+    for _ in range(800):
+        query = random_query(rng, pairs, dates.min(), dates.max())
+        page_size = int(rng.choice([10, 50]))
+        page = int(rng.integers(0, 4)) if rng.random() < 0.7 else 10**6
+
+        result = transactions_page(df, page=page, page_size=page_size, **query)
+        expected = reference(df, **query)
+        first = result["page"] * page_size
+        assert result["total"] == len(expected), query
+        np.testing.assert_array_equal(
+            result["rows"]['FeedbackID'].to_numpy(),
+            df['FeedbackID'].to_numpy()[expected[first:first + page_size]],
+            err_msg=str(query),
+        )
+
+
+def test_query_results_stay_out_of_the_view_cache(df):
+    transactions_page(df)
+    before = {key for key, _ in VIEW_CACHE.items()}
+    for minimum in np.linspace(0, 30, 200):
+        transactions_page(df, region="Auckland", values=(float(minimum), None), sort_by='TransactionValue')
+    added = {key[0] for key, _ in VIEW_CACHE.items()} - {key[0] for key in before}
+    assert added <= {"column_index", "location_index"}
+    assert QUERY_CACHE.stats()["size"] <= QUERY_CACHE.maxsize
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from utils.view_cache import ViewCache
+
+
+def test_lru_eviction():
+    cache = ViewCache(maxsize=2)
+    for key in "abc":
+        cache.get_or_compute(key, lambda key=key: key.upper())
+    assert cache.get("a") is None
+    assert cache.get_or_compute("c", lambda: "other") == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def run_together(n, target):
+    results = [None] * n
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_misses_compute_once():
+    cache = ViewCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    threads, results = run_together(8, lambda: cache.get_or_compute("engine", compute))
+    assert started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["misses"] == 1
+
+
+def test_failed_computation_is_not_cached():
+    cache = ViewCache()
+
+    def fail():
+        raise ValueError("bad data")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("view", fail)
+    assert cache.get_or_compute("view", lambda: 1) == 1
+
+
+def test_waiters_get_the_exception():
+    cache = ViewCache()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("bad data")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("view", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads, _ = run_together(4, call)
+    assert started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 4
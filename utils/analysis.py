@@ -1,50 +1,166 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from openai import OpenAI
+from utils.analysis_cache import AnalysisCache, analysis_key
+from utils.analysis_jobs import ANALYSIS_JOBS
+from utils.analysis_payload import DEFAULT_TOKEN_BUDGET, build_analysis_payload
+from utils.data_cache import dataset_version
+from utils.instrumentation import span
+from utils.summarize import DEFAULT_MODEL, MAX_TOKENS, complete, needs_map_reduce, summarize_map_reduce
+from utils.view_cache import VIEW_CACHE
 
-@st.cache_data(show_spinner="AI is analyzing the data...", ttl=86400)
-def get_ai_analysis(data_csv):
-    """
-    Gets AI analysis from OpenAI API and caches the result globally
-    for all users and sessions.
-    """
+USER_PROMPT = "Analyse the following summary of customer data and provide insights:\n\n{payload}"
+
+# Seconds between refreshes of the sidebar while a summary streams in
+POLL_INTERVAL = 0.5
+
+def load_system_prompt():
+    """Reads the instructions for the summary, or shows an error and returns None."""
     try:
         prompt_path = Path(__file__).parent / "analysis_prompt.txt"
         with open(prompt_path, "r", encoding="utf-8") as f:
-            system_prompt = f.read()
+            return f.read()
     except FileNotFoundError:
         st.error("The 'analysis_prompt.txt' file was not found. Please create it in the 'utils' directory.")
         return None
 
-    user_prompt = f"Analyse the following customer data and provide insights:\n\n{data_csv}"
-    
-    try:
-        analysis_client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-        response = analysis_client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            max_tokens=3000
+@st.cache_resource
+def get_analysis_cache():
+    """The on-disk AI summary cache, opened once per process."""
+    return AnalysisCache()
+
+def get_ai_analysis(api_key, system_prompt, payload, on_text=None):
+    """
+    Gets AI analysis from OpenAI API in a single request, streamed to on_text
+    when given. Errors are raised to the caller.
+    """
+    # Imported on first use: openai takes a third of a second to import
+    from openai import OpenAI
+
+    analysis_client = OpenAI(api_key=api_key)
+    return complete(analysis_client, DEFAULT_MODEL, system_prompt, USER_PROMPT.format(payload=payload), MAX_TOKENS, on_text)
+
+def get_map_reduce_analysis(api_key, system_prompt, df, token_budget, on_text=None):
+    """
+    Gets AI analysis of a dataset too large for a single request by summarising
+    it per region and merging the results. Errors are raised to the caller.
+
+    Returns:
+        tuple: The summary and the per-stage timings.
+    """
+    from openai import OpenAI
+
+    analysis_client = OpenAI(api_key=api_key)
+    return summarize_map_reduce(df, analysis_client, system_prompt, token_budget=token_budget, on_text=on_text)
+
+def _show_result(analysis_result, timings):
+    st.markdown(analysis_result)
+    if timings:
+        st.caption(
+            f"Summarised in {timings['chunks']} parts: "
+            f"map {timings['map']:.1f}s, reduce {timings['reduce']:.1f}s, total {timings['total']:.1f}s"
         )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"An error occurred during AI analysis: {e}")
-        return None
 
-def display_ai_section(df):
+@st.fragment(run_every=POLL_INTERVAL)
+def _show_job(job):
+    """Re-renders only itself while the job streams, then reruns the page to pick up the result."""
+    if job.done:
+        st.rerun()
+    if job.text:
+        st.markdown(job.text)
+    else:
+        st.info("AI is analyzing the data...")
+
+def display_ai_section(df, token_budget=DEFAULT_TOKEN_BUDGET, mode="auto", background=True):
+    """
+    Shows the AI summary in the sidebar.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        token_budget (int): Approximate size of each request to the model.
+        mode (str): "single" for one request, "map_reduce" to summarise per
+            region first, or "auto" to pick map-reduce for very large datasets.
+        background (bool): Generate the summary in a background job and stream
+            it in, so the rest of the page is not held up. When False the
+            script run waits for the summary.
+    """
 
     st.header("Summary")
- 
+
+    system_prompt = load_system_prompt()
+    if system_prompt is None:
+        return
+
+    version = dataset_version(df)
+
+    if mode == "auto":
+        def check_size():
+            with span("ai.needs_map_reduce", rows=len(df)):
+                return needs_map_reduce(df)
+
+        use_map_reduce = VIEW_CACHE.get_or_compute(("ai_needs_map_reduce", version), check_size)
+    else:
+        use_map_reduce = mode == "map_reduce"
+
+    cache = get_analysis_cache()
+    key = analysis_key(
+        version,
+        system_prompt + USER_PROMPT,
+        DEFAULT_MODEL,
+        map_reduce=use_map_reduce,
+        token_budget=token_budget,
+    )
+
     if st.button("Generate Summary"):
-        st.cache_data.clear()
+        # Only this summary is dropped, every other cache stays warm
+        cache.invalidate(key)
+        ANALYSIS_JOBS.forget(key)
         st.rerun()
 
-    data_csv = df.to_csv(index=False)
+    cached = cache.get(key)
+    if cached is not None:
+        _show_result(*cached)
+        return
+
+    try:
+        api_key = st.secrets["OPENAI_API_KEY"]
+    except Exception as e:
+        st.error(f"An error occurred during AI analysis: {e}")
+        return
+
+    if use_map_reduce:
+        payload = None
+    else:
+        def build_payload():
+            with span("ai.payload", rows=len(df)):
+                return build_analysis_payload(df, token_budget)
+
+        payload = VIEW_CACHE.get_or_compute(("ai_payload", version, token_budget), build_payload)
+
+    # Runs outside the script thread, so it must not call any st.* function
+    def work(on_text):
+        with span("ai.generate"):
+            if use_map_reduce:
+                analysis_result, timings = get_map_reduce_analysis(api_key, system_prompt, df, token_budget, on_text)
+            else:
+                analysis_result, timings = get_ai_analysis(api_key, system_prompt, payload, on_text), None
+        if not analysis_result:
+            # Reported as a failure, so it is retried after RETRY_AFTER instead of on every rerun
+            raise RuntimeError("The model returned an empty summary")
+        cache.set(key, analysis_result, timings)
+        return analysis_result, timings
+
+    # Every session asking for the same summary shares one job and one upstream call,
+    # and a finished job keeps serving its result when the analysis cache could not store it
+    job = ANALYSIS_JOBS.start(key, work)
+    if not background:
+        with st.spinner("AI is analyzing the data..."):
+            job.wait()
+    elif not job.done:
+        _show_job(job)
+        return
 
-    analysis_result = get_ai_analysis(data_csv)
-    
-    if analysis_result:
-        st.markdown(analysis_result)
\ No newline at end of file
+    if job.error is not None:
+        st.error(f"An error occurred during AI analysis: {job.error}")
+    elif job.text:
+        _show_result(job.text, job.details)
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+# Shared with the cleaned data cache, so every replica pointing at the same data folder shares results
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / ".cache" / "analysis.sqlite3"
+
+DEFAULT_TTL = 86400
+
+DEFAULT_MAX_ENTRIES = 200
+
+
+def analysis_key(version, prompt, model, **options):
+    """
+    Cache key for one AI summary: the dataset version, a hash of the prompt
+    text and the model, plus any options that change the result (mode, budget).
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    parts = json.dumps([version, prompt_hash, model, options], sort_keys=True)
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Persistent store of AI summaries in a SQLite file.
+
+    Entries expire after ttl seconds and the least recently used ones are
+    dropped beyond max_entries. Only this store is touched when a summary is
+    regenerated, so other cached data is never evicted along with it.
+
+    When the file cannot be created or written (a read-only deployment), the
+    cache is disabled: get finds nothing and set stores nothing, as for the
+    cleaned data cache.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS analysis ("
+                    " key TEXT PRIMARY KEY,"
+                    " result TEXT NOT NULL,"
+                    " details TEXT,"
+                    " created REAL NOT NULL,"
+                    " accessed REAL NOT NULL)"
+                )
+            self.enabled = True
+        except (OSError, sqlite3.Error):
+            self.enabled = False
+
+    def _connect(self):
+        # Several sessions and processes share the file, wait for their writes
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        """
+        Return (result, details) for key, or None when missing or expired.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT result, details, created FROM analysis WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                result, details, created = row
+                if now - created > self.ttl:
+                    conn.execute("DELETE FROM analysis WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE analysis SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            # Read-only or locked file: treated as a miss
+            return None
+        return result, json.loads(details) if details else None
+
+    def set(self, key, result, details=None):
+        """Store a result (and optional JSON-serialisable details), then evict old entries."""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis (key, result, details, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, result, json.dumps(details) if details is not None else None, now, now),
+                )
+                conn.execute("DELETE FROM analysis WHERE created < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM analysis WHERE key IN "
+                    "(SELECT key FROM analysis ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            # The summary is still shown, it is only not kept
+            pass
+
+    def invalidate(self, key):
+        """Drop a single entry so it is regenerated on the next request."""
+        if not self.enabled:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM analysis WHERE key = ?", (key,))
+        except sqlite3.Error:
+            # Read-only or locked file: the stored summary is kept
+            pass
+
+    def __len__(self):
+        if not self.enabled:
+            return 0
+        try:
+            with closing(self._connect()) as conn:
+                return conn.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        except sqlite3.Error:
+            return 0
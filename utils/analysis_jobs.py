@@ -0,0 +1,116 @@
+import threading
+import time
+
+# A failed job is reported to every session for this long before it may be retried
+RETRY_AFTER = 60
+
+# A finished summary is served from its job for this long (as long as analysis_cache.DEFAULT_TTL),
+# so it is not requested again when the analysis cache could not store it
+RESULT_TTL = 86400
+
+
+class AnalysisJob:
+    """
+    One AI summary being generated in a background thread.
+
+    The text is replaced as tokens stream in, so readers can render it at any
+    time; done is set once the work has finished, with either a result or an error.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.text = ""
+        self.details = None
+        self.error = None
+        self.done = False
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self._finished = threading.Event()
+
+    def update(self, text):
+        """Replace the streamed text so far."""
+        if self.first_token_at is None and text:
+            self.first_token_at = time.perf_counter()
+        self.text = text
+
+    def wait(self, timeout=None):
+        """Block until the job has finished; returns whether it has."""
+        return self._finished.wait(timeout)
+
+
+class JobRegistry:
+    """
+    Background AI jobs shared by every session in the process, at most one per key,
+    so identical concurrent requests wait on the same upstream call.
+
+    Finished jobs are kept: a result until forget(key) or RESULT_TTL, a
+    failure until RETRY_AFTER. Callers render a finished job's text rather
+    than starting a new call, whether or not the analysis cache kept it.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, key, work):
+        """
+        Return the job for key, starting it if none is running or finished recently.
+
+        Args:
+            key (str): Identifies the summary (see analysis_cache.analysis_key).
+            work: Called in a background thread with the job's update method as
+                its only argument; returns (text, details) or raises. A failure
+                is reported to every caller and only retried after RETRY_AFTER.
+        """
+        with self._lock:
+            self._drop_expired()
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            job = AnalysisJob(key)
+            self._jobs[key] = job
+
+        threading.Thread(target=self._run, args=(job, work), daemon=True).start()
+        return job
+
+    def _drop_expired(self):
+        """Forget failures older than RETRY_AFTER and results older than RESULT_TTL (called under the lock)."""
+        now = time.perf_counter()
+        expired = [
+            key for key, job in self._jobs.items()
+            if job.done and now - job.finished_at > (RETRY_AFTER if job.error is not None else RESULT_TTL)
+        ]
+        for key in expired:
+            del self._jobs[key]
+
+    def _run(self, job, work):
+        error = None
+        try:
+            text, details = work(job.update)
+        except Exception as e:
+            error = e
+        # Published together under the lock: start() reads finished_at of finished jobs
+        with self._lock:
+            job.finished_at = time.perf_counter()
+            if error is None:
+                job.text, job.details = text, details
+            job.error = error
+            job.done = True
+        job._finished.set()
+
+    def forget(self, key):
+        """Drop a finished job, e.g. to regenerate a summary or retry a failure straight away."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.done:
+                del self._jobs[key]
+
+    def __len__(self):
+        """Jobs running or finished and not yet expired."""
+        with self._lock:
+            return len(self._jobs)
+
+
+# Shared by all sessions in the process
+ANALYSIS_JOBS = JobRegistry()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Default size of the data sent to the model, in (estimated) tokens
+DEFAULT_TOKEN_BUDGET = 6000
+
+# Rough average for English text and CSV numbers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Cheap token estimate, good enough to keep a payload under budget."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def overview_section(df):
+    """Headline figures for the whole dataset."""
+    dates = df['TransactionDateTime'].dropna()
+    period = f"{dates.min():%d/%m/%Y} to {dates.max():%d/%m/%Y}" if not dates.empty else "unknown"
+    return "\n".join([
+        "## Overview",
+        f"Feedback entries: {len(df)}",
+        f"Period: {period}",
+        f"Average rating: {df['Rating'].mean():.2f} / 5",
+        f"Total revenue: ${df['TransactionValue'].sum():,.2f}",
+        f"Average transaction: ${df['TransactionValue'].mean():,.2f}",
+    ])
+
+
+def location_section(df):
+    """Reviews, rating distribution and revenue per location, as CSV."""
+    grouped = df.groupby('Location', observed=True)
+    table = pd.DataFrame({
+        'Reviews': grouped.size(),
+        'AvgRating': grouped['Rating'].mean().round(2),
+        'Revenue': grouped['TransactionValue'].sum().round(2),
+        'AvgTransaction': grouped['TransactionValue'].mean().round(2),
+    })
+    if 'Region' in df:
+        table.insert(0, 'Region', grouped['Region'].first())
+    ratings = pd.crosstab(df['Location'], df['Rating']).reindex(columns=range(1, 6), fill_value=0)
+    ratings.columns = [f"Rating{rating}" for rating in ratings.columns]
+    table = table.join(ratings).sort_values('Reviews', ascending=False)
+    return "## Per location (ratings, revenue)\n" + table.to_csv()
+
+
+def hourly_section(df):
+    """Transactions and revenue per hour of the day, for peak hour analysis."""
+    # Rows without a date have no hour and are left out of the groups
+    hours = df['TransactionDateTime'].dt.hour.astype('Int64').rename('Hour')
+    table = df['TransactionValue'].groupby(hours).agg(Transactions='size', Revenue='sum').round(2)
+    return "## Transactions by hour of day (from Transaction date and time)\n" + table.to_csv()
+
+
+def _representative_comments(df, seed=0):
+    """
+    Distinct non-empty comments, interleaved across rating levels so low
+    ratings are represented alongside the far more common 5-star ones.
+    """
+    comments = df.loc[df['Comment'].fillna('').str.strip() != '', ['Location', 'Rating', 'Comment']]
+    normalized = comments['Comment'].str.lower().str.split().str.join(' ')
+    comments = comments[~normalized.duplicated()]
+
+    rng = np.random.default_rng(seed)
+    shuffled = comments.iloc[rng.permutation(len(comments))]
+    # Position of each comment within its rating level; sorting by it takes one comment per level in turn
+    turn = shuffled.groupby('Rating').cumcount()
+    return shuffled.assign(_turn=turn.to_numpy()).sort_values(['_turn', 'Rating'], kind='stable').drop(columns='_turn')
+
+
+def build_analysis_payload(df, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Build a compact digest of the dataset for the AI summary instead of the full CSV.
+
+    Aggregates (overview, per-location ratings and revenue, hourly transactions)
+    always come first; representative comments then fill the remaining budget.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        token_budget (int): Approximate maximum size of the payload in tokens.
+
+    Returns:
+        str: The payload text.
+    """
+    sections = [overview_section(df), location_section(df), hourly_section(df)]
+    used = estimate_tokens("\n\n".join(sections))
+
+    lines = ["## Sample of customer comments (Location, Rating, Comment)"]
+    used += estimate_tokens(lines[0])
+    for row in _representative_comments(df).itertuples(index=False):
+        line = f"{row.Location} | {row.Rating} | {' '.join(str(row.Comment).split())}"
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            # A shorter comment may still fit
+            if token_budget - used < 20:
+                break
+            continue
+        lines.append(line)
+        used += cost
+    sections.append("\n".join(lines))
+
+    return "\n\n".join(sections)
@@ -0,0 +1,114 @@
+import bisect
+import threading
+
+import numpy as np
+
+from utils.data_cache import dataset_version
+from utils.instrumentation import span
+from utils.view_cache import VIEW_CACHE
+
+
+class ColumnIndex:
+    """
+    Sorted index over a numeric or datetime column.
+
+    The row positions are argsorted by value once (stable, missing values
+    last), so rows with values in a range are a contiguous slice of that
+    ordering, found by binary search, and any page of the rows sorted by the
+    column is a slice as well. Only the ordering is stored: the values are
+    read from the column itself.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind == "M":
+            missing = np.isnat(values)
+            self.keys = values.view("i8")
+        elif values.dtype.kind == "f":
+            missing = np.isnan(values)
+            self.keys = values
+        else:
+            missing = None
+            self.keys = values
+        self.dtype = values.dtype
+        self.n_valid = len(values) - (int(missing.sum()) if missing is not None else 0)
+
+        # NaN and NaT sort last
+        position_type = np.int32 if len(values) < 2**31 else np.int64
+        self.order = np.argsort(values, kind="stable").astype(position_type, copy=False)
+        self._rank = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.order)
+
+    def key(self, value):
+        """A filter value (number or timestamp) as a key comparable with the column's."""
+        if self.dtype.kind == "M":
+            return np.array([value], dtype=self.dtype).view("i8")[0]
+        return value
+
+    def bounds(self, lo=None, hi=None, hi_inclusive=True):
+        """order[a:b] holds the rows with lo <= value <= hi (< hi if not hi_inclusive); None is open-ended."""
+        def value_at(position):
+            return self.keys[position]
+
+        a = 0 if lo is None else bisect.bisect_left(self.order, self.key(lo), 0, self.n_valid, key=value_at)
+        if hi is None:
+            b = self.n_valid
+        else:
+            search = bisect.bisect_right if hi_inclusive else bisect.bisect_left
+            b = search(self.order, self.key(hi), a, self.n_valid, key=value_at)
+        return a, b
+
+    def in_range(self, positions, lo=None, hi=None, hi_inclusive=True):
+        """Whether the value at each position is within the range (missing values never are)."""
+        values = self.keys[positions]
+        # An open lower end still leaves missing values out (NaT is the smallest int64)
+        lo_key = self.key(lo) if lo is not None else self.keys[self.order[0]] if self.n_valid else 0
+        mask = values >= lo_key
+        if hi is not None:
+            mask &= values <= self.key(hi) if hi_inclusive else values < self.key(hi)
+        return mask
+
+    @property
+    def rank(self):
+        """Position of each row in the sorted order, built on first use."""
+        with self._lock:
+            if self._rank is None:
+                rank = np.empty_like(self.order)
+                rank[self.order] = np.arange(len(self.order), dtype=self.order.dtype)
+                self._rank = rank
+            return self._rank
+
+    def ordered(self, start, stop, ascending=True):
+        """
+        Rows start..stop of the column sorted ascending or descending, with
+        missing values last either way.
+        """
+        n_valid = self.n_valid
+        if ascending:
+            valid = self.order[min(start, n_valid):min(stop, n_valid)]
+        else:
+            valid = self.order[max(n_valid - stop, 0):max(n_valid - start, 0)][::-1]
+        if stop <= n_valid:
+            return valid
+        missing = self.order[n_valid + max(start - n_valid, 0):n_valid + (stop - n_valid)]
+        return np.concatenate([valid, missing])
+
+    def sort_positions(self, positions, ascending=True):
+        """The given rows sorted by the column, missing values last."""
+        ranks = np.sort(self.rank[positions])
+        if not ascending:
+            split = np.searchsorted(ranks, self.n_valid)
+            ranks = np.concatenate([ranks[:split][::-1], ranks[split:]])
+        return self.order[ranks]
+
+
+def get_column_index(df, column):
+    """The ColumnIndex of a column of a cleaned dataset, built once per dataset version."""
+    def build():
+        with span("column_index.build", rows=len(df)):
+            return ColumnIndex(df[column].to_numpy())
+
+    return VIEW_CACHE.get_or_compute(("column_index", dataset_version(df), column), build)
@@ -0,0 +1,324 @@
+import argparse
+import math
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from utils.data_cache import dataset_version
+from utils.data_source import load_data_source, source_cache_dir, source_name
+from utils.instrumentation import span
+from utils.view_cache import VIEW_CACHE
+
+# Offline scoring of feedback comments: a sentiment between -1 and 1 and a set
+# of topic tags per comment, from the word lists below (no model, no network).
+# Scores are kept on disk per FeedbackID, so each comment is scored once.
+
+# Bump when the word lists or the scoring rules change so cached scores are not reused
+SCORER_VERSION = 2
+
+# Topic tags, in display order; a comment gets every topic one of its words belongs to
+TOPICS = {
+    "Coffee & drinks": {
+        "coffee", "coffees", "latte", "lattes", "flat", "cappuccino", "mocha", "mochas", "espresso", "tea",
+        "chai", "chocolate", "drink", "drinks", "cup", "cups", "barista", "baristas", "milk", "iced", "smoothie",
+        "smoothies", "juice",
+    },
+    "Food": {
+        "food", "scone", "scones", "muffin", "muffins", "cake", "cakes", "slice", "slices", "cabinet", "menu",
+        "breakfast", "lunch", "meal", "meals", "salad", "eggs", "toast", "sandwich", "sandwiches", "savoury",
+        "cheese", "gluten", "gf", "pie", "pies", "bacon", "brunch", "fresh", "tasty", "delicious", "yummy",
+    },
+    "Service & staff": {
+        "service", "staff", "team", "friendly", "helpful", "polite", "welcome", "welcoming", "smile", "smiles",
+        "smiling", "barista", "customer", "served", "serving", "rude", "unfriendly", "attentive", "manager",
+        "girls", "guys", "lady", "waitress", "waiter",
+    },
+    "Speed": {
+        "quick", "quickly", "fast", "prompt", "promptly", "efficient", "slow", "wait", "waited", "waiting",
+        "queue", "late", "delay", "delayed", "busy", "speed", "minutes",
+    },
+    "Price & value": {
+        "price", "prices", "priced", "expensive", "overpriced", "cheap", "value", "cost", "costs",
+        "discount", "loyalty", "dollars", "pricey", "affordable", "money",
+    },
+    "Atmosphere": {
+        "atmosphere", "clean", "dirty", "environment", "place", "garden", "table", "tables", "music", "noisy",
+        "quiet", "cosy", "cozy", "space", "spacious", "surroundings", "decor", "warm", "warmer", "cold",
+        "heater", "seating", "toilet", "toilets", "view",
+    },
+}
+TOPIC_NAMES = list(TOPICS)
+
+
+def _topic_masks():
+    """Bit mask of the topics of every topic word."""
+    masks = {}
+    for bit, name in enumerate(TOPIC_NAMES):
+        for word in TOPICS[name]:
+            masks[word] = masks.get(word, 0) | 1 << bit
+    return masks
+
+
+_TOPIC_MASKS = _topic_masks()
+
+# Word polarities; words missing from the list count as neutral
+SENTIMENT_WORDS = {
+    **dict.fromkeys([
+        "good", "nice", "lovely", "friendly", "helpful", "pleasant", "polite", "clean", "quick", "fast", "fresh",
+        "hot", "tasty", "happy", "efficient", "prompt", "welcoming", "welcome", "enjoy", "enjoyed", "like",
+        "thanks", "thank", "thankyou", "yummy", "smile", "smiles", "smiling", "warm", "well", "better", "cosy",
+        "spacious", "recommend", "attentive", "favourite", "favorite", "beautiful", "consistent", "consistently",
+    ], 1.5),
+    **dict.fromkeys([
+        "great", "excellent", "amazing", "awesome", "delicious", "love", "loved", "wonderful", "fantastic",
+        "fabulous", "perfect", "best", "exceptional", "outstanding", "brilliant", "superb", "stunning",
+    ], 2.5),
+    **dict.fromkeys([
+        "slow", "cold", "lukewarm", "wait", "waiting", "waited", "busy", "noisy", "small", "expensive", "messy",
+        "late", "wrong", "forgot", "forgotten", "missing", "empty", "bland", "average", "sorry", "confused",
+        "overpriced", "pricey", "stale", "sticky", "dry", "weak", "bitter", "burnt", "crowded", "complaint",
+        "complaints",
+    ], -1.5),
+    **dict.fromkeys([
+        "bad", "poor", "rude", "dirty", "disappointing", "disappointed", "unfriendly", "unhelpful", "ignored",
+        "grumpy", "terrible", "awful", "horrible", "worst", "disgusting", "unacceptable", "inedible",
+    ], -2.5),
+}
+
+# Words that flip the polarity of the next few words ("not friendly") in the same clause; apostrophes are dropped
+NEGATIONS = frozenset([
+    "not", "no", "never", "nothing", "none", "nobody", "without", "hardly", "isnt", "wasnt", "arent", "werent", "dont",
+    "didnt", "doesnt", "cant", "couldnt", "wont", "wouldnt", "shouldnt", "aint",
+])
+NEGATION_SCOPE = 3
+NEGATION_FACTOR = -0.75
+
+# Words that strengthen the next one ("very friendly")
+INTENSIFIERS = {
+    "very": 1.5, "so": 1.3, "really": 1.4, "super": 1.5, "extremely": 1.7, "always": 1.2, "absolutely": 1.6,
+    "too": 1.3, "bit": 0.6, "little": 0.7, "slightly": 0.6, "quite": 0.9,
+}
+
+# Sentiment above (below minus) this counts as positive (negative)
+SENTIMENT_THRESHOLD = 0.05
+
+# Squashes the summed polarity into -1..1 (as in VADER)
+_NORMALISATION = 15
+
+# Distinct comments per task sent to a worker process
+BATCH_SIZE = 20_000
+
+# Below this many distinct comments to score they are scored in-process: starting workers costs more than it saves
+PARALLEL_MIN_COMMENTS = 50_000
+
+# Words, and the punctuation ending a clause or sentence, where negations and intensifiers stop
+_WORD_OR_BREAK = re.compile(r"[^\W_]+|[.,;:!?()]")
+
+
+def score_comment(text):
+    """
+    (sentiment, topics) of one comment: sentiment from -1 (negative) to 1
+    (positive), NaN without a comment, and topics as a bit mask over
+    TOPIC_NAMES.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return math.nan, 0
+    words = _WORD_OR_BREAK.findall(text.lower().replace("'", "").replace("’", ""))
+    total = 0.0
+    topics = 0
+    negated = 0
+    boost = 1.0
+    for word in words:
+        if not word.isalnum():
+            # "No complaints, great coffee": the clause ends the negation
+            negated = 0
+            boost = 1.0
+            continue
+        topics |= _TOPIC_MASKS.get(word, 0)
+        if word in NEGATIONS:
+            negated = NEGATION_SCOPE
+            continue
+        if word in INTENSIFIERS:
+            boost *= INTENSIFIERS[word]
+            continue
+        polarity = SENTIMENT_WORDS.get(word)
+        if polarity is not None:
+            total += polarity * boost * (NEGATION_FACTOR if negated else 1)
+        boost = 1.0
+        negated = max(negated - 1, 0)
+    return total / math.sqrt(total * total + _NORMALISATION), topics
+
+
+def score_batch(texts):
+    """Scores of a list of comments, as float32 sentiments and uint8 topic masks (runs in worker processes)."""
+    sentiment = np.empty(len(texts), dtype=np.float32)
+    topics = np.empty(len(texts), dtype=np.uint8)
+    for i, text in enumerate(texts):
+        sentiment[i], topics[i] = score_comment(text)
+    return sentiment, topics
+
+
+def score_texts(texts, workers=None):
+    """
+    Score a list of comments, in parallel across processes.
+
+    Args:
+        workers (int): Worker processes. By default one per BATCH_SIZE comments
+            up to the CPU count, or none (score in this process) below
+            PARALLEL_MIN_COMMENTS comments.
+
+    Returns:
+        tuple: Sentiments, topic masks and the number of processes used.
+    """
+    if workers is None:
+        workers = min(-(-len(texts) // BATCH_SIZE), os.cpu_count() or 1) if len(texts) >= PARALLEL_MIN_COMMENTS else 1
+    if workers <= 1 or len(texts) <= BATCH_SIZE:
+        return (*score_batch(texts), 1)
+
+    batches = [texts[start:start + BATCH_SIZE] for start in range(0, len(texts), BATCH_SIZE)]
+    # Spawned workers do not inherit the threads of a running Streamlit server
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        results = list(pool.map(score_batch, batches))
+    return np.concatenate([s for s, _ in results]), np.concatenate([t for _, t in results]), workers
+
+
+def default_scores_path(source):
+    """Score cache next to the cleaned data cache of a data source (file, directory or glob)."""
+    return source_cache_dir(source) / f"{source_name(source)}.scores-v{SCORER_VERSION}.feather"
+
+
+def _read_scores(path):
+    """The cached scores sorted by FeedbackID, or None when there are none."""
+    try:
+        cached = feather.read_feather(path)
+    except (OSError, ValueError):
+        return None
+    return cached if list(cached.columns) == ["FeedbackID", "CommentHash", "Sentiment", "Topics"] else None
+
+
+def _write_scores(scores, path):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Through a temporary file so other processes never read a half-written cache
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        feather.write_feather(scores, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only deployment still gets this process's scores
+        pass
+
+
+class CommentScores:
+    """
+    Sentiment and topic mask of every row of a dataset, aligned with its rows
+    (NaN sentiment for rows without a comment), plus stats on the run that
+    produced them: rows taken from the cache, rows and distinct comments
+    scored, processes used, seconds and comments per second per core.
+    """
+
+    def __init__(self, sentiment, topics, stats):
+        self.sentiment = sentiment
+        self.topics = topics
+        self.stats = stats
+
+    def __len__(self):
+        return len(self.sentiment)
+
+    def has_topic(self, topic):
+        """Whether each row's comment is tagged with the topic (a name from TOPIC_NAMES)."""
+        return (self.topics >> TOPIC_NAMES.index(topic)) & 1 == 1
+
+
+def score_dataset(df, path=None, workers=None):
+    """
+    Score the comments of a cleaned dataset, reusing the scores cached in path.
+
+    A cached score is reused when its FeedbackID is in the data with the same
+    comment (compared by hash), so only new or edited feedback is scored, each
+    distinct comment once. Rows without a FeedbackID cannot be cached and are
+    scored on every run. The cache is rewritten with the new scores.
+    """
+    started = time.perf_counter()
+    ids = df['FeedbackID'].to_numpy(dtype=np.float64, na_value=np.nan)
+    hashes = pd.util.hash_pandas_object(df['Comment'], index=False).to_numpy()
+    sentiment = np.full(len(df), np.nan, dtype=np.float32)
+    topics = np.zeros(len(df), dtype=np.uint8)
+
+    cached = _read_scores(path) if path is not None else None
+    hit = np.zeros(len(df), dtype=bool)
+    if cached is not None and len(cached):
+        cached_ids = cached['FeedbackID'].to_numpy()
+        at = np.searchsorted(cached_ids, ids).clip(max=len(cached_ids) - 1)
+        hit = (cached_ids[at] == ids) & (cached['CommentHash'].to_numpy()[at] == hashes)
+        sentiment[hit] = cached['Sentiment'].to_numpy()[at[hit]]
+        topics[hit] = cached['Topics'].to_numpy()[at[hit]]
+
+    # Each distinct comment of the rows left is scored once
+    missing = np.flatnonzero(~hit)
+    codes, uniques = pd.factorize(df['Comment'].iloc[missing])
+    with span("comment_scores.score", rows=len(missing)):
+        scored_at = time.perf_counter()
+        unique_sentiment, unique_topics, used = score_texts(uniques.tolist(), workers)
+        seconds = time.perf_counter() - scored_at
+    commented = codes >= 0
+    sentiment[missing[commented]] = unique_sentiment[codes[commented]]
+    topics[missing[commented]] = unique_topics[codes[commented]]
+
+    new = missing[~np.isnan(ids[missing])]
+    if path is not None and len(new):
+        scores = pd.DataFrame({
+            "FeedbackID": ids[new], "CommentHash": hashes[new], "Sentiment": sentiment[new], "Topics": topics[new],
+        })
+        if cached is not None:
+            scores = pd.concat([cached, scores], ignore_index=True)
+        scores = scores.drop_duplicates("FeedbackID", keep="last").sort_values("FeedbackID", ignore_index=True)
+        _write_scores(scores, Path(path))
+
+    return CommentScores(sentiment, topics, {
+        "rows": len(df),
+        "cached": int(hit.sum()),
+        "scored": len(missing),
+        "distinct": len(uniques),
+        "workers": used,
+        "seconds": seconds,
+        "total_seconds": time.perf_counter() - started,
+        "per_core": len(uniques) / (seconds * used) if len(uniques) and seconds else None,
+    })
+
+
+def get_comment_scores(df, source):
+    """The CommentScores of a cleaned dataset, computed once per dataset version and cached on disk per FeedbackID."""
+    return VIEW_CACHE.get_or_compute(
+        ("comment_scores", dataset_version(df)),
+        lambda: score_dataset(df, default_scores_path(source)),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the sentiment and topics of every feedback comment into the score cache.")
+    parser.add_argument("--data", default="data/CafeData.csv", help="data source the dashboard loads: a file, directory or glob")
+    parser.add_argument("--output", help="score cache file, defaults to the one the dashboard uses")
+    parser.add_argument("--workers", type=int, help="worker processes, by default one per CPU for large batches")
+    args = parser.parse_args()
+
+    df = load_data_source(args.data)
+    output = Path(args.output) if args.output else default_scores_path(args.data)
+    stats = score_dataset(df, output, args.workers).stats
+    rate = f", {stats['per_core']:,.0f} comments/s per core" if stats["per_core"] else ""
+    print(
+        f"{stats['rows']:,} rows: {stats['cached']:,} cached, {stats['scored']:,} scored "
+        f"({stats['distinct']:,} distinct comments) in {stats['seconds']:.2f}s on {stats['workers']} "
+        f"process{'es' if stats['workers'] > 1 else ''}{rate}; scores in {output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_cache import dataset_version
+from utils.instrumentation import span
+from utils.location_index import get_location_index, selected_locations
+from utils.locations import REGION_LOCATIONS
+from utils.metrics import top_k_positions
+from utils.text_index import get_text_index, query_terms
+from utils.transactions import PAGE_SIZE, take
+from utils.view_cache import QUERY_CACHE
+
+# Keyword search over the feedback comments (see utils.text_index), shown
+# below the feedback cards. No Streamlit imports; results are cached in
+# QUERY_CACHE unless another cache is passed.
+
+# Columns of the feedback search results, in display order
+SEARCH_COLUMNS = ['TransactionDateTime', 'Location', 'Rating', 'Comment', 'FeedbackID']
+
+
+def _rank_matches(scores, dates, last):
+    """
+    Indexes of the `last` best matches: highest score first, newest first
+    among equal scores (missing dates last). A partial selection, so the cost
+    is linear in the number of matches.
+    """
+    if len(scores) > last:
+        threshold = np.partition(scores, len(scores) - last)[len(scores) - last]
+        better = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)
+        tied = tied[top_k_positions(dates[tied], last - len(better))]
+        chosen = np.concatenate([better, tied])
+    else:
+        chosen = np.arange(len(scores))
+    # NaT is the smallest int64, so its complement sorts last
+    order = np.lexsort((~dates[chosen].view("i8"), -scores[chosen]))
+    return chosen[order]
+
+
+def comment_search(df, query, region="All", location="All", ratings=None, page=0, page_size=PAGE_SIZE,
+                   cache=QUERY_CACHE):
+    """
+    One page of the feedback whose comment holds every word of the query,
+    best match first (BM25, see TextIndex), within a region/location and
+    rating selection.
+
+    Only the rows holding the rarest query word are visited, so a query costs
+    O(matches) rather than a scan of every comment.
+
+    Args:
+        query (str): Keywords; case, punctuation and stopwords are ignored.
+        ratings (tuple): Lowest and highest rating, None for any.
+        page (int): Zero-based page number.
+
+    Returns:
+        dict: "rows" (DataFrame of the page with a Score column), "total"
+        (matching rows), "page", "pages" and "terms" (the words searched for).
+    """
+    terms = query_terms(query)
+    locations = selected_locations(REGION_LOCATIONS, region, location)
+    ratings = None if ratings is None else tuple(ratings)
+
+    def build():
+        with span("comment_search") as s:
+            positions, scores = get_text_index(df).search(terms)
+            mask = np.ones(len(positions), dtype=bool)
+            if locations is not None:
+                mask &= get_location_index(df).contains(positions, locations)
+            if ratings is not None:
+                rated = df['Rating'].to_numpy()[positions]
+                mask &= (rated >= ratings[0]) & (rated <= ratings[1])
+            positions, scores = positions[mask], scores[mask]
+            total = len(positions)
+
+            pages = max(-(-total // page_size), 1)
+            current = min(max(page, 0), pages - 1)
+            first, last = current * page_size, min((current + 1) * page_size, total)
+            ranked = _rank_matches(scores, df['TransactionDateTime'].to_numpy()[positions], last)[first:last]
+            s["rows"] = total
+
+        rows = pd.DataFrame({column: take(df[column], positions[ranked]) for column in SEARCH_COLUMNS})
+        rows['Score'] = scores[ranked].round(2)
+        return {"rows": rows, "total": total, "page": current, "pages": pages, "terms": terms}
+
+    return cache.get_or_compute(
+        ("comment_search", dataset_version(df), terms, region, location, ratings, page, page_size),
+        build,
+    )
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from utils.data_loader import load_cafe_data
+from utils.instrumentation import span
+from utils.locations import concat_encoded, encode_locations
+
+# Bump when the cleaning rules change so old cache files are not reused
+CACHE_VERSION = 4
+
+
+def file_fingerprint(filepath, prefix_size=None):
+    """
+    Return the size, modification time and content hash of a file, plus the
+    position just after its last newline ("line_end", 0 without one) and the
+    hash of the bytes before it ("line_end_hash"): the part of the file made
+    of complete lines.
+
+    When prefix_size is given, the hash of the first prefix_size bytes is
+    returned as well ("prefix_hash"). Everything is computed in one pass over
+    the file.
+    """
+    stat = os.stat(filepath)
+    digest = hashlib.blake2b(digest_size=16)
+    prefix_hash = digest.hexdigest() if prefix_size == 0 else None
+    line_end, line_end_hash = 0, digest.hexdigest()
+    position = 0
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            # Snapshot the running hash exactly at the prefix boundary and after the block's last newline
+            cuts = {}
+            if prefix_size is not None and position < prefix_size <= position + len(block):
+                cuts[prefix_size - position] = "prefix"
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                cuts[newline + 1] = cuts.get(newline + 1, "") + "line"
+            done = 0
+            for cut in sorted(cuts):
+                digest.update(block[done:cut])
+                done = cut
+                snapshot = digest.copy().hexdigest()
+                if "prefix" in cuts[cut]:
+                    prefix_hash = snapshot
+                if "line" in cuts[cut]:
+                    line_end, line_end_hash = position + cut, snapshot
+            digest.update(block[done:])
+            position += len(block)
+    fingerprint = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest.hexdigest(),
+        "line_end": line_end,
+        "line_end_hash": line_end_hash,
+    }
+    if prefix_size is not None:
+        fingerprint["prefix_hash"] = prefix_hash
+    return fingerprint
+
+
+def default_cache_dir(filepath):
+    """Cache files live in a hidden folder next to the source CSV."""
+    return Path(filepath).parent / ".cache"
+
+
+def cache_paths(filepath, cache_dir=None):
+    """Paths of the Feather file with the cleaned data and its JSON metadata."""
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(filepath)
+    stem = Path(filepath).stem
+    return cache_dir / f"{stem}.feather", cache_dir / f"{stem}.json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    return meta
+
+
+def cache_looks_current(filepath, cache_dir=None):
+    """
+    Whether the cache of filepath was written for a file of the same size and
+    modification time: a cheap check to skip work up front, the content hash
+    is still verified when the cache is loaded.
+    """
+    meta = _read_meta(cache_paths(filepath, cache_dir)[1])
+    if meta is None:
+        return False
+    stat = os.stat(filepath)
+    return meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns
+
+
+def _last_feedback_id(df):
+    """FeedbackID of the last ingested row, None when there is none (NaN is not valid JSON)."""
+    if df.empty or pd.isna(df["FeedbackID"].iloc[-1]):
+        return None
+    return float(df["FeedbackID"].iloc[-1])
+
+
+def _read_frame(data_path, meta):
+    """Memory-map the cached frame, or return None if it does not match its metadata."""
+    try:
+        df = feather.read_table(data_path, memory_map=True).to_pandas()
+    except OSError:
+        # Missing, corrupt or partially written cache file
+        return None
+    # Guard against a data file and metadata written by different processes
+    if len(df) != meta["rows"] or _last_feedback_id(df) != meta["last_feedback_id"]:
+        return None
+    return df
+
+
+def _atomic_write(path, write):
+    """Write to a temporary file first so readers never see a half-written cache."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_cache(df, fingerprint, data_path, meta_path, offset_rows):
+    """
+    Write the cleaned frame and its metadata. offset is where the complete
+    lines of the CSV end and offset_rows how many rows came from them: a row
+    after offset may still be being written, it is parsed again on the next append.
+    """
+    meta = {
+        "version": CACHE_VERSION,
+        "size": fingerprint["size"],
+        "mtime_ns": fingerprint["mtime_ns"],
+        "hash": fingerprint["hash"],
+        "offset": fingerprint["line_end"],
+        "offset_hash": fingerprint["line_end_hash"],
+        "offset_rows": offset_rows,
+        "rows": len(df),
+        "last_feedback_id": _last_feedback_id(df),
+    }
+    try:
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(data_path, lambda p: feather.write_feather(df, p, compression="uncompressed"))
+        _atomic_write(meta_path, lambda p: p.write_text(json.dumps(meta), encoding="utf-8"))
+    except OSError:
+        # A read-only deployment can still serve the freshly cleaned data
+        pass
+
+
+def _load_lines(filepath, offset, fingerprint):
+    """
+    Clean the rows from offset to the end of the file, split at the end of
+    its complete lines (see file_fingerprint).
+
+    Returns:
+        tuple: The cleaned rows, and how many of them came from complete lines.
+    """
+    line_end = max(fingerprint["line_end"], offset)
+    complete = load_cafe_data(filepath, offset=offset, end=line_end)
+    if fingerprint["size"] <= line_end:
+        return complete, len(complete)
+    # The last line has no newline yet: it is kept, but parsed again once it is complete
+    partial = load_cafe_data(filepath, offset=line_end, end=fingerprint["size"])
+    return pd.concat([complete, partial], ignore_index=True), len(complete)
+
+
+def _with_version(df, fingerprint):
+    """Tag the frame with the content hash it was built from, see dataset_version."""
+    df.attrs["version"] = f"{CACHE_VERSION}-{fingerprint['hash']}"
+    df.attrs["rows"] = len(df)
+    return df
+
+
+def dataset_version(df):
+    """
+    Return a short string identifying the contents of a cleaned dataset, for
+    use as a cache key by anything derived from it.
+
+    Frames from load_cached_cafe_data carry the hash of their source file;
+    for any other frame the rows are hashed. pandas copies attrs onto filtered
+    frames, so the tag is only trusted while the row count still matches.
+    """
+    version = df.attrs.get("version")
+    if version is None or df.attrs.get("rows") != len(df):
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        version = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+    return version
+
+
+def load_cached_cafe_data(filepath, cache_dir=None, incremental=True):
+    """
+    Load the cleaned CafeData, reusing a columnar copy on disk when the source
+    CSV has not changed since it was written.
+
+    The cache file is memory-mapped on a warm start, so the repair logic in
+    load_cafe_data only runs when the source file is new or has changed.
+    Location and Region are stored as categoricals (see utils.locations).
+
+    Args:
+        filepath: Path to the CSV file.
+        cache_dir: Folder for the cache files, defaults to a .cache folder next to the CSV.
+        incremental (bool): When rows have only been appended to the CSV since
+            the cache was written, parse just the new tail and append it to the
+            cached frame instead of reloading the whole file.
+    """
+    data_path, meta_path = cache_paths(filepath, cache_dir)
+    meta = _read_meta(meta_path)
+
+    with span("data.fingerprint"):
+        fingerprint = file_fingerprint(filepath, meta["offset"] if meta else None)
+
+    if meta:
+        unchanged = fingerprint["size"] == meta["size"] and fingerprint["hash"] == meta["hash"]
+        # The file only grew and every complete line already ingested is byte-for-byte the same
+        appended = (
+            incremental
+            and fingerprint["size"] > meta["size"]
+            and fingerprint["prefix_hash"] == meta["offset_hash"]
+        )
+
+        if unchanged or appended:
+            with span("data.read_cache") as s:
+                cached = _read_frame(data_path, meta)
+                s["rows"] = len(cached) if cached is not None else 0
+            if cached is not None:
+                if unchanged:
+                    return _with_version(cached, fingerprint)
+
+                with span("data.append_tail") as s:
+                    # Rows from a last line without a newline are dropped and parsed again
+                    base_rows = meta["offset_rows"]
+                    tail, tail_rows = _load_lines(filepath, meta["offset"], fingerprint)
+                    df = concat_encoded([cached.iloc[:base_rows], encode_locations(tail)])
+                    _write_cache(df, fingerprint, data_path, meta_path, base_rows + tail_rows)
+                    s["rows"] = len(tail)
+                # Lets derived data built for the previous version be extended with just the new rows
+                # (only when it did not include a partial last line, see get_revenue_engine)
+                df.attrs["base_version"] = f"{CACHE_VERSION}-{meta['hash']}"
+                df.attrs["base_rows"] = base_rows
+                return _with_version(df, fingerprint)
+
+    # First load, truncated or rewritten file: rebuild from scratch
+    with span("data.full_load") as s:
+        df, offset_rows = _load_lines(filepath, 0, fingerprint)
+        df = encode_locations(df)
+        _write_cache(df, fingerprint, data_path, meta_path, offset_rows)
+        s["rows"] = len(df)
+    return _with_version(df, fingerprint)
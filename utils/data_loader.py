@@ -1,79 +1,196 @@
+import io
+
+import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+COLUMNS = [
+    "Location",
+    "Rating",
+    "Comment",
+    "TransactionDateTime",
+    "TransactionValue",
+    "FeedbackID"
+]
+
+# Column types of a load that produced no rows
+EMPTY_DTYPES = {
+    "Location": "str",
+    "Rating": "int64",
+    "Comment": "str",
+    "TransactionDateTime": "datetime64[us]",
+    "TransactionValue": "float64",
+    "FeedbackID": "float64"
+}
+
+# Rows are streamed through the C tokenizer in chunks of this many lines
+CHUNK_SIZE = 100_000
+
+
+def _compact_fields(raw):
+    """
+    Drop empty cells from every row and shift the remaining values left,
+    the vectorized equivalent of row.dropna().tolist() for each row.
+
+    Returns the compacted object array and the number of values per row.
+    """
+    values = raw.to_numpy(dtype=object)
+    present = raw.notna().to_numpy()
+    # A stable argsort of the "missing" flags moves present cells to the front in their original order
+    order = np.argsort(~present, axis=1, kind="stable")
+    compact = np.take_along_axis(values, order, axis=1)
+    return compact, present.sum(axis=1)
+
+
+def _repair_chunk(raw):
+    """
+    Apply the row repair rules to a chunk of raw string fields and return a
+    DataFrame of the six output columns (still as strings).
+    """
+    compact, counts = _compact_fields(raw)
+    width = compact.shape[1]
+
+    def field(i):
+        # Columns past the file width can only be selected by rows that do not have them
+        if i < width:
+            return compact[:, i]
+        return np.full(len(compact), None, dtype=object)
+
+    is5 = counts == 5
+    is6 = counts == 6
+    is7 = counts == 7
+    is8 = counts == 8
+
+    # Rows with any other number of fields cannot be mapped to the output columns
+    keep = is5 | is6 | is7 | is8
+
+    location = field(0)
+    rating = field(1)
+    comment = np.where(is5, "", field(2))
+    date = np.select([is5, is8], [field(2), field(4)], default=field(3))
+    value = np.select([is5, is8], [field(3), field(5)], default=field(4))
+    feedback_id = np.select([is5, is6, is7, is8], [field(4), field(5), field(6), field(7)], default=None)
+
+    if is7.any():
+        # Special 7-field rows: blank out unparseable dates and zero out outlier values
+        dates7 = pd.to_datetime(pd.Series(date[is7], dtype=object), errors="coerce", format="mixed")
+        date[is7] = np.where(dates7.isna().to_numpy(), None, date[is7])
+
+        values7 = pd.Series(value[is7], dtype=object).astype(str).str.replace("$", "", regex=False).str.replace(",", "", regex=False)
+        amounts7 = pd.to_numeric(values7, errors="coerce")
+        outlier = (amounts7.isna() | (amounts7 > 1000)).to_numpy()
+        value[is7] = np.where(outlier, "0", value[is7])
+
+    return pd.DataFrame({
+        "Location": location[keep],
+        "Rating": rating[keep],
+        "Comment": comment[keep],
+        "TransactionDateTime": date[keep],
+        "TransactionValue": value[keep],
+        "FeedbackID": feedback_id[keep],
+    })
+
+
+def _convert_types(chunk, date_format):
+    """Convert the repaired string columns to their final types."""
+    chunk['TransactionDateTime'] = pd.to_datetime(chunk['TransactionDateTime'], dayfirst=True, errors='coerce', format=date_format)
+    chunk['TransactionValue'] = pd.to_numeric(chunk['TransactionValue'].astype(str).str.replace('$', '', regex=False), errors='coerce')
+    chunk['Rating'] = pd.to_numeric(chunk['Rating'], errors='coerce')
+    chunk['FeedbackID'] = pd.to_numeric(chunk['FeedbackID'], errors='coerce').astype('float64')
+    chunk['Location'] = chunk['Location'].astype(str).str.strip()
+    return chunk
 
-def load_cafe_data(filepath):
+
+def _infer_date_format(dates):
+    """
+    Guess the date format from the first non-empty date, the same way
+    pd.to_datetime does for a whole column, so every chunk is parsed alike.
+    """
+    first = dates.dropna()
+    if first.empty:
+        return None
+    return guess_datetime_format(str(first.iloc[0]), dayfirst=True) or "mixed"
+
+
+def _read_header_width(filepath):
+    """The header line decides how many fields a row can have."""
+    return pd.read_csv(filepath, header=None, nrows=1, dtype=str).shape[1]
+
+
+def _head_date_format(filepath, width, nrows=1000):
+    """Infer the date format from the first rows of the file."""
+    head = pd.read_csv(filepath, header=None, names=range(width), skiprows=1, nrows=nrows, dtype=str)
+    return _infer_date_format(_repair_chunk(head)['TransactionDateTime'])
+
+
+class _LimitedReader(io.RawIOBase):
+    """Read-only view of a binary file that stops at a fixed byte position."""
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._end - self._f.tell())
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def load_cafe_data(filepath, chunksize=CHUNK_SIZE, offset=0, end=None):
     """
     Load the CafeData CSV, clean irregular rows, and return a consistent DataFrame.
+
+    The file is streamed in chunks and every repair rule is applied to whole
+    columns at once, so memory stays bounded by the chunk size plus the result.
+
+    Args:
+        filepath: Path to the CSV file.
+        chunksize (int): Number of rows parsed per chunk.
+        offset (int): Byte position to start reading from. Must be the start of
+            a row after the header; used to ingest rows appended since the last load.
+        end (int): Byte position to stop reading at, so rows written while the
+            file is being loaded are left for the next load. Defaults to the end of the file.
     """
 
-    df_raw = pd.read_csv(filepath, header=None, engine="python")
-    
-    cleaned_rows = []
-
-    # Process each row, skipping the header
-    for _, row in df_raw.iloc[1:].iterrows():
-        # Drop empty cells (from trailing commas)
-        values = row.dropna().tolist()
-        
-        if len(values) == 6:
-            cleaned = values
-        elif len(values) == 5:
-            cleaned = [
-                values[0],  # Location
-                values[1],  # Rating
-                "",  # Comment
-                values[2],  # TransactionDateTime
-                values[3],  # TransactionValue
-                values[4]   # FeedbackID
-            ]
-        elif len(values) == 7:
-            if pd.to_datetime(values[3], errors='coerce') is pd.NaT:
-                values[3] = None # Replace invalid date with None
-
-            # Handle potential outlier value in the value field (values[4])
-            try:
-                transaction_value_str = str(values[4]).replace('$', '').replace(',', '')
-                transaction_value = float(transaction_value_str)
-                if transaction_value > 1000:
-                    values[4] = '0'
-            except (ValueError, IndexError):
-                # If conversion fails or index is wrong, treat as outlier
-                values[4] = '0'
-            cleaned = [
-                values[0],  # Location
-                values[1],  # Rating
-                values[2],  # Comment
-                values[3],  # TransactionDateTime
-                values[4],  # TransactionValue
-                values[6]   # FeedbackID
-            ]
-        elif len(values) == 8:
-            # Special row format: [Location, Rating, Comment, WEB, Date, Value, StoreCode, FeedbackID]
-            cleaned = [
-                values[0],  # Location
-                values[1],  # Rating
-                values[2],  # Comment
-                values[4],  # TransactionDateTime
-                values[5],  # TransactionValue
-                values[7]   # FeedbackID
-            ]
-
-        cleaned_rows.append(cleaned)
-            
+    width = _read_header_width(filepath)
+
+    date_format = None
+    if offset:
+        # Dates in the tail are parsed with the same format as the rest of the file
+        date_format = _head_date_format(filepath, width)
+
+    cleaned_chunks = []
+    with open(filepath, "rb") as f:
+        if offset:
+            f.seek(offset)
+        else:
+            f.readline()  # Skip the header
+
+        source = f if end is None else _LimitedReader(f, end)
+        reader = pd.read_csv(
+            source,
+            header=None,
+            names=range(width),
+            dtype=str,
+            chunksize=chunksize,
+        )
+
+        for raw in reader:
+            if raw.empty:
+                continue
+            chunk = _repair_chunk(raw)
+            if date_format is None:
+                date_format = _infer_date_format(chunk['TransactionDateTime'])
+            cleaned_chunks.append(_convert_types(chunk, date_format))
+
+    if not cleaned_chunks:
+        return pd.DataFrame(columns=COLUMNS).astype(EMPTY_DTYPES)
+
     # Build final dataframe
-    cleaned_df = pd.DataFrame(cleaned_rows, columns=[
-        "Location",
-        "Rating",
-        "Comment",
-        "TransactionDateTime",
-        "TransactionValue",
-        "FeedbackID"
-    ])
-
-    # Convert data types
-    cleaned_df['TransactionDateTime'] = pd.to_datetime(cleaned_df['TransactionDateTime'], dayfirst=True, errors='coerce')
-    cleaned_df['TransactionValue'] = pd.to_numeric(cleaned_df['TransactionValue'].astype(str).str.replace('$', '', regex=False), errors='coerce')
-    cleaned_df['Rating'] = pd.to_numeric(cleaned_df['Rating'], errors='coerce')
-    cleaned_df['FeedbackID'] = pd.to_numeric(cleaned_df['FeedbackID'], errors='coerce')
-    cleaned_df['Location'] = cleaned_df['Location'].str.strip()
-
-    return cleaned_df
\ No newline at end of file
+    return pd.concat(cleaned_chunks, ignore_index=True)
@@ -0,0 +1,223 @@
+import glob
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from utils.data_cache import CACHE_VERSION, cache_looks_current, default_cache_dir, file_fingerprint, load_cached_cafe_data
+from utils.data_loader import COLUMNS, EMPTY_DTYPES
+from utils.locations import concat_encoded, encode_locations
+
+# File types a data source can be made of
+CSV_SUFFIXES = (".csv",)
+COLUMNAR_SUFFIXES = (".feather", ".arrow", ".parquet")
+
+# Below this total size the files are loaded in-process: starting workers costs more than it saves
+PARALLEL_MIN_BYTES = 16 * 2**20
+
+
+def _is_pattern(source):
+    return glob.has_magic(str(source))
+
+
+def resolve_sources(source):
+    """
+    The data files of a source, in load order: a single file, every CSV and
+    columnar file directly in a directory, or the files matching a glob
+    pattern (e.g. "exports/*/CafeData-*.csv"). Files are sorted by path and
+    the dashboard's own .cache folders are skipped.
+    """
+    source = Path(source)
+    if _is_pattern(source):
+        paths = [Path(p) for p in glob.glob(str(source), recursive=True)]
+    elif source.is_dir():
+        paths = list(source.iterdir())
+    else:
+        return [source]
+    return sorted(
+        p for p in paths
+        if p.is_file() and p.suffix.lower() in CSV_SUFFIXES + COLUMNAR_SUFFIXES and ".cache" not in p.parts
+    )
+
+
+def source_cache_dir(source):
+    """Folder for files derived from a whole source: the .cache folder of the file, directory or fixed part of the glob."""
+    source = Path(source)
+    if _is_pattern(source):
+        fixed = []
+        for part in source.parts:
+            if _is_pattern(part):
+                break
+            fixed.append(part)
+        return Path(*fixed) / ".cache" if fixed else Path(".cache")
+    if source.is_dir():
+        return source / ".cache"
+    return default_cache_dir(source)
+
+
+def source_name(source):
+    """File name stem for files derived from a source: the file's own stem, or a short hash of a directory or pattern."""
+    source = Path(source)
+    if not _is_pattern(source) and not source.is_dir():
+        return source.stem
+    return "source-" + hashlib.blake2b(str(source).encode(), digest_size=4).hexdigest()
+
+
+def _read_columnar(path):
+    """A columnar file already in the cleaned layout, with the columns cast to the loader's types."""
+    if path.suffix.lower() == ".parquet":
+        frame = pd.read_parquet(path)
+    else:
+        frame = feather.read_feather(path)
+    missing = [column for column in COLUMNS if column not in frame]
+    if missing:
+        raise ValueError(f"{path} is missing the columns {', '.join(missing)}")
+    frame = frame[COLUMNS].astype(EMPTY_DTYPES)
+    frame['Location'] = frame['Location'].str.strip()
+    return encode_locations(frame), f"{CACHE_VERSION}-{file_fingerprint(path)['hash']}"
+
+
+def load_partition(path):
+    """
+    Load and clean one file of a source.
+
+    CSV files go through load_cached_cafe_data, so they keep their own cache
+    and the repair rules of load_cafe_data; columnar files are read as they are.
+
+    Returns:
+        tuple: The cleaned frame and its version string.
+    """
+    path = Path(path)
+    if path.suffix.lower() in COLUMNAR_SUFFIXES:
+        return _read_columnar(path)
+    df = load_cached_cafe_data(path)
+    return df, df.attrs["version"]
+
+
+def _refresh_cache(path):
+    """Bring the cache of a CSV up to date in a worker process, returning just its row count."""
+    return len(load_cached_cafe_data(path))
+
+
+def load_partitions(source, workers=None):
+    """
+    Load every file of a source, in parallel across processes.
+
+    Args:
+        source: A file, a directory or a glob pattern, see resolve_sources.
+        workers (int): Worker processes cleaning the CSVs whose cache is
+            missing or stale. By default one per such file up to the CPU
+            count, or none (clean in this process) for a single file or less
+            than PARALLEL_MIN_BYTES of data.
+
+    Returns:
+        list: (path, frame, version) per file, in load order.
+    """
+    paths = resolve_sources(source)
+    if not paths:
+        raise FileNotFoundError(f"No CSV or columnar files found for {source}")
+    # Only CSVs whose cache is missing or stale need cleaning
+    csv_paths = [path for path in paths if path.suffix.lower() in CSV_SUFFIXES and not cache_looks_current(path)]
+    if workers is None:
+        total_size = sum(path.stat().st_size for path in csv_paths)
+        workers = min(len(csv_paths), os.cpu_count() or 1) if total_size >= PARALLEL_MIN_BYTES else 1
+    if workers > 1 and len(csv_paths) > 1:
+        # Workers clean the CSVs into their cache files; the frames are then
+        # memory-mapped from there instead of being pickled back to this process.
+        # Spawned workers do not inherit the threads of a running Streamlit server.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            list(pool.map(_refresh_cache, csv_paths))
+    return [(path, *load_partition(path)) for path in paths]
+
+
+def _duplicate_feedback(df):
+    """Rows whose FeedbackID appears again further down, as a boolean array."""
+    ids = df['FeedbackID']
+    return (ids.notna() & ids.duplicated(keep='last')).to_numpy()
+
+
+def combine_partitions(partitions):
+    """
+    One frame from the partitions of a source, without duplicate feedback.
+
+    A FeedbackID found in several files keeps the row from the last file in
+    load order (the most recent export when files are named by date); rows
+    without a FeedbackID are all kept. The frame is tagged with a version
+    combining the versions of every file, see dataset_version.
+    """
+    frames = [frame for _, frame, _ in partitions]
+    df = frames[0] if len(frames) == 1 else concat_encoded(frames)
+
+    duplicate = _duplicate_feedback(df)
+    if duplicate.any():
+        df = df[~duplicate].reset_index(drop=True)
+        # Rows were removed, so the frame no longer extends the previous version of the file
+        df.attrs.pop("base_version", None)
+        df.attrs.pop("base_rows", None)
+
+    if len(partitions) == 1:
+        version = partitions[0][2]
+    else:
+        digest = hashlib.blake2b(digest_size=16)
+        for path, _, file_version in partitions:
+            digest.update(f"{path}\0{file_version}\n".encode())
+        version = f"{CACHE_VERSION}-{digest.hexdigest()}"
+    df.attrs["version"] = version
+    df.attrs["rows"] = len(df)
+    return df
+
+
+def load_data_source(source, workers=None):
+    """
+    Load a file, directory or glob of CafeData exports as one cleaned frame.
+    See load_partitions and combine_partitions.
+    """
+    partitions = load_partitions(source, workers)
+    if len(partitions) == 1 and not _duplicate_feedback(partitions[0][1]).any():
+        # Keeps the tags load_cached_cafe_data sets for incremental appends
+        return partitions[0][1]
+    return combine_partitions(partitions)
+
+
+def _source_stat(source):
+    """Size and modification time of every file of a source, to notice changes and new files."""
+    stats = []
+    for path in resolve_sources(source):
+        stat = path.stat()
+        stats.append((str(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(stats)
+
+
+class DatasetHandle:
+    """
+    The current cleaned dataset of a source, shared by every session of a
+    process (see get_dataset in app.py).
+
+    load_cached_cafe_data hashes the whole CSV to validate its cache, which is
+    too slow to do on every rerun of a large file. The handle only compares the
+    size and modification time of the source's files (and notices added or
+    removed ones); the data is reloaded through load_data_source when they
+    change. Loads happen under a lock, so sessions starting together wait for
+    a single load.
+    """
+
+    def __init__(self, source, workers=None):
+        self.source = source
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._stat = None
+        self._df = None
+
+    def get(self):
+        stat = _source_stat(self.source)
+        with self._lock:
+            if self._df is None or stat != self._stat:
+                self._df = load_data_source(self.source, self.workers)
+                self._stat = stat
+            return self._df
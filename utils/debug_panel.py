@@ -0,0 +1,77 @@
+import hmac
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils.analysis_jobs import ANALYSIS_JOBS
+from utils.instrumentation import PERF_STATS, rss_mb
+from utils.view_cache import QUERY_CACHE, VIEW_CACHE
+
+
+# Secret opening the panel with ?debug=<secret> in the URL; unset, only CAFE_DEBUG=1 shows it
+DEBUG_TOKEN = os.environ.get("CAFE_DEBUG_TOKEN")
+
+
+def debug_enabled():
+    """
+    The panel is shown to visitors whose URL has ?debug=<CAFE_DEBUG_TOKEN>, or
+    to everyone with CAFE_DEBUG=1 (for local runs). It shows process-wide
+    timings and can reset them, so it is not open to any visitor.
+    """
+    if os.environ.get("CAFE_DEBUG") == "1":
+        return True
+    given = st.query_params.get("debug")
+    return bool(DEBUG_TOKEN) and given is not None and hmac.compare_digest(given.encode(), DEBUG_TOKEN.encode())
+
+
+def _spans_table(spans):
+    """This rerun's spans in start order, nested ones indented under their parent."""
+    rows = [
+        {
+            "span": " " * span["depth"] + span["span"],
+            "ms": span["seconds"] * 1000,
+            "rows": span["rows"],
+            "rss Δ MB": span["rss_delta_mb"],
+        }
+        for span in sorted(spans, key=lambda s: s["offset"])
+    ]
+    return pd.DataFrame(rows, columns=["span", "ms", "rows", "rss Δ MB"])
+
+
+def _stats_table(stats):
+    table = pd.DataFrame(stats, columns=["span", "count", "total", "mean", "p50", "p95", "max", "rows"])
+    for column in ["total", "mean", "p50", "p95", "max"]:
+        table[column] = table[column] * 1000
+    return table.rename(columns={c: f"{c} ms" for c in ["total", "mean", "p50", "p95", "max"]})
+
+
+def display_debug_panel(trace):
+    """
+    Timings of the current rerun so far and of every rerun of the process,
+    view cache counters and memory, with the recent reruns as a JSON-lines download.
+    """
+    with st.expander("Performance", expanded=True):
+        st.caption(f"Process memory {rss_mb():,.0f} MB · {len(ANALYSIS_JOBS)} AI job(s) tracked")
+
+        st.subheader("This rerun")
+        st.dataframe(_spans_table(trace.spans), hide_index=True)
+        if trace.counters:
+            st.json(trace.counters)
+
+        st.subheader("All sessions")
+        st.dataframe(_stats_table(PERF_STATS.spans()), hide_index=True)
+        counters = PERF_STATS.counters()
+        if counters:
+            st.json(counters)
+
+        st.subheader("View cache")
+        st.json(VIEW_CACHE.stats())
+        st.subheader("Query cache")
+        st.json(QUERY_CACHE.stats())
+
+        log = "".join(json.dumps(t.to_dict(), default=str) + "\n" for t in PERF_STATS.recent_traces())
+        st.download_button("Download recent reruns (JSON lines)", log, file_name="cafe-perf.jsonl")
+        if st.button("Reset timings"):
+            PERF_STATS.reset()
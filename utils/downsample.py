@@ -0,0 +1,109 @@
+import numpy as np
+
+# Roughly the plot width in pixels: more points than this cannot be told apart
+DEFAULT_MAX_POINTS = 800
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(y, n_out, x=None):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points, splits the rest into n_out - 2 buckets and
+    from each keeps the point forming the largest triangle with the point kept
+    before it and the average of the next bucket, which preserves peaks and the
+    overall shape.
+
+    Args:
+        y (np.ndarray): Values.
+        n_out (int): Number of points to keep.
+        x (np.ndarray): Positions of the values, evenly spaced when None.
+
+    Returns:
+        np.ndarray: Sorted indices of the points to keep.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # Bucket i covers points edges[i]:edges[i + 1], the first and last point are kept as is
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    widths = np.diff(edges)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    # Average of the following bucket for each bucket, the last point for the final one
+    next_x = np.append((cum_x[edges[2:]] - cum_x[edges[1:-1]]) / widths[1:], x[-1])
+    next_y = np.append((cum_y[edges[2:]] - cum_y[edges[1:-1]]) / widths[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area, the factor does not change the argmax
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def min_max(y, n_out):
+    """
+    Min-max downsampling: keeps the first and last points and the lowest and
+    highest point of each of (n_out - 2) // 2 buckets, so no extreme is lost.
+
+    Returns:
+        np.ndarray: Sorted indices of the points to keep.
+    """
+    n = len(y)
+    n_buckets = (n_out - 2) // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+
+    inner = np.arange(1, n - 1)
+    bucket = (inner - 1) * n_buckets // (n - 2)
+    # Sorted by bucket then value, the first point of a bucket is its minimum and the last its maximum
+    order = inner[np.lexsort((y[inner], bucket))]
+    sorted_buckets = bucket[order - 1]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return np.unique(np.concatenate(([0, n - 1], order[starts], order[ends])))
+
+
+def downsample(y, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """
+    Indices of the points to plot from y, at most max_points of them.
+
+    Args:
+        y (np.ndarray): Evenly spaced values, e.g. revenue per day.
+        max_points (int): Point budget, roughly the chart width in pixels.
+        method (str): "lttb" for the best visual shape, "minmax" to keep
+            every bucket's extremes.
+    """
+    if method == "lttb":
+        return lttb(y, max_points)
+    if method == "minmax":
+        return min_max(y, max_points)
+    raise ValueError(f"Unknown downsampling method {method!r}, expected one of {METHODS}")
+
+
+def chart_points(series, max_points=DEFAULT_MAX_POINTS, method="lttb", unit="D"):
+    """
+    Downsampled chart data for an evenly spaced time series, as x (ISO date
+    strings down to unit, e.g. "D" for days or "m" for minutes) and y (values
+    rounded to cents) lists.
+
+    Built with array operations; tolist() gives native Python types so the
+    options serialize to JSON correctly.
+    """
+    keep = downsample(series.to_numpy(), max_points, method)
+    x_data = np.datetime_as_string(series.index.to_numpy()[keep], unit=unit).tolist()
+    y_data = series.to_numpy()[keep].round(2).tolist()
+    return x_data, y_data
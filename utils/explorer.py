@@ -0,0 +1,87 @@
+import time
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from utils.instrumentation import span
+from utils.locations import REGIONS
+from utils.metrics import date_bounds, location_options
+from utils.transactions import PAGE_SIZE, SORT_COLUMNS, transactions_page
+
+SORT_LABELS = {
+    'TransactionDateTime': "Date",
+    'TransactionValue': "Value",
+    'Rating': "Rating",
+    'FeedbackID': "Feedback ID",
+}
+
+def display_transaction_explorer(df, page_size=PAGE_SIZE):
+    """
+    Shows the cleaned transactions one page at a time. Filtering, sorting and
+    paging happen on the server (see transactions_page), so only the visible
+    page is sent to the browser whatever the size of the dataset.
+    """
+    st.header("Transactions")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        region = st.selectbox("Region", ["All"] + REGIONS, key="explorer_region")
+    with col2:
+        location = st.selectbox("Location", ["All"] + location_options(df, region), key="explorer_location")
+
+    first_day, last_day, _ = date_bounds(df)
+    with col3:
+        date_range = st.date_input(
+            "Date range",
+            (first_day.date(), last_day.date()),
+            min_value=first_day.date(),
+            max_value=last_day.date(),
+            key="explorer_dates",
+        )
+    # Only the start is set while the user is still picking the range
+    start, end = (list(date_range) + [last_day.date()])[:2]
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    # The whole range also keeps the rows without a date
+    if start <= first_day and end >= last_day:
+        start = end = None
+
+    col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 1])
+    with col1:
+        ratings = st.slider("Rating", 1, 5, (1, 5), key="explorer_ratings")
+    with col2:
+        min_value = st.number_input("Min value ($)", min_value=0.0, value=None, key="explorer_min_value")
+    with col3:
+        max_value = st.number_input("Max value ($)", min_value=0.0, value=None, key="explorer_max_value")
+    with col4:
+        sort_by = st.selectbox("Sort by", SORT_COLUMNS, format_func=SORT_LABELS.get, key="explorer_sort")
+    with col5:
+        order = st.radio("Order", ["Descending", "Ascending"], key="explorer_order")
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="explorer_page")
+
+    started = time.perf_counter()
+    with span("explorer.page"):
+        result = transactions_page(
+            df,
+            region,
+            location,
+            start,
+            end,
+            None if ratings == (1, 5) else ratings,
+            None if min_value is None and max_value is None else (min_value, max_value),
+            sort_by,
+            order == "Ascending",
+            page - 1,
+            page_size,
+        )
+    elapsed = time.perf_counter() - started
+
+    rows = result["rows"]
+    st.dataframe(rows, hide_index=True, width="stretch")
+
+    first = result["page"] * page_size
+    payload = pa.Table.from_pandas(rows, preserve_index=False).nbytes
+    st.caption(
+        f"Rows {min(first + 1, result['total']):,}–{first + len(rows):,} of {result['total']:,} · "
+        f"page {result['page'] + 1:,} of {result['pages']:,} · "
+        f"{payload / 1024:.1f} KiB sent · {elapsed * 1000:.0f} ms"
+    )
@@ -1,5 +1,10 @@
+import time
+
 import streamlit as st
-import pandas as pd
+from utils.comment_search import comment_search
+from utils.metrics import FEEDBACK_CARDS, feedback_summary, location_options
+from utils.locations import REGIONS
+from utils.transactions import PAGE_SIZE
 
 # Function to Draw Star Icons
 def draw_stars(rating, max_stars=5):
@@ -8,7 +13,7 @@ def draw_stars(rating, max_stars=5):
     empty_stars = '☆' * (max_stars - int(rating))
     return f'<span style="color:#c9935c;">{filled_stars}</span>{empty_stars}'
 
-def display_feedback_section(df):
+def display_feedback_section(df, k=FEEDBACK_CARDS):
     st.markdown(
         """
         <style>
@@ -36,27 +41,7 @@ def display_feedback_section(df):
         unsafe_allow_html=True
     )
 
-    data = df.copy()
-
-    # Define regions and their locations
-    REGION_LOCATIONS = {
-        "Auckland": ["Albany", "Auckland Central", "Botany", "Domain", "Glen Eden", "Glen Innes", "Henderson", "Lincoln Road", "Manukau", "Manukau Centre", "MT Wellington", "New Lynn", "Pakuranga", "Pukekohe", "Queen Street", "Rosebank Road", "Sylvia Park", "Takanini", "Westgate", "Warkworth", "Williams Drive"],
-        "Bay of Plenty": ["Bethlehem", "Gate Pa", "Rotorua", "Whakatane"],
-        "Canterbury": ["Ashburton", "Christchurch (Papanui, Riccarton)", "Ferryhead", "Hornby", "Rangiora", "Timaru"],
-        "Gisborne": ["Gisborne"],
-        "Hawke's Bay": ["Hastings", "Napier"],
-        "Manawatū-Whanganui": ["Levin", "Palmerston Nth", "Wanganui"],
-        "Marlborough": ["Marlborough"],
-        "Nelson": ["Nelson"],
-        "Otago": ["Dunedin", "Oamaru", "Queenstown"],
-        "Southland": ["Invercargill"],
-        "Taranaki": ["New Plymouth"],
-        "Tasman": ["Richmond"],
-        "Waikato": ["Cambridge", "Ruakura", "Te Awamutu", "Te Rapa", "Taupo"],
-        "Wellington": ["Aubyn", "Broadway", "Crofton Downs", "Kapiti", "London St", "Masterton", "Newtown", "Petone", "Porirua", "Upper Hutt", "Wellington central"],
-        "West Coast": ["Greymouth"]
-    }
-    regions = ["All"] + list(REGION_LOCATIONS.keys())
+    regions = ["All"] + REGIONS
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -69,12 +54,8 @@ def display_feedback_section(df):
             key="feedback_region"
         )
 
-    locations_in_region = ["All"]
-    if region != "All":
-        locations_in_region.extend(REGION_LOCATIONS[region])
-    else:
-        # If 'All' regions, show all unique locations from the dataframe
-        locations_in_region.extend(sorted(df['Location'].unique().tolist()))
+    # If 'All' regions, show all unique locations from the dataframe
+    locations_in_region = ["All"] + location_options(df, region)
 
     with col3:
         location = st.selectbox(
@@ -84,18 +65,11 @@ def display_feedback_section(df):
             key="feedback_location"
         )
         
-    # Filter data based on selection
-    if region != "All":
-        data = data[data['Location'].isin(REGION_LOCATIONS[region])]
-    
-    if location != "All":
-        data = data[data['Location'] == location]
-
-    # Calculate Review Data
-    total_reviews = len(data["Rating"])
-    average_rating = data['Rating'].mean() if not data.empty else 0
-    rating_counts = data['Rating'].value_counts().sort_index(ascending=False)
+    view = feedback_summary(df, region, location, k)
 
+    total_reviews = view["total_reviews"]
+    average_rating = view["average_rating"]
+    rating_counts = view["rating_counts"]
 
     col_left, col_right = st.columns([1, 2.5])
 
@@ -140,42 +114,37 @@ def display_feedback_section(df):
     st.header("Customer Feedback")
     
     st.subheader("Most Recent Feedback")
-    recent_feedback = data.sort_values(by='TransactionDateTime', ascending=False).head(3)
     
-    cols = st.columns(3)
-    for i, (_, row) in enumerate(recent_feedback.iterrows()):
+    cols = st.columns(k)
+    for i, card in enumerate(view["recent"]):
         with cols[i]:
-            location = row['Location']
-            rating = row['Rating']
-            comment = row['Comment']
-            date = row['TransactionDateTime'].strftime('%d/%m/%Y')
+            card_location = card['location']
+            rating = card['rating']
+            comment = card['comment']
+            date = card['date']
             
             st.markdown(
                 f"""
-                **{location}** {draw_stars(rating)}  
+                **{card_location}** {draw_stars(rating)}  
                 *{comment}*  
                 <small>{date}</small>
                 """,
                 unsafe_allow_html=True
             )
 
-    # Sort by rating to get top and bottom feedback
-    top_feedback = data.sort_values(by='Rating', ascending=False).head(3)
-    bottom_feedback = data.sort_values(by='Rating', ascending=True).head(3)
-
     col_pos, col_neg = st.columns(2)
 
     with col_pos:
         st.subheader("Top Positive Feedback")
-        for _, row in top_feedback.iterrows():
-            location = row['Location']
-            rating = row['Rating']
-            comment = row['Comment']
-            date = row['TransactionDateTime'].strftime('%d/%m/%Y')
+        for card in view["top"]:
+            card_location = card['location']
+            rating = card['rating']
+            comment = card['comment']
+            date = card['date']
             
             st.markdown(
                 f"""
-                **{location}** {draw_stars(rating)}  
+                **{card_location}** {draw_stars(rating)}  
                 *{comment}*  
                 <small>{date}</small>
                 <hr style="margin: 5px 0 5px 0;">
@@ -185,18 +154,57 @@ def display_feedback_section(df):
 
     with col_neg:
         st.subheader("Areas for Improvement")
-        for _, row in bottom_feedback.iterrows():
-            location = row['Location']
-            rating = row['Rating']
-            comment = row['Comment']
-            date = row['TransactionDateTime'].strftime('%d/%m/%Y')
+        for card in view["bottom"]:
+            card_location = card['location']
+            rating = card['rating']
+            comment = card['comment']
+            date = card['date']
 
             st.markdown(
                 f"""
-                **{location}** {draw_stars(rating)}  
+                **{card_location}** {draw_stars(rating)}  
                 *{comment}*  
                 <small>{date}</small>
                 <hr style="margin: 5px 0 5px 0;">
                 """,
                 unsafe_allow_html=True
-            )
\ No newline at end of file
+            )
+
+    display_feedback_search(df, region, location)
+
+def display_feedback_search(df, region="All", location="All", page_size=PAGE_SIZE):
+    """
+    Keyword search over the comments of the selected region/location, best
+    match first. Runs on the inverted index of utils.text_index, so only the
+    matching rows are visited.
+    """
+    st.subheader("Search Feedback")
+
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        query = st.text_input("Keywords", placeholder="e.g. friendly staff", key="feedback_search_query")
+    with col2:
+        ratings = st.slider("Rating", 1, 5, (1, 5), key="feedback_search_ratings")
+    with col3:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="feedback_search_page")
+
+    if not query.strip():
+        return
+
+    started = time.perf_counter()
+    result = comment_search(df, query, region, location, None if ratings == (1, 5) else ratings, page - 1, page_size)
+    elapsed = time.perf_counter() - started
+
+    if not result["terms"]:
+        st.info("Only common words were entered; try more specific keywords.")
+        return
+    if not result["total"]:
+        st.info(f"No feedback in this selection mentions {' '.join(result['terms'])}.")
+        return
+
+    st.dataframe(result["rows"], hide_index=True, width="stretch")
+    first = result["page"] * page_size
+    st.caption(
+        f"Matches {first + 1:,}–{first + len(result['rows']):,} of {result['total']:,} · "
+        f"page {result['page'] + 1:,} of {result['pages']:,} · {elapsed * 1000:.0f} ms"
+    )
@@ -0,0 +1,222 @@
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger("cafe.perf")
+
+# Append one JSON line per rerun to this file
+PERF_LOG = os.environ.get("CAFE_PERF_LOG")
+
+# Dump a cProfile of every rerun into this folder (slows the app down, for investigations only)
+PROFILE_DIR = os.environ.get("CAFE_PROFILE")
+
+# Timings kept per span name for the percentiles
+RECENT_SAMPLES = 500
+
+# Reruns kept for the debug panel
+RECENT_TRACES = 50
+
+_current = contextvars.ContextVar("perf_trace", default=None)
+
+# Held by the rerun being profiled: Python 3.12+ allows one active profiler per process
+_profile_lock = threading.Lock()
+
+
+def rss_mb():
+    """Resident memory of the process in MB (the peak so far where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+class Trace:
+    """Spans and counters of one script rerun."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.seconds = None
+        self.rss_mb = None
+        self.spans = []
+        self.counters = {}
+        self.depth = 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "rss_mb": self.rss_mb if self.rss_mb is not None else rss_mb(),
+            "spans": sorted(self.spans, key=lambda s: s["offset"]),
+            "counters": dict(self.counters),
+        }
+
+
+class PerfStats:
+    """
+    Span timings and counters aggregated across reruns and sessions of the
+    process, plus the most recent rerun traces.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+            self.traces = deque(maxlen=RECENT_TRACES)
+
+    def add_span(self, name, seconds, rows=None):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = {"count": 0, "total": 0.0, "max": 0.0, "rows": 0, "recent": deque(maxlen=RECENT_SAMPLES)}
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["rows"] += rows or 0
+            stats["recent"].append(seconds)
+
+    def add_counter(self, name, value):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def add_trace(self, trace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def recent_traces(self):
+        with self._lock:
+            return list(self.traces)
+
+    def spans(self):
+        """Per span name: count, total, mean, p50, p95 and max seconds, and rows processed; slowest total first."""
+        with self._lock:
+            items = [(name, dict(stats, recent=sorted(stats["recent"]))) for name, stats in self._spans.items()]
+        table = []
+        for name, stats in items:
+            recent = stats["recent"]
+            table.append({
+                "span": name,
+                "count": stats["count"],
+                "total": stats["total"],
+                "mean": stats["total"] / stats["count"],
+                "p50": recent[len(recent) // 2],
+                "p95": recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+                "max": stats["max"],
+                "rows": stats["rows"],
+            })
+        return sorted(table, key=lambda row: row["total"], reverse=True)
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+# Shared by every session in the process
+PERF_STATS = PerfStats()
+
+
+@contextmanager
+def span(name, rows=None):
+    """
+    Time a block as a named span of the current rerun (if any) and of the
+    process-wide stats. The yielded dict can be filled in with the number of
+    rows processed once it is known: `with span("load") as s: ...; s["rows"] = len(df)`.
+    """
+    trace = _current.get()
+    record = {"span": name, "rows": rows}
+    start_rss = rss_mb()
+    start = time.perf_counter()
+    if trace is not None:
+        record["depth"] = trace.depth
+        record["offset"] = start - trace._start
+        trace.depth += 1
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        record["seconds"] = seconds
+        record["rss_delta_mb"] = rss_mb() - start_rss
+        if trace is not None:
+            trace.depth -= 1
+            trace.spans.append(record)
+        PERF_STATS.add_span(name, seconds, record["rows"])
+
+
+def count(name, value=1):
+    """Add to a counter of the current rerun and of the process-wide stats."""
+    trace = _current.get()
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + value
+    PERF_STATS.add_counter(name, value)
+
+
+def current_trace():
+    """The trace of the rerun running in this thread, or None."""
+    return _current.get()
+
+
+def _write_log(record):
+    logger.info(json.dumps(record, default=str))
+    if PERF_LOG:
+        with open(PERF_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def _start_profiler():
+    """An enabled cProfile.Profile, or None while another rerun (or another tool) is profiling."""
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is active in this process
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+@contextmanager
+def rerun_trace(name="rerun"):
+    """
+    Collect the spans and counters of one script rerun. On exit the trace is
+    added to the process-wide stats, logged as one JSON record (logger
+    "cafe.perf", plus the CAFE_PERF_LOG file when set) and, when CAFE_PROFILE
+    is set, a cProfile of the rerun is dumped there. Reruns of other sessions
+    overlapping a profiled one are not profiled.
+    """
+    trace = Trace(name)
+    token = _current.set(trace)
+    profiler = _start_profiler() if PROFILE_DIR else None
+    try:
+        yield trace
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
+        trace.seconds = time.perf_counter() - trace._start
+        trace.rss_mb = rss_mb()
+        _current.reset(token)
+        PERF_STATS.add_span(name, trace.seconds)
+        PERF_STATS.add_trace(trace)
+        _write_log(trace.to_dict())
+        if profiler is not None:
+            Path(PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(Path(PROFILE_DIR) / f"{name}-{trace.started_at:.3f}.prof")
@@ -0,0 +1,118 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_cache import dataset_version
+from utils.instrumentation import span
+from utils.view_cache import VIEW_CACHE
+
+
+class LocationIndex:
+    """
+    Inverted index from location to the row positions holding it.
+
+    Rows are grouped by an integer location code once (a stable argsort), so
+    the rows of a location are a contiguous slice of that ordering and the rows
+    of a region are the merge of a few slices. Filtering becomes a lookup
+    instead of a string comparison over the whole Location column.
+    """
+
+    def __init__(self, locations):
+        # Reuses the codes of an already categorical column
+        categorical = pd.Categorical(locations)
+        self.codes = categorical.codes
+        categories = [str(location) for location in categorical.categories]
+        # Location of each code, including locations without rows
+        self.categories = categories
+        self._code_of = {location: code for code, location in enumerate(categories)}
+        self._n_rows = len(self.codes)
+
+        # Rows sorted by location code; bounds[c]:bounds[c + 1] are the rows of code c
+        self._order = np.argsort(self.codes, kind="stable")
+        self._bounds = np.searchsorted(self.codes[self._order], np.arange(len(categories) + 1))
+
+        # Locations that actually occur in the data, alphabetically
+        counts = np.diff(self._bounds)
+        self.locations = sorted(location for location, count in zip(categories, counts) if count)
+
+        self._selections = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._n_rows
+
+    def location_rows(self, location):
+        """Ascending row positions of a single location (empty if unknown)."""
+        code = self._code_of.get(location)
+        if code is None:
+            return np.empty(0, dtype=self._order.dtype)
+        return self._order[self._bounds[code]:self._bounds[code + 1]]
+
+    def rows(self, locations=None):
+        """
+        Ascending row positions of any of the given locations, or None for all rows.
+
+        Multi-location selections (regions) are computed once and kept.
+        """
+        if locations is None:
+            return None
+        key = tuple(sorted(set(locations)))
+        if len(key) == 1:
+            return self.location_rows(key[0])
+
+        with self._lock:
+            cached = self._selections.get(key)
+        if cached is None:
+            parts = [self.location_rows(location) for location in key]
+            # Each slice is already ascending, a stable sort merges the runs
+            cached = np.sort(np.concatenate(parts), kind="stable") if parts else np.empty(0, dtype=self._order.dtype)
+            with self._lock:
+                self._selections[key] = cached
+        return cached
+
+    def contains(self, positions, locations):
+        """Whether the row at each position is at one of the given locations."""
+        wanted = np.zeros(len(self._code_of) + 1, dtype=bool)
+        for location in locations:
+            code = self._code_of.get(location)
+            if code is not None:
+                wanted[code] = True
+        # Missing locations have code -1, which picks the trailing False
+        return wanted[self.codes[positions]]
+
+    def select(self, df, locations=None):
+        """Rows of df at any of the given locations; df itself when locations is None."""
+        rows = self.rows(locations)
+        if rows is None:
+            return df
+        return df.iloc[rows]
+
+
+def selected_locations(region_locations, region="All", location="All"):
+    """
+    The locations a region/location selection covers, or None for everything.
+
+    Matches filtering by region first and then by location: a location outside
+    the chosen region selects nothing.
+    """
+    if location != "All":
+        if region != "All" and location not in region_locations[region]:
+            return []
+        return [location]
+    if region != "All":
+        return region_locations[region]
+    return None
+
+
+def _build_index(df):
+    with span("location_index.build", rows=len(df)):
+        return LocationIndex(df['Location'])
+
+
+def get_location_index(df):
+    """The LocationIndex of a cleaned dataset, built once per dataset version."""
+    return VIEW_CACHE.get_or_compute(
+        ("location_index", dataset_version(df)),
+        lambda: _build_index(df),
+    )
@@ -0,0 +1,84 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Regions and their locations, shared by every section of the dashboard
+REGION_LOCATIONS = {
+    "Auckland": ["Albany", "Auckland Central", "Botany", "Domain", "Glen Eden", "Glen Innes", "Henderson", "Lincoln Road", "Manukau", "Manukau Centre", "MT Wellington", "New Lynn", "Pakuranga", "Pukekohe", "Queen Street", "Rosebank Road", "Sylvia Park", "Takanini", "Westgate", "Warkworth", "Williams Drive"],
+    "Bay of Plenty": ["Bethlehem", "Gate Pa", "Rotorua", "Whakatane"],
+    "Canterbury": ["Ashburton", "Christchurch (Papanui, Riccarton)", "Papanui", "Riccarton", "Ferryhead", "Hornby", "Rangiora", "Timaru"],
+    "Gisborne": ["Gisborne"],
+    "Hawke's Bay": ["Hastings", "Napier"],
+    "Manawatū-Whanganui": ["Levin", "Palmerston Nth", "Wanganui"],
+    "Marlborough": ["Marlborough"],
+    "Nelson": ["Nelson"],
+    "Otago": ["Dunedin", "Oamaru", "Queenstown"],
+    "Southland": ["Invercargill"],
+    "Taranaki": ["New Plymouth"],
+    "Tasman": ["Richmond"],
+    "Waikato": ["Cambridge", "Ruakura", "Te Awamutu", "Te Rapa", "Taupo"],
+    "Wellington": ["Aubyn", "Broadway", "Crofton Downs", "Kapiti", "London St", "Masterton", "Newtown", "Petone", "Porirua", "Upper Hutt", "Wellington central"],
+    "West Coast": ["Greymouth"]
+}
+
+REGIONS = list(REGION_LOCATIONS.keys())
+
+# Reverse mapping from location to region
+LOCATION_TO_REGION = {location: region for region, locations in REGION_LOCATIONS.items() for location in locations}
+
+
+def encode_locations(df):
+    """
+    Convert the Location column to a Categorical and add a categorical Region
+    column looked up from the catalog.
+
+    The Location categories are every catalog location plus any other location
+    in the data, in alphabetical order, so groupbys keep
+    the same ordering as on plain strings. Locations missing from the catalog
+    get a missing Region and are logged.
+    """
+    present = df['Location'].dropna().unique()
+    categories = sorted(set(LOCATION_TO_REGION) | set(present))
+    location = pd.Categorical(df['Location'], categories=categories)
+
+    # Map each location category to its region code, -1 when it has none.
+    # The trailing -1 is picked up by missing locations, whose code is -1.
+    region_code = {region: code for code, region in enumerate(REGIONS)}
+    category_regions = np.array([region_code.get(LOCATION_TO_REGION.get(name), -1) for name in categories] + [-1])
+    region = pd.Categorical.from_codes(category_regions[location.codes], categories=REGIONS)
+
+    df['Location'] = location
+    df['Region'] = region
+
+    unmapped = unmapped_locations(df)
+    if not unmapped.empty:
+        logger.warning(
+            "%d locations are missing from the region catalog: %s",
+            len(unmapped),
+            ", ".join(f"{name} ({count})" for name, count in unmapped.items()),
+        )
+    return df
+
+
+def unmapped_locations(df):
+    """Row counts of the locations in df that have no region in the catalog."""
+    locations = df.loc[df['Region'].isna() & df['Location'].notna(), 'Location']
+    counts = locations.value_counts()
+    return counts[counts > 0]
+
+
+def concat_encoded(frames):
+    """
+    Concatenate frames returned by encode_locations, unifying their Location
+    categories so the result stays categorical.
+    """
+    categories = sorted(set().union(*(frame['Location'].cat.categories for frame in frames)))
+    aligned = []
+    for frame in frames:
+        frame = frame.copy(deep=False)
+        frame['Location'] = frame['Location'].cat.set_categories(categories)
+        aligned.append(frame)
+    return pd.concat(aligned, ignore_index=True)
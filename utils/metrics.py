@@ -0,0 +1,326 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_cache import dataset_version
+from utils.comment_scores import SENTIMENT_THRESHOLD, TOPIC_NAMES
+from utils.downsample import DEFAULT_MAX_POINTS, chart_points
+from utils.instrumentation import span
+from utils.location_index import get_location_index, selected_locations
+from utils.locations import REGION_LOCATIONS, REGIONS
+from utils.rollup import build_revenue_rollup, revenue_by
+from utils.timeseries import RevenueEngine
+from utils.view_cache import VIEW_CACHE
+
+# Pure data layer behind the dashboard: no Streamlit, chart or OpenAI imports,
+# so every view can be computed, profiled or precomputed from plain Python.
+# Views are cached under keys that include the dataset version, in VIEW_CACHE
+# unless another cache is passed (see utils.snapshot). Cache misses are timed
+# as "metrics.*" spans (see utils.instrumentation).
+
+# Number of feedback entries in each list
+FEEDBACK_CARDS = 3
+
+# Number of locations in the top revenue list
+TOP_LOCATIONS = 6
+
+def get_revenue_rollup(df, version):
+    """
+    Builds the day x location revenue rollup once per dataset version and
+    shares it between sessions.
+    """
+    def build():
+        with span("metrics.rollup", rows=len(df)):
+            return build_revenue_rollup(df)
+
+    return VIEW_CACHE.get_or_compute(("revenue_rollup", version), build)
+
+
+def get_revenue_engine(df, version):
+    """
+    Builds the multi-resolution revenue engine once per dataset version. When
+    rows were only appended to the CSV, the previous version's engine is
+    extended with the new rows instead of being rebuilt.
+    """
+    def build():
+        base = VIEW_CACHE.get(("revenue_engine", df.attrs.get("base_version")))
+        if base is not None and base.rows == df.attrs.get("base_rows"):
+            with span("metrics.engine_extend", rows=len(df) - base.rows):
+                return base.with_rows(df.iloc[base.rows:])
+        with span("metrics.engine_build", rows=len(df)):
+            return RevenueEngine.from_frame(df)
+
+    return VIEW_CACHE.get_or_compute(("revenue_engine", version), build)
+
+
+def location_options(df, region="All"):
+    """The locations to choose from in a region, every location in the data for "All"."""
+    if region != "All":
+        return list(REGION_LOCATIONS[region])
+    return list(get_location_index(df).locations)
+
+
+def selections(df):
+    """Every (region, location) pair the dashboard's filters can produce."""
+    pairs = []
+    for region in ["All"] + REGIONS:
+        pairs.extend((region, location) for location in ["All"] + location_options(df, region))
+    return pairs
+
+
+def date_bounds(df, cache=VIEW_CACHE):
+    """
+    First and last day with sales, plus the default chart range: the two years
+    up to the last day with sales, clamped to the data (whole days).
+
+    The range depends on the dataset only, not on the current date, so
+    precomputed charts (see utils.snapshot) stay valid on later days.
+
+    Returns:
+        tuple: (first_day, last_day, default_start) as Timestamps.
+    """
+    version = dataset_version(df)
+
+    def build():
+        first_day, last_day = get_revenue_engine(df, version).date_range() or (pd.Timestamp('today').normalize(),) * 2
+        cutoff_date = last_day - pd.DateOffset(years=2)
+        return first_day, last_day, max(cutoff_date, first_day)
+
+    return cache.get_or_compute(("date_bounds", version), build)
+
+
+def revenue_chart(df, region="All", location="All", resolution="day", metric="revenue",
+                  start=None, end=None, max_points=DEFAULT_MAX_POINTS, cache=VIEW_CACHE):
+    """
+    Revenue series and KPIs for a region/location selection from the start to the end day.
+
+    The series is downsampled to at most max_points points (see utils.downsample),
+    so a long date range does not ship more points to the browser than the chart can show.
+
+    Returns:
+        dict: "x" (ISO dates), "y" (values) and "kpis" (total_sales,
+        average_sales and total_orders).
+    """
+    version = dataset_version(df)
+
+    def build():
+        engine = get_revenue_engine(df, version)
+        with span("metrics.revenue_chart") as s:
+            locations = selected_locations(REGION_LOCATIONS, region, location)
+            series = engine.series(resolution, metric, locations, start, end)
+            x_data, y_data = chart_points(series, max_points, unit="m" if resolution == "hour" else "D")
+            s["rows"] = len(series)
+            return {"x": x_data, "y": y_data, "kpis": engine.kpis(locations, start, end)}
+
+    return cache.get_or_compute(
+        ("revenue_chart", version, region, location, resolution, metric, start, end, max_points),
+        build,
+    )
+
+
+def top_locations(df, n=TOP_LOCATIONS, cache=VIEW_CACHE):
+    """The n locations with the highest all-time revenue, as (location, revenue) pairs."""
+    version = dataset_version(df)
+
+    def build():
+        rollup = get_revenue_rollup(df, version)
+        with span("metrics.top_locations"):
+            ranked = revenue_by(rollup, 'Location').sort_values(ascending=False).head(n)
+        return [(location, float(revenue)) for location, revenue in ranked.items()]
+
+    return cache.get_or_compute(("revenue_top_locations", version, n), build)
+
+
+def revenue_breakdown(df, group_by, cache=VIEW_CACHE):
+    """All-time revenue grouped by 'Region' or 'Location', as name/value records rounded to dollars."""
+    version = dataset_version(df)
+
+    def build():
+        rollup = get_revenue_rollup(df, version)
+        with span("metrics.revenue_breakdown"):
+            grouped = revenue_by(rollup, group_by)
+        return [{"value": int(round(float(value))), "name": str(name)} for name, value in grouped.items()]
+
+    return cache.get_or_compute(("revenue_breakdown", version, group_by), build)
+
+
+def _feedback_cards(rows):
+    """Turn feedback rows into plain records for the feedback cards."""
+    return [
+        {
+            "location": row['Location'],
+            "rating": row['Rating'],
+            "comment": row['Comment'],
+            "date": row['TransactionDateTime'].strftime('%d/%m/%Y') if pd.notna(row['TransactionDateTime']) else "",
+        }
+        for _, row in rows.iterrows()
+    ]
+
+
+def top_k_positions(values, k, largest=True):
+    """
+    Positions of the k largest (or smallest) values of a 1-d array, best first.
+
+    Ties keep their position order and missing values (NaN/NaT) only fill in
+    when there are fewer than k others. Linear in len(values).
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        missing = np.isnat(values)
+        keys = values.view("i8")
+    elif values.dtype.kind == "f":
+        missing = np.isnan(values)
+        keys = values
+    else:
+        missing = np.zeros(len(values), dtype=bool)
+        keys = values
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # Only copy the keys when some are missing
+    valid = np.flatnonzero(~missing) if missing.any() else None
+    if valid is not None:
+        keys = keys[valid]
+    n = len(keys)
+    if n > k:
+        kth = np.partition(keys, n - k if largest else k - 1)[n - k if largest else k - 1]
+        better = np.flatnonzero(keys > kth if largest else keys < kth)
+        tied = np.flatnonzero(keys == kth)[:k - len(better)]
+        chosen = np.sort(np.concatenate([better, tied]))
+    else:
+        chosen = np.arange(n)
+    # Best first; a stable sort keeps tied values in position order
+    chosen_keys = keys[chosen]
+    chosen = chosen[np.argsort(-chosen_keys if largest else chosen_keys, kind="stable")]
+    positions = chosen if valid is None else valid[chosen]
+
+    if len(positions) < k:
+        positions = np.concatenate([positions, np.flatnonzero(missing)[:k - len(positions)]])
+    return positions
+
+
+def _column(df, column, rows=None):
+    """Values of a column at the given row positions; a read-only view of the whole column for None."""
+    return _column_of(df[column].to_numpy(), rows)
+
+
+def _column_of(values, rows=None):
+    """values at the given row positions, or all of them for None."""
+    return values if rows is None else values[rows]
+
+
+def build_feedback_view(df, locations=None, k=FEEDBACK_CARDS):
+    """
+    Rating summary and the k most recent, best and worst feedback entries for
+    the given locations (None for all of them).
+
+    Works on row positions: only the ratings and dates of the selected rows
+    are gathered, and whole rows are taken just for the feedback cards.
+    """
+    # Filter data based on selection
+    rows = get_location_index(df).rows(locations)
+    with span("metrics.filter") as s:
+        ratings = _column(df, 'Rating', rows)
+        dates = _column(df, 'TransactionDateTime', rows)
+        s["rows"] = len(ratings)
+
+    # Calculate Review Data
+    rated = ratings[~np.isnan(ratings)] if ratings.dtype.kind == "f" else ratings
+    levels, counts = np.unique(rated, return_counts=True)
+
+    def cards(positions):
+        return _feedback_cards(df.iloc[positions if rows is None else rows[positions]])
+
+    # Pick recent, top and bottom feedback
+    return {
+        "total_reviews": len(ratings),
+        "average_rating": float(rated.mean()) if len(rated) else 0,
+        "rating_counts": {int(rating): int(count) for rating, count in zip(levels[::-1], counts[::-1])},
+        "recent": cards(top_k_positions(dates, k)),
+        "top": cards(top_k_positions(ratings, k)),
+        "bottom": cards(top_k_positions(ratings, k, largest=False)),
+    }
+
+
+def feedback_summary(df, region="All", location="All", k=FEEDBACK_CARDS, cache=VIEW_CACHE):
+    """Rating histogram and feedback lists for a region/location selection, see build_feedback_view."""
+    def build():
+        with span("metrics.feedback"):
+            return build_feedback_view(df, selected_locations(REGION_LOCATIONS, region, location), k)
+
+    return cache.get_or_compute(("feedback", dataset_version(df), region, location, k), build)
+
+
+def _shares(values, weights, counts):
+    """Per-code means of weights (codes in values), NaN where a code has no rows."""
+    sums = np.bincount(values, weights=weights, minlength=len(counts))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def build_comment_insights(df, scores, locations=None):
+    """
+    Per-topic and per-location breakdown of the scored comments (see
+    utils.comment_scores) at the given locations (None for all of them).
+
+    Only the precomputed scores are aggregated, with bincounts over the
+    location codes: no comment text is read.
+    """
+    index = get_location_index(df)
+    rows = index.rows(locations)
+    with span("metrics.filter") as s:
+        sentiment = _column_of(scores.sentiment, rows)
+        commented = ~np.isnan(sentiment)
+        sentiment = sentiment[commented]
+        topics = _column_of(scores.topics, rows)[commented]
+        ratings = _column(df, 'Rating', rows)[commented].astype(np.float64)
+        # Rows without a location have code -1, counted at 0 and dropped below
+        codes = _column_of(index.codes, rows)[commented].astype(np.intp) + 1
+        s["rows"] = len(sentiment)
+
+    positive = (sentiment > SENTIMENT_THRESHOLD).astype(np.float64)
+    negative = (sentiment < -SENTIMENT_THRESHOLD).astype(np.float64)
+    n_codes = len(index.categories) + 1
+    counts = np.bincount(codes, minlength=n_codes).astype(np.float64)
+
+    topic_rows = []
+    mentions = np.zeros((len(TOPIC_NAMES), n_codes))
+    for bit, name in enumerate(TOPIC_NAMES):
+        tagged = (topics >> bit) & 1 == 1
+        mentions[bit] = np.bincount(codes[tagged], minlength=n_codes)
+        total = int(tagged.sum())
+        topic_rows.append({
+            "Topic": name,
+            "Comments": total,
+            "Share": total / len(sentiment) if len(sentiment) else 0.0,
+            "Sentiment": float(sentiment[tagged].mean()) if total else np.nan,
+            "Positive": float(positive[tagged].mean()) if total else np.nan,
+            "Negative": float(negative[tagged].mean()) if total else np.nan,
+            "Rating": float(np.nanmean(ratings[tagged])) if total else np.nan,
+        })
+
+    top_topic = np.array(TOPIC_NAMES, dtype=object)[mentions.argmax(axis=0)]
+    top_topic[mentions.max(axis=0) == 0] = ""
+    by_location = pd.DataFrame({
+        "Location": ["(none)"] + index.categories,
+        "Comments": counts.astype(np.int64),
+        "Sentiment": _shares(codes, sentiment, counts),
+        "Positive": _shares(codes, positive, counts),
+        "Negative": _shares(codes, negative, counts),
+        "Top topic": top_topic,
+    })
+    by_location = by_location.iloc[1:][by_location["Comments"].iloc[1:] > 0]
+    return {
+        "comments": len(sentiment),
+        "sentiment": float(sentiment.mean()) if len(sentiment) else np.nan,
+        "topics": pd.DataFrame(topic_rows).sort_values("Comments", ascending=False, ignore_index=True),
+        "locations": by_location.sort_values("Comments", ascending=False, ignore_index=True),
+    }
+
+
+def comment_insights(df, scores, region="All", location="All", cache=VIEW_CACHE):
+    """Topic and location breakdown of the scored comments for a region/location selection, see build_comment_insights."""
+    def build():
+        with span("metrics.comment_insights"):
+            return build_comment_insights(df, scores, selected_locations(REGION_LOCATIONS, region, location))
+
+    return cache.get_or_compute(("comment_insights", dataset_version(df), region, location), build)
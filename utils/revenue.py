@@ -1,32 +1,106 @@
 import streamlit as st
 import pandas as pd
-from streamlit_echarts import st_echarts
+from utils.downsample import DEFAULT_MAX_POINTS
+from utils.instrumentation import count, span
+from utils.metrics import date_bounds, location_options, revenue_breakdown, revenue_chart, top_locations
+from utils.timeseries import RESOLUTIONS
+from utils.locations import REGIONS
+
+# Chart metric label -> RevenueEngine.series metric
+CHART_METRICS = {
+    "Revenue": "revenue",
+    "7-day total": "rolling_7",
+    "28-day total": "rolling_28",
+    "Week-over-week change (%)": "wow",
+}
+
+RESOLUTION_TITLES = {
+    "hour": "Hourly Revenue",
+    "day": "Daily Revenue",
+    "week": "Weekly Revenue",
+    "month": "Monthly Revenue",
+}
+
+def line_chart_options(chart, metric="revenue"):
+    """ECharts options for a non-interactive line chart of a revenue_chart view."""
+    if metric == "wow":
+        value_name, tooltip_value = "Change (%)", "Change: {c}%"
+    else:
+        value_name, tooltip_value = "Revenue ($)", "Revenue: ${c}"
+    x_data, y_data = chart["x"], chart["y"]
+    return {
+        "backgroundColor": "#fffbf6",
+        "textStyle": {"color": "#4d342c"},
+        "xAxis": {
+            "type": "category",
+            "data": x_data,
+            "name": "Date",
+            "nameLocation": "middle",
+            "nameGap": 30,
+            "axisLabel": {"color": "#4d342c"},
+            "axisLine": {"lineStyle": {"color": "#4d342c"}},
+        },
+        "yAxis": {
+            "type": "value",
+            "name": value_name,
+            "nameLocation": "middle",
+            "nameGap": 45,
+            "axisLabel": {"color": "#4d342c"},
+            "axisLine": {"lineStyle": {"color": "#4d342c"}},
+            "splitLine": {"lineStyle": {"color": "#e0d9d6"}},
+        },
+        "tooltip": {
+            "trigger": "axis",
+            "formatter": "Date: {b}<br/>" + tooltip_value,
+            "backgroundColor": "#fffbf6",
+            "borderColor": "#4d342c",
+            "textStyle": {"color": "#4d342c"},
+        },
+        "series": [{
+            "data": y_data,
+            "type": "line",
+            "smooth": True,
+            "color": "#5D4037",
+        }],
+    }
 
-def display_revenue_section(df):
+def pie_chart_options(pie_data):
+    """Pie chart options for a revenue_breakdown view."""
+    # Pie chart setup — explicit light background so chart isn't blacked out
+    return {
+    "backgroundColor": "#fffbf6",
+    "textStyle": {"color": "#4d342c"},
+    "tooltip": {"trigger": "item", "backgroundColor": "#fffbf6", "borderColor": "#4d342c", "textStyle": {"color": "#4d342c"}},
+    "series": [
+        {
+            "name": "Revenue",
+            "type": "pie",
+            "radius": ["40%", "80%"],
+            "avoidLabelOverlap": False,
+            "itemStyle": {
+                "borderRadius": 10,
+                "borderColor": "#fff",
+                "borderWidth": 2,
+            },
+            "label": {"show": False},
+            "emphasis": {
+            },
+            "labelLine": {"show": False},
+            "data": pie_data,
+        }
+    ],}
+
+def display_revenue_section(df, max_points=DEFAULT_MAX_POINTS):
     """
     Calculates and displays a line chart of total daily revenue for the last years.
 
     Args:
         df (pd.DataFrame): The input DataFrame with 'TransactionDateTime' and 'TransactionValue' columns.
+        max_points (int): Most points drawn in the daily revenue chart.
     """
-    # Specific Location Information
-    REGION_LOCATIONS = {
-        "Auckland": ["Albany", "Auckland Central", "Botany", "Domain", "Glen Eden", "Glen Innes", "Henderson", "Lincoln Road", "Manukau", "Manukau Centre", "MT Wellington", "New Lynn", "Pakuranga", "Pukekohe", "Queen Street", "Rosebank Road", "Sylvia Park", "Takanini", "Westgate", "Warkworth", "Williams Drive"],
-        "Bay of Plenty": ["Bethlehem", "Gate Pa", "Rotorua", "Whakatane"],
-        "Canterbury": ["Ashburton", "Ferryhead", "Hornby", "Rangiora", "Timaru"],
-        "Gisborne": ["Gisborne"],
-        "Hawke's Bay": ["Hastings", "Napier"],
-        "Manawatū-Whanganui": ["Levin", "Palmerston Nth", "Wanganui"],
-        "Marlborough": ["Marlborough"],
-        "Nelson": ["Nelson"],
-        "Otago": ["Dunedin", "Oamaru", "Queenstown"],
-        "Southland": ["Invercargill"],
-        "Taranaki": ["New Plymouth"],
-        "Tasman": ["Richmond"],
-        "Waikato": ["Cambridge", "Ruakura", "Te Awamutu", "Te Rapa", "Taupo"],
-        "Wellington": ["Aubyn", "Broadway", "Crofton Downs", "Kapiti", "London St", "Masterton", "Newtown", "Petone", "Porirua", "Upper Hutt", "Wellington central"],
-        "West Coast": ["Greymouth"]
-    }
+    # Imported when the section is first drawn, so the page and the other
+    # sections do not wait for it (and the option builders work without Streamlit)
+    from streamlit_echarts import st_echarts
 
     # Use markdown with more specific CSS to create larger metric text
     st.markdown("""
@@ -58,12 +132,7 @@ def display_revenue_section(df):
         unsafe_allow_html=True
         )
 
-    data = df.copy()
-    # Create a reverse mapping from location to region
-    location_to_region = {location: region for region, locations in REGION_LOCATIONS.items() for location in locations}
-    data['Region'] = data['Location'].map(location_to_region)
-    
-    regions = ["All"] + list(REGION_LOCATIONS.keys())
+    regions = ["All"] + REGIONS
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -76,12 +145,8 @@ def display_revenue_section(df):
             index=0,
         )
 
-    locations_in_region = ["All"]
-    if region != "All":
-        locations_in_region.extend(REGION_LOCATIONS[region])
-    else:
-        # If 'All' regions, show all unique locations from the dataframe
-        locations_in_region.extend(sorted(data['Location'].unique().tolist()))
+    # If 'All' regions, show all unique locations from the dataframe
+    locations_in_region = ["All"] + location_options(df, region)
 
     with col3:
         location = st.selectbox(
@@ -90,69 +155,50 @@ def display_revenue_section(df):
             index=0,
         )
 
-    filtered_data = data.copy()
-    if region != "All":
-        filtered_data = filtered_data[filtered_data['Location'].isin(REGION_LOCATIONS[region])]
-    
-    if location != "All":
-        filtered_data = filtered_data[filtered_data['Location'] == location]
-    
-    # Calculate the cutoff date for the last two years to accomodate the dataset
-    cutoff_date = pd.to_datetime('today') - pd.DateOffset(years=2)
-    chart_data = filtered_data[filtered_data['TransactionDateTime'] >= cutoff_date].sort_values('TransactionDateTime')
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric_label = st.selectbox("Metric", list(CHART_METRICS))
+    metric = CHART_METRICS[metric_label]
+
+    with col2:
+        # Moving sums and week-over-week change are daily
+        resolution = st.selectbox(
+            "Granularity",
+            list(RESOLUTIONS),
+            index=list(RESOLUTIONS).index("day"),
+            format_func=str.capitalize,
+            disabled=metric != "revenue",
+        )
+    if metric != "revenue":
+        resolution = "day"
+
+    first_day, last_day, default_start = date_bounds(df)
+
+    with col3:
+        date_range = st.date_input(
+            "Date range",
+            (default_start.date(), last_day.date()),
+            min_value=first_day.date(),
+            max_value=last_day.date(),
+        )
+    # Only the start is set while the user is still picking the range
+    start, end = (list(date_range) + [last_day.date()])[:2]
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+    chart = revenue_chart(df, region, location, resolution, metric, start, end, max_points)
 
     col1, col2 = st.columns(2)
 
     with col1:
-            st.subheader("Daily Revenue")
-            # Daily Revenue Chart
-            daily_revenue = chart_data.set_index('TransactionDateTime').resample('D')['TransactionValue'].sum().reset_index()
-            daily_revenue.rename(columns={'TransactionDateTime': 'Date', 'TransactionValue': 'Revenue'}, inplace=True)
-            
-            # ECharts options for a non-interactive line chart
-            # Use native Python types so options serialize to JSON correctly
-            x_data = [str(d) for d in daily_revenue['Date'].dt.strftime('%Y-%m-%d')]
-            y_data = [float(x) for x in daily_revenue['Revenue']]
-            line_chart_options = {
-                "backgroundColor": "#fffbf6",
-                "textStyle": {"color": "#4d342c"},
-                "xAxis": {
-                    "type": "category",
-                    "data": x_data,
-                    "name": "Date",
-                    "nameLocation": "middle",
-                    "nameGap": 30,
-                    "axisLabel": {"color": "#4d342c"},
-                    "axisLine": {"lineStyle": {"color": "#4d342c"}},
-                },
-                "yAxis": {
-                    "type": "value",
-                    "name": "Revenue ($)",
-                    "nameLocation": "middle",
-                    "nameGap": 45,
-                    "axisLabel": {"color": "#4d342c"},
-                    "axisLine": {"lineStyle": {"color": "#4d342c"}},
-                    "splitLine": {"lineStyle": {"color": "#e0d9d6"}},
-                },
-                "tooltip": {
-                    "trigger": "axis",
-                    "formatter": "Date: {b}<br/>Revenue: ${c}",
-                    "backgroundColor": "#fffbf6",
-                    "borderColor": "#4d342c",
-                    "textStyle": {"color": "#4d342c"},
-                },
-                "series": [{
-                    "data": y_data,
-                    "type": "line",
-                    "smooth": True,
-                    "color": "#5D4037",
-                }],
-            }
-            st_echarts(options=line_chart_options, height="400px")
+            st.subheader(RESOLUTION_TITLES[resolution] if metric == "revenue" else metric_label)
+            # Revenue Chart
+            count("render.chart_points", len(chart["y"]))
+            with span("render.revenue_chart", rows=len(chart["y"])):
+                st_echarts(options=line_chart_options(chart, metric), height="400px")
     
-    total_sales = chart_data['TransactionValue'].sum()
-    average_sales = chart_data['TransactionValue'].mean()
-    total_orders = len(chart_data)
+    total_sales = chart["kpis"]["total_sales"]
+    average_sales = chart["kpis"]["average_sales"]
+    total_orders = chart["kpis"]["total_orders"]
 
     with col2:
         st.markdown(f"""
@@ -174,13 +220,11 @@ def display_revenue_section(df):
     col1, col2 = st.columns(2, gap="large", border= True)
     with col1:
         topRevenueContainer = st.container()
-        revenue_by_location = data.groupby('Location')['TransactionValue'].sum()
-        top_locations = revenue_by_location.sort_values(ascending=False).head(6)
         topRevenueContainer.subheader("Top Locations by Revenue")
         
         cols = topRevenueContainer.columns(2)
         i = 0
-        for location, revenue in top_locations.items():
+        for location, revenue in top_locations(df):
             col_index = i % 2
             cols[col_index].markdown(f"""
                 <p class="top-metric-label">#{i+1} {location}</p>
@@ -194,42 +238,6 @@ def display_revenue_section(df):
             horizontal=True,
         )
 
-        if group_by == 'Location':
-            revenue_grouped = data.groupby('Location')['TransactionValue'].sum()
-        else: # group_by == 'Region'
-            revenue_grouped = data.groupby('Region')['TransactionValue'].sum()
-
-        pie_data = [{"value": int(round(float(value))), "name": str(name)} for name, value in revenue_grouped.items()]
-
-        # Pie chart setup — explicit light background so chart isn't blacked out
-        options = {
-        "backgroundColor": "#fffbf6",
-        "textStyle": {"color": "#4d342c"},
-        "tooltip": {"trigger": "item", "backgroundColor": "#fffbf6", "borderColor": "#4d342c", "textStyle": {"color": "#4d342c"}},
-        "series": [
-            {
-                "name": "Revenue",
-                "type": "pie",
-                "radius": ["40%", "80%"],
-                "avoidLabelOverlap": False,
-                "itemStyle": {
-                    "borderRadius": 10,
-                    "borderColor": "#fff",
-                    "borderWidth": 2,
-                },
-                "label": {"show": False},
-                "emphasis": {
-                },
-                "labelLine": {"show": False},
-                "data": pie_data,
-            }
-        ],}
-        st_echarts(options=options, height="450px")
-
-
-
-
-
-
-
-
+        pie_data = revenue_breakdown(df, group_by)
+        with span("render.breakdown_chart", rows=len(pie_data)):
+            st_echarts(options=pie_chart_options(pie_data), height="450px")
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def build_revenue_rollup(df):
+    """
+    Pre-aggregate transactions to one row per (day, location).
+
+    Every revenue view is answered from this table, which has at most
+    days x locations rows however many transactions the dataset holds.
+    Transactions without a valid date are kept under a missing Date so
+    all-time totals still include them.
+
+    Args:
+        df (pd.DataFrame): Cleaned data with the categorical Location and Region
+            columns added by utils.locations.encode_locations.
+
+    Returns:
+        pd.DataFrame: Date, Location, Region, Revenue (sum), Transactions (count
+        of non-missing values), Rows (number of transactions) and Mean columns.
+    """
+    days = df['TransactionDateTime'].dt.floor('D').rename('Date')
+    # Region depends on Location only, grouping by it just carries it along
+    grouped = df.groupby([days, df['Location'], df['Region']], dropna=False, sort=True, observed=True)['TransactionValue']
+    rollup = grouped.agg(Revenue='sum', Transactions='count', Rows='size').reset_index()
+    rollup['Mean'] = rollup['Revenue'] / rollup['Transactions'].replace(0, np.nan)
+    return rollup
+
+
+def revenue_by(rollup, key):
+    """All-time revenue grouped by 'Location' or 'Region'."""
+    return rollup.groupby(key, observed=True)['Revenue'].sum()
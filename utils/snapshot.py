@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils.data_cache import dataset_version
+from utils.data_source import load_data_source, source_cache_dir, source_name
+from utils.downsample import DEFAULT_MAX_POINTS
+from utils.locations import REGIONS
+from utils.metrics import (
+    FEEDBACK_CARDS,
+    TOP_LOCATIONS,
+    date_bounds,
+    feedback_summary,
+    revenue_breakdown,
+    revenue_chart,
+    selections,
+    top_locations,
+)
+from utils.timeseries import METRICS, RESOLUTIONS
+from utils.view_cache import VIEW_CACHE, ViewCache
+
+# Bump when the layout of the snapshot or of any view in it changes
+SNAPSHOT_VERSION = 2
+
+# Key prefixes of the views stored in a snapshot (not the engines behind them)
+SNAPSHOT_VIEWS = ("date_bounds", "revenue_chart", "revenue_top_locations", "revenue_breakdown", "feedback")
+
+_preloaded = set()
+_preload_lock = threading.Lock()
+
+
+def default_snapshot_path(source):
+    """Snapshot file next to the cleaned data cache of a data source (file, directory or glob)."""
+    return source_cache_dir(source) / f"{source_name(source)}.snapshot.json"
+
+
+def build_snapshot(df, all_charts=False, max_points=DEFAULT_MAX_POINTS):
+    """
+    Compute every region/location view of the dashboard in its default state.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        all_charts (bool): Also compute the revenue chart for every
+            resolution and metric, not just daily revenue.
+        max_points (int): Point budget of the revenue charts.
+
+    Returns:
+        dict: The dataset version and the views as {view cache key: value}.
+    """
+    cache = ViewCache(maxsize=float("inf"))
+    _, last_day, default_start = date_bounds(df, cache=cache)
+
+    charts = [("day", "revenue")]
+    if all_charts:
+        charts = [(resolution, "revenue") for resolution in RESOLUTIONS]
+        charts += [("day", metric) for metric in METRICS if metric != "revenue"]
+
+    for region, location in selections(df):
+        for resolution, metric in charts:
+            revenue_chart(df, region, location, resolution, metric, default_start, last_day, max_points, cache=cache)
+        feedback_summary(df, region, location, FEEDBACK_CARDS, cache=cache)
+    top_locations(df, TOP_LOCATIONS, cache=cache)
+    for group_by in ("Region", "Location"):
+        revenue_breakdown(df, group_by, cache=cache)
+
+    return {
+        "format": SNAPSHOT_VERSION,
+        "dataset_version": dataset_version(df),
+        "created": time.time(),
+        "views": dict(cache.items(SNAPSHOT_VIEWS)),
+    }
+
+
+def _encode(value):
+    """
+    A JSON-compatible form of a view or cache key. Tuples, Timestamps and dicts
+    with non-string keys are tagged so _decode restores them exactly (cache
+    keys must compare equal).
+    """
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, pd.Timestamp):
+        return {"timestamp": value.isoformat()}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {"dict": {key: _encode(item) for key, item in value.items()}}
+        return {"items": [[_encode(key), _encode(item)] for key, item in value.items()]}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        (tag, content), = value.items()
+        if tag == "tuple":
+            return tuple(_decode(item) for item in content)
+        if tag == "timestamp":
+            return pd.Timestamp(content)
+        if tag == "dict":
+            return {key: _decode(item) for key, item in content.items()}
+        return {_decode(key): _decode(item) for key, item in content}
+    return value
+
+
+def write_snapshot(snapshot, path):
+    """Write a snapshot atomically as JSON, so the dashboard never reads a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = dict(snapshot, views=[[_encode(key), _encode(view)] for key, view in snapshot["views"].items()])
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """
+    Read a snapshot written by write_snapshot, or None when it is missing,
+    unreadable or from another snapshot format. Snapshots are plain JSON, so
+    reading one never runs code from the shared cache folder.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        if not isinstance(document, dict) or document.get("format") != SNAPSHOT_VERSION:
+            return None
+        views = {_decode(key): _decode(view) for key, view in document["views"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return dict(document, views=views)
+
+
+def preload_snapshot(df, source, cache=VIEW_CACHE):
+    """
+    Fill the view cache from the snapshot of a data source, once per dataset
+    version and process. A snapshot of another version of the data is ignored.
+
+    Returns:
+        int: Number of views loaded.
+    """
+    version = dataset_version(df)
+    with _preload_lock:
+        if version in _preloaded:
+            return 0
+        _preloaded.add(version)
+
+    snapshot = load_snapshot(default_snapshot_path(source))
+    if snapshot is None or snapshot["dataset_version"] != version:
+        return 0
+    # Room for every view on top of the usual entries, so the preload does not evict its own views
+    cache.reserve(len(snapshot["views"]))
+    cache.update(snapshot["views"].items())
+    return len(snapshot["views"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute every region/location view of the dashboard into a snapshot file.")
+    parser.add_argument("--data", default="data/CafeData.csv", help="data source the dashboard loads: a file, directory or glob")
+    parser.add_argument("--output", help="snapshot file, defaults to the one the dashboard looks for")
+    parser.add_argument("--all-charts", action="store_true", help="every chart resolution and metric, not just daily revenue")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    df = load_data_source(args.data)
+    loaded = time.perf_counter()
+    snapshot = build_snapshot(df, args.all_charts, args.max_points)
+    built = time.perf_counter()
+
+    output = Path(args.output) if args.output else default_snapshot_path(args.data)
+    write_snapshot(snapshot, output)
+    print(
+        f"{len(snapshot['views'])} views for {len(selections(df))} selections "
+        f"({len(REGIONS)} regions) in {built - loaded:.2f}s (load {loaded - started:.2f}s), "
+        f"{output.stat().st_size / 1024:.0f} KiB written to {output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.analysis_payload import (
+    CHARS_PER_TOKEN,
+    DEFAULT_TOKEN_BUDGET,
+    build_analysis_payload,
+    estimate_tokens,
+    hourly_section,
+    overview_section,
+)
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+
+# Token limit of the final summary
+MAX_TOKENS = 3000
+
+# Token limit of each partial (map) summary
+MAP_MAX_TOKENS = 500
+
+# Above this many tokens of comments a single digest leaves out too much,
+# so the data is summarised in chunks instead
+MAP_REDUCE_THRESHOLD = 100_000
+
+MAP_PROMPT = (
+    "You are summarising one slice of a cafe chain's customer feedback: {label}. "
+    "In under 200 words, state the average rating, the most common positive themes, "
+    "the most common points for improvement and any location-specific issues. "
+    "Only use the data provided."
+)
+
+
+def needs_map_reduce(df, threshold=MAP_REDUCE_THRESHOLD):
+    """True when the comments alone come to more than threshold tokens."""
+    comment_chars = df['Comment'].fillna('').str.len().sum()
+    return bool(comment_chars // CHARS_PER_TOKEN > threshold)
+
+
+def split_feedback(df, by="Region"):
+    """
+    Split the dataset into labelled chunks for the map stage.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        by (str): "Region", or a pandas period alias such as "M" (month) or
+            "W" (week) to split by time window.
+
+    Returns:
+        list: (label, DataFrame) pairs, empty chunks left out.
+    """
+    if by == "Region":
+        keys = df['Region'].astype(object).fillna("Other regions")
+        label = "region {}"
+    else:
+        keys = df['TransactionDateTime'].dt.to_period(by).astype(str).replace("NaT", "unknown date")
+        label = "period {}"
+    return [(label.format(key), chunk) for key, chunk in df.groupby(keys, sort=True) if len(chunk)]
+
+
+# Error classes of the openai package worth retrying, matched by name so openai is not imported here
+RETRYABLE_ERRORS = frozenset({"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"})
+
+
+def is_retryable(error):
+    """
+    True for errors a retry may get past: rate limits, timeouts, connection
+    and server errors. Authentication failures, bad requests (such as a
+    prompt over the context length) and an exhausted quota fail straight away.
+    """
+    if getattr(error, "code", None) == "insufficient_quota":
+        return False
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in (408, 409, 429) or status >= 500)
+
+
+def call_with_retry(fn, max_retries=3, backoff=1.0, retryable=is_retryable):
+    """
+    Call fn(), retrying failures for which retryable(error) is true with
+    exponential backoff and jitter. Other errors, and the last error once
+    max_retries retries have failed, are raised.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not retryable(e):
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+def complete(client, model, system_prompt, user_prompt, max_tokens, on_text=None):
+    """
+    One chat completion. With on_text the response is streamed and on_text is
+    called with the full text so far after every token, so a retry simply
+    starts the text over.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    if on_text is None:
+        response = client.chat.completions.create(model=model, messages=messages, max_tokens=max_tokens)
+        return response.choices[0].message.content
+
+    parts = []
+    on_text("")
+    stream = client.chat.completions.create(model=model, messages=messages, max_tokens=max_tokens, stream=True)
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            on_text("".join(parts))
+    return "".join(parts)
+
+
+def summarize_map_reduce(
+    df,
+    client,
+    system_prompt,
+    model=DEFAULT_MODEL,
+    by="Region",
+    token_budget=DEFAULT_TOKEN_BUDGET,
+    max_workers=4,
+    max_retries=3,
+    backoff=1.0,
+    on_text=None,
+):
+    """
+    Summarise a dataset too large for one request: summarise chunks
+    concurrently (map), then merge the partial summaries in one final call (reduce).
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        client: An OpenAI client, or any object with the same
+            chat.completions.create interface (e.g. a local stub).
+        system_prompt (str): Instructions for the final summary.
+        model (str): Model used for every call.
+        by (str): How to split the data, see split_feedback.
+        token_budget (int): Approximate payload size of each map request.
+        max_workers (int): Maximum number of requests in flight at once.
+        max_retries (int): Retries per request before giving up.
+        backoff (float): Initial retry delay in seconds, doubled on every retry.
+        on_text: Optional callback to stream the final summary, see complete.
+
+    Returns:
+        tuple: The summary text and a dict of wall-clock timings in seconds
+        per stage ("split", "map", "reduce", "total") plus the chunk count.
+    """
+    started = time.perf_counter()
+    chunks = split_feedback(df, by)
+    split_done = time.perf_counter()
+
+    def summarize_chunk(item):
+        label, chunk = item
+        payload = build_analysis_payload(chunk, token_budget)
+        return label, call_with_retry(
+            lambda: complete(client, model, MAP_PROMPT.format(label=label), payload, MAP_MAX_TOKENS),
+            max_retries,
+            backoff,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(summarize_chunk, item) for item in chunks]
+        try:
+            partials = [future.result() for future in futures]
+        except Exception:
+            # The summary has failed: chunks not sent yet are not sent at all
+            for future in futures:
+                future.cancel()
+            raise
+    map_done = time.perf_counter()
+
+    # Overall figures come from the full dataset, themes from the partial summaries
+    reduce_prompt = "\n\n".join(
+        ["Summaries of the customer data, one per slice, followed by overall figures."]
+        + [f"### {label}\n{summary}" for label, summary in partials]
+        + [overview_section(df), hourly_section(df)]
+    )
+    summary = call_with_retry(
+        lambda: complete(client, model, system_prompt, reduce_prompt, MAX_TOKENS, on_text),
+        max_retries,
+        backoff,
+    )
+    finished = time.perf_counter()
+
+    timings = {
+        "chunks": len(chunks),
+        "split": split_done - started,
+        "map": map_done - split_done,
+        "reduce": finished - map_done,
+        "total": finished - started,
+        "reduce_prompt_tokens": estimate_tokens(reduce_prompt),
+    }
+    return summary, timings
@@ -0,0 +1,200 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.data_cache import dataset_version
+from utils.instrumentation import span
+from utils.view_cache import VIEW_CACHE
+
+# Words left out of the index and of queries
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did do does
+for from had has have he her here him his how i if in into is it its just me more my
+no not of on or our out she so some than that the their them then there these they
+this to too up us was we were what when which who will with would you your
+""".split())
+
+# Letters and digits of any script; apostrophes are dropped first so "didn't" is one word
+_WORD = re.compile(r"[^\W_]+")
+
+# Separates comments when they are tokenized together
+_BREAK = "\0"
+_WORD_OR_BREAK = re.compile(r"[^\W_]+|\0")
+
+# BM25 parameters (term frequency saturation and length normalisation)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Appended segments kept before the index is rebuilt as a single one
+MAX_SEGMENTS = 8
+
+
+def tokenize(text):
+    """The indexed words of a comment: lowercase, punctuation and stopwords removed."""
+    if not isinstance(text, str):
+        return []
+    words = _WORD.findall(text.lower().replace("'", "").replace("’", ""))
+    return [word for word in words if word not in STOPWORDS]
+
+
+def query_terms(query):
+    """The distinct indexed words of a search query, in query order."""
+    return tuple(dict.fromkeys(tokenize(query)))
+
+
+def _expand(starts, counts):
+    """The positions starts[i]..starts[i] + counts[i] of every range, concatenated."""
+    ends = np.cumsum(counts)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - counts - starts, counts)
+
+
+class _Segment:
+    """
+    Postings for a contiguous block of rows, starting at row offset.
+
+    Feedback repeats a lot ("Great coffee"), so comments are deduplicated
+    first: each distinct comment is tokenized once and the postings list the
+    distinct comments holding a term, with its frequency. The rows of a
+    comment are a contiguous slice of the rows grouped by comment, as in
+    LocationIndex.
+    """
+
+    def __init__(self, comments, offset):
+        codes, uniques = pd.factorize(comments)
+        self.offset = offset
+        self.n_rows = len(codes)
+
+        # Rows sorted by comment; bounds[c]:bounds[c + 1] are the rows of comment c (missing ones come first)
+        position_type = np.int32 if len(codes) < 2**31 else np.int64
+        self._order = np.argsort(codes, kind="stable").astype(position_type, copy=False)
+        self._bounds = np.searchsorted(codes[self._order], np.arange(len(uniques) + 1))
+        comment_rows = np.diff(self._bounds)
+
+        # Every distinct comment is tokenized in one pass over their joined text,
+        # with a break token between comments; the rules are those of tokenize
+        text = _BREAK.join(uniques.tolist()).lower().replace("'", "").replace("’", "")
+        word_codes, vocabulary = pd.factorize(np.array(_WORD_OR_BREAK.findall(text), dtype=object))
+        vocabulary = np.asarray(vocabulary, dtype=object).tolist()
+        is_break = np.fromiter((word == _BREAK for word in vocabulary), dtype=bool, count=len(vocabulary))
+        stopword = np.fromiter((word in STOPWORDS for word in vocabulary), dtype=bool, count=len(vocabulary))
+        word_comments = np.cumsum(is_break[word_codes])
+        indexed = ~(is_break | stopword)[word_codes]
+        term_codes, kept = pd.factorize(word_codes[indexed])
+        token_comments = word_comments[indexed]
+
+        n_comments = max(len(uniques), 1)
+        self.lengths = np.bincount(token_comments, minlength=len(uniques)).astype(np.int32)
+        self._term_ids = {term: term_id for term_id, term in enumerate(np.asarray(vocabulary, dtype=object)[kept].tolist())}
+
+        # Postings grouped by term, comments ascending within a term: the sorted
+        # distinct (term, comment) pairs, counted for the term frequencies
+        pairs, tf = np.unique(term_codes * n_comments + token_comments, return_counts=True)
+        self._comments = (pairs % n_comments).astype(np.int32)
+        self._tf = tf.astype(np.int32)
+        self._starts = np.searchsorted(pairs // n_comments, np.arange(len(kept) + 1))
+
+        # Rows with each term, rows with at least one word and their total length, for BM25
+        if len(self._comments):
+            self.doc_freq = np.add.reduceat(comment_rows[self._comments], self._starts[:-1])
+        else:
+            self.doc_freq = np.zeros(0, dtype=np.int64)
+        self.n_docs = int(comment_rows[self.lengths > 0].sum())
+        self.total_length = int((self.lengths.astype(np.int64) * comment_rows).sum())
+
+    def term_doc_freq(self, term):
+        term_id = self._term_ids.get(term)
+        return 0 if term_id is None else int(self.doc_freq[term_id])
+
+    def postings(self, term):
+        """(distinct comments, term frequencies) of a term, comments ascending."""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return self._comments[:0], self._tf[:0]
+        a, b = self._starts[term_id], self._starts[term_id + 1]
+        return self._comments[a:b], self._tf[a:b]
+
+    def search(self, terms, idf, avg_length):
+        """Row positions (in the whole dataset) whose comment holds every term, and their BM25 scores."""
+        postings = sorted((self.postings(term) + (weight,) for term, weight in zip(terms, idf)), key=lambda p: len(p[0]))
+        # Candidates are the comments of the rarest term, narrowed down by the others
+        comments = postings[0][0]
+        scores = np.zeros(len(comments))
+        for term_comments, tf, weight in postings:
+            at = np.searchsorted(term_comments, comments).clip(max=max(len(term_comments) - 1, 0))
+            found = term_comments[at] == comments if len(term_comments) else np.zeros(len(comments), dtype=bool)
+            comments, scores, at = comments[found], scores[found], at[found]
+            tf = tf[at]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[comments] / avg_length)
+            scores += weight * tf * (BM25_K1 + 1) / (tf + norm)
+
+        starts = self._bounds[comments]
+        counts = self._bounds[comments + 1] - starts
+        rows = self._order[_expand(starts, counts)] + self.offset
+        return rows, np.repeat(scores, counts)
+
+
+class TextIndex:
+    """
+    Inverted full-text index over the Comment column, for keyword search.
+
+    Made of segments covering consecutive blocks of rows: with_rows indexes
+    only appended rows, as a new segment, and queries combine the segments
+    with corpus-wide statistics, so results do not depend on how the rows were
+    split. Indexes are shared between sessions and never modified: with_rows
+    returns a new one.
+    """
+
+    def __init__(self, segments):
+        self.segments = tuple(segments)
+        self.rows = sum(segment.n_rows for segment in self.segments)
+        self.n_docs = sum(segment.n_docs for segment in self.segments)
+        self.total_length = sum(segment.total_length for segment in self.segments)
+
+    @classmethod
+    def from_comments(cls, comments):
+        return cls([_Segment(comments, 0)])
+
+    def with_rows(self, comments):
+        """A new index that also includes comments (those of rows appended to the dataset)."""
+        return TextIndex(self.segments + (_Segment(comments, self.rows),))
+
+    def doc_freq(self, term):
+        """Number of rows whose comment holds the term."""
+        return sum(segment.term_doc_freq(term) for segment in self.segments)
+
+    def search(self, terms):
+        """
+        Rows whose comment holds every term, with their BM25 score.
+
+        Returns:
+            tuple: Row positions (ascending within each segment) and float scores.
+        """
+        if not terms or not self.n_docs:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        doc_freq = [self.doc_freq(term) for term in terms]
+        if not all(doc_freq):
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        idf = [np.log(1 + (self.n_docs - df + 0.5) / (df + 0.5)) for df in doc_freq]
+        avg_length = self.total_length / self.n_docs
+
+        results = [segment.search(terms, idf, avg_length) for segment in self.segments]
+        return np.concatenate([rows for rows, _ in results]), np.concatenate([scores for _, scores in results])
+
+
+def get_text_index(df):
+    """
+    The TextIndex of a cleaned dataset, built once per dataset version. When
+    rows were only appended to the CSV, the previous version's index is
+    extended with their comments instead of being rebuilt (until it has
+    MAX_SEGMENTS segments).
+    """
+    def build():
+        base = VIEW_CACHE.get(("text_index", df.attrs.get("base_version")))
+        if base is not None and base.rows == df.attrs.get("base_rows") and len(base.segments) < MAX_SEGMENTS:
+            with span("text_index.extend", rows=len(df) - base.rows):
+                return base.with_rows(df['Comment'].iloc[base.rows:])
+        with span("text_index.build", rows=len(df)):
+            return TextIndex.from_comments(df['Comment'])
+
+    return VIEW_CACHE.get_or_compute(("text_index", dataset_version(df)), build)
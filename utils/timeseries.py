@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+# Resolution name -> resample rule; weeks start on Monday
+RESOLUTIONS = {
+    "hour": "h",
+    "day": "D",
+    "week": "W-MON",
+    "month": "MS",
+}
+
+FIELDS = ["Revenue", "Transactions", "Rows"]
+
+# Moving sums kept per location, by window length in days
+ROLLING_WINDOWS = (7, 28)
+
+# Column for transactions without a location, only ever counted in "all locations"
+UNKNOWN_LOCATION = "(unknown)"
+
+METRICS = ["revenue", "rolling_7", "rolling_28", "wow"]
+
+
+def _aggregate_hours(df):
+    """
+    Revenue, Transactions (non-missing values) and Rows per hour and location,
+    as a wide frame: an hourly DatetimeIndex (hours with sales only) and
+    (field, location) columns. Transactions without a date are left out.
+    """
+    dated = df['TransactionDateTime'].notna().to_numpy()
+    hours = df['TransactionDateTime'].to_numpy()[dated].astype('datetime64[h]')
+    # Group on integer codes (fast) and name the columns afterwards
+    codes = df['Location'].cat.codes.to_numpy()[dated]
+    names = np.append(df['Location'].cat.categories.to_numpy(dtype=object), UNKNOWN_LOCATION)
+
+    values = pd.Series(df['TransactionValue'].to_numpy()[dated])
+    grouped = values.groupby([hours, codes], sort=True).agg(['sum', 'count', 'size'])
+    grouped.columns = FIELDS
+    wide = grouped.unstack(fill_value=0)
+    wide.index = pd.DatetimeIndex(wide.index, name='Date').as_unit('s')
+    wide.columns = wide.columns.set_levels(names[wide.columns.levels[1]], level=1)
+    return wide.astype(np.float64)
+
+
+def bucket_start(timestamp, resolution):
+    """Start of the resolution bucket that contains timestamp."""
+    if resolution == "hour":
+        return timestamp.floor('h')
+    day = timestamp.normalize()
+    if resolution == "day":
+        return day
+    if resolution == "week":
+        return day - pd.Timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _between(frame, start, end):
+    """Rows from the start day up to and including the whole end day."""
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    if end is not None:
+        frame = frame[frame.index < pd.Timestamp(end).normalize() + pd.Timedelta(days=1)]
+    return frame
+
+
+def _resample(hourly, resolution):
+    if resolution == "hour":
+        return hourly
+    return hourly.resample(RESOLUTIONS[resolution], label='left', closed='left').sum()
+
+
+class RevenueEngine:
+    """
+    Revenue aggregates per location at several resolutions (see RESOLUTIONS),
+    plus 7 and 28-day moving sums per location. Hours are stored only when
+    they have sales, coarser resolutions are continuous.
+
+    Built once from the transactions, then extended with appended rows by
+    with_rows, which only aggregates the new rows and recomputes the buckets
+    they touch. Every query is answered from the aggregates, so switching
+    resolution, date range or location costs O(buckets), not a scan of the
+    transactions. Engines are shared between sessions and never modified:
+    with_rows returns a new one.
+    """
+
+    def __init__(self, levels, rolling, rows):
+        self.levels = levels
+        self.rolling = rolling
+        self.rows = rows
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build the engine from a cleaned dataset with a categorical Location column."""
+        hourly = _aggregate_hours(df)
+        levels = {resolution: _resample(hourly, resolution) for resolution in RESOLUTIONS}
+        rolling = {
+            window: levels["day"]["Revenue"].rolling(window, min_periods=1).sum()
+            for window in ROLLING_WINDOWS
+        }
+        return cls(levels, rolling, len(df))
+
+    def with_rows(self, new_rows):
+        """
+        A new engine that also includes new_rows (transactions appended to the
+        dataset this engine was built from).
+        """
+        added = _aggregate_hours(new_rows)
+        if added.empty:
+            return RevenueEngine(self.levels, self.rolling, self.rows + len(new_rows))
+
+        hourly = self.levels["hour"].add(added, fill_value=0).fillna(0)
+        first = added.index.min()
+
+        levels = {"hour": hourly}
+        for resolution in RESOLUTIONS:
+            if resolution == "hour":
+                continue
+            # Buckets before the earliest new transaction are unchanged
+            start = bucket_start(first, resolution)
+            old = self.levels[resolution].reindex(columns=hourly.columns, fill_value=0)
+            level = pd.concat([old[old.index < start], _resample(hourly[hourly.index >= start], resolution)])
+            # Buckets without sales between the old and the new rows are kept as 0, as in a full build
+            buckets = pd.date_range(level.index.min(), level.index.max(), freq=RESOLUTIONS[resolution], name='Date',
+                                    unit=level.index.unit)
+            levels[resolution] = level.reindex(buckets, fill_value=0.0)
+
+        daily = levels["day"]["Revenue"]
+        rolling = {}
+        for window, sums in self.rolling.items():
+            # Days from the earliest new transaction, and any days between the
+            # old last day and the new rows, change
+            day_start = bucket_start(first, "day")
+            if not sums.empty:
+                day_start = min(day_start, sums.index.max() + pd.Timedelta(days=1))
+            # A moving sum only changes within window days of a changed day
+            history = daily[daily.index >= day_start - pd.Timedelta(days=window - 1)]
+            recomputed = history.rolling(window, min_periods=1).sum()
+            # The first rows of the slice are missing their earlier days, keep the old values there
+            old = sums.reindex(columns=daily.columns, fill_value=0)
+            rolling[window] = pd.concat([old[old.index < day_start], recomputed[recomputed.index >= day_start]])
+        return RevenueEngine(levels, rolling, self.rows + len(new_rows))
+
+    @property
+    def locations(self):
+        return list(self.levels["hour"]["Revenue"].columns)
+
+    def date_range(self):
+        """First and last day with a dated transaction, or None when there are none."""
+        days = self.levels["day"].index
+        if days.empty:
+            return None
+        return days.min(), days.max()
+
+    def _select(self, frame, locations, start, end):
+        if locations is not None:
+            frame = frame.reindex(columns=list(locations), fill_value=0)
+        return _between(frame, start, end).sum(axis=1)
+
+    def series(self, resolution="day", metric="revenue", locations=None, start=None, end=None):
+        """
+        One chart series for the given locations (None for all) between start and end.
+
+        Args:
+            resolution (str): One of RESOLUTIONS, for the "revenue" metric.
+            metric (str): "revenue" per bucket, "rolling_7"/"rolling_28" for
+                daily moving sums, or "wow" for the week-over-week change of
+                the 7-day sum in percent (daily, 0 where the week before had no sales).
+            locations: Location names, or None for every location.
+            start, end: First and last day to include, None for no bound.
+
+        Returns:
+            pd.Series: Values indexed by bucket start, with empty buckets as 0
+            (no gaps, so points are evenly spaced).
+        """
+        if metric == "revenue":
+            if start is not None:
+                start = bucket_start(pd.Timestamp(start), resolution)
+            revenue = self._select(self.levels[resolution]["Revenue"], locations, start, end)
+            if resolution == "hour" and not revenue.empty:
+                # Only hours with sales are stored, fill the rest of the selected range
+                hours = pd.date_range(revenue.index.min(), revenue.index.max(), freq='h', name='Date')
+                revenue = revenue.reindex(hours, fill_value=0.0)
+            return revenue
+        if metric in ("rolling_7", "rolling_28"):
+            return self._select(self.rolling[int(metric.split("_")[1])], locations, start, end)
+        if metric == "wow":
+            # The sum over locations is taken first, a ratio of sums is not a sum of ratios
+            weekly = self._select(self.rolling[7], locations, None, None)
+            change = (weekly / weekly.shift(7).replace(0, np.nan) - 1) * 100
+            return _between(change, start, end).fillna(0)
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+    def kpis(self, locations=None, start=None, end=None):
+        """Total revenue, average transaction value and number of transactions from the start to the end day."""
+        daily = self.levels["day"]
+        total_sales = self._select(daily["Revenue"], locations, start, end).sum()
+        counted = self._select(daily["Transactions"], locations, start, end).sum()
+        return {
+            "total_sales": float(total_sales),
+            "average_sales": float(total_sales / counted) if counted else float('nan'),
+            "total_orders": int(self._select(daily["Rows"], locations, start, end).sum()),
+        }
@@ -0,0 +1,62 @@
+import streamlit as st
+from utils.locations import REGIONS
+from utils.metrics import comment_insights, location_options
+
+def _scoring_caption(stats):
+    """One line on how the scores were produced: from the cache or scored on this load."""
+    caption = f"{stats['cached']:,} comments scored on earlier loads"
+    if stats["distinct"]:
+        caption += (
+            f" · {stats['scored']:,} new ({stats['distinct']:,} distinct) scored in {stats['seconds']:.2f}s "
+            f"on {stats['workers']} process{'es' if stats['workers'] > 1 else ''}, "
+            f"{stats['per_core']:,.0f} comments/s per core"
+        )
+    return caption
+
+def display_topics_section(df, scores):
+    """
+    Shows what customers write about: the topics of their comments and the
+    sentiment per topic and per location. Comments are scored once, offline
+    (see utils.comment_scores), so a rerun only aggregates the scores.
+    """
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.header("Comment Topics")
+    with col2:
+        region = st.selectbox("Region", ["All"] + REGIONS, key="topics_region")
+    with col3:
+        location = st.selectbox("Location", ["All"] + location_options(df, region), key="topics_location")
+
+    view = comment_insights(df, scores, region, location)
+    if not view["comments"]:
+        st.info("No comments for this selection.")
+        return
+
+    percent = st.column_config.NumberColumn(format="percent")
+    sentiment = st.column_config.ProgressColumn("Sentiment", min_value=-1, max_value=1, format="%.2f")
+
+    col_topics, col_locations = st.columns(2)
+    with col_topics:
+        st.subheader("By Topic")
+        st.dataframe(
+            view["topics"],
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Share": percent,
+                "Positive": percent,
+                "Negative": percent,
+                "Sentiment": sentiment,
+                "Rating": st.column_config.NumberColumn(format="%.2f"),
+            },
+        )
+    with col_locations:
+        st.subheader("By Location")
+        st.dataframe(
+            view["locations"],
+            hide_index=True,
+            width="stretch",
+            column_config={"Positive": percent, "Negative": percent, "Sentiment": sentiment},
+        )
+
+    st.caption(f"{view['comments']:,} comments, average sentiment {view['sentiment']:+.2f} · " + _scoring_caption(scores.stats))
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from utils.column_index import get_column_index
+from utils.data_cache import dataset_version
+from utils.instrumentation import span
+from utils.location_index import get_location_index, selected_locations
+from utils.locations import REGION_LOCATIONS
+from utils.view_cache import QUERY_CACHE
+
+# Query behind the transaction explorer (utils.explorer): filters, sorting and
+# paging over the cleaned transactions, on the location and column indexes.
+# Like the views of utils.metrics it has no Streamlit imports; page counts and
+# sorted selections are cached in QUERY_CACHE unless another cache is passed.
+
+# Rows per page of the transaction explorer
+PAGE_SIZE = 50
+
+# Columns of the transaction explorer, in display order
+EXPLORER_COLUMNS = ['TransactionDateTime', 'Location', 'Region', 'Rating', 'TransactionValue', 'Comment', 'FeedbackID']
+
+# Columns the explorer can sort by
+SORT_COLUMNS = ['TransactionDateTime', 'TransactionValue', 'Rating', 'FeedbackID']
+
+# Filtered selections up to this many rows are kept sorted in the query cache,
+# so paging through them is a slice
+SORTED_SELECTION_ROWS = 200_000
+
+
+def _range_filters(start, end, ratings, values):
+    """(column, lo, hi, hi_inclusive) for every range that is set; dates are whole days."""
+    filters = []
+    if start is not None or end is not None:
+        end = None if end is None else pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        filters.append(('TransactionDateTime', None if start is None else pd.Timestamp(start), end, False))
+    if ratings is not None:
+        filters.append(('Rating', ratings[0], ratings[1], True))
+    if values is not None and (values[0] is not None or values[1] is not None):
+        filters.append(('TransactionValue', values[0], values[1], True))
+    return tuple(filters)
+
+
+def _scan_ordered(sort_index, matches, first, last, ascending, expected):
+    """
+    Rows first..last of the matching rows by walking the sort order in chunks
+    and filtering each one; cheap when a large share of the rows match.
+    """
+    n = len(sort_index)
+    chunk = max(4096, last * n // max(expected, 1) * 2)
+    hits, found = [], 0
+    for start in range(0, n, chunk):
+        positions = sort_index.ordered(start, start + chunk, ascending)
+        positions = positions[matches(positions)]
+        hits.append(positions)
+        found += len(positions)
+        if found >= last:
+            break
+    return np.concatenate(hits)[first:last] if hits else np.empty(0, dtype=np.intp)
+
+
+def take(series, positions):
+    """
+    series.iloc[positions] for a handful of rows. pyarrow concatenates every
+    chunk of a column before taking from it, as slow as copying the column,
+    so Arrow-backed columns are taken from their chunks one by one.
+    """
+    if not isinstance(series.array, pd.arrays.ArrowExtensionArray):
+        return series.iloc[positions].array
+    chunks = series.array.__arrow_array__()
+    ends = np.cumsum([len(chunk) for chunk in chunks.chunks])
+    which = np.searchsorted(ends, positions, side="right")
+    values = [None] * len(positions)
+    for chunk in np.unique(which):
+        picked = np.flatnonzero(which == chunk)
+        offset = ends[chunk] - len(chunks.chunk(chunk))
+        for i, value in zip(picked, chunks.chunk(chunk).take(positions[picked] - offset).to_pylist()):
+            values[i] = value
+    return pd.array(values, dtype=series.dtype)
+
+
+def transactions_page(df, region="All", location="All", start=None, end=None, ratings=None, values=None,
+                      sort_by='TransactionDateTime', ascending=False, page=0, page_size=PAGE_SIZE, cache=QUERY_CACHE):
+    """
+    One page of the cleaned transactions matching the filters, sorted by a column.
+
+    Filters and sorting run on indexes (see LocationIndex and ColumnIndex):
+    the smallest of the location and range selections is narrowed down by the
+    other filters, or the sort order is walked directly when most rows match.
+    Only the rows of the page are taken from the frame, so the cost of a page
+    depends on the size of the selection rather than of the dataset.
+
+    Args:
+        start, end: First and last day of the date range, None for open-ended.
+        ratings (tuple): Lowest and highest rating, None for any.
+        values (tuple): Lowest and highest transaction value (either may be None), None for any.
+        sort_by (str): One of SORT_COLUMNS; missing values sort last.
+        page (int): Zero-based page number.
+
+    Returns:
+        dict: "rows" (DataFrame of the page), "total" (matching rows), "page" and "pages".
+    """
+    version = dataset_version(df)
+    locations = selected_locations(REGION_LOCATIONS, region, location)
+    filters = _range_filters(start, end, ratings, values)
+    sort_index = get_column_index(df, sort_by)
+    selection = (version, region, location, filters)
+
+    # Candidate rows of each filter; the smallest set drives the query
+    candidates = []
+    if locations is not None:
+        candidates.append(("Location", get_location_index(df).rows(locations)))
+    for column, lo, hi, hi_inclusive in filters:
+        a, b = get_column_index(df, column).bounds(lo, hi, hi_inclusive)
+        candidates.append((column, get_column_index(df, column).order[a:b]))
+
+    def matches(positions, skip=None):
+        mask = np.ones(len(positions), dtype=bool)
+        if locations is not None and skip != "Location":
+            mask &= get_location_index(df).contains(positions, locations)
+        for column, lo, hi, hi_inclusive in filters:
+            if column != skip:
+                mask &= get_column_index(df, column).in_range(positions, lo, hi, hi_inclusive)
+        return mask
+
+    with span("transactions.page") as s:
+        if candidates:
+            driver, driver_rows = min(candidates, key=lambda candidate: len(candidate[1]))
+            total = cache.get_or_compute(
+                ("transactions_count",) + selection,
+                lambda: int(matches(driver_rows, skip=driver).sum()),
+            )
+        else:
+            total = len(df)
+
+        pages = max(-(-total // page_size), 1)
+        page = min(max(page, 0), pages - 1)
+        first, last = page * page_size, min((page + 1) * page_size, total)
+
+        if not candidates:
+            positions = sort_index.ordered(first, last, ascending)
+        elif len(driver_rows) * 4 >= len(df):
+            positions = _scan_ordered(sort_index, matches, first, last, ascending, total)
+        else:
+            def sorted_selection():
+                rows = driver_rows[matches(driver_rows, skip=driver)]
+                return sort_index.sort_positions(rows, ascending)
+
+            if total <= SORTED_SELECTION_ROWS:
+                ordered = cache.get_or_compute(("transactions_sorted",) + selection + (sort_by, ascending), sorted_selection)
+            else:
+                ordered = sorted_selection()
+            positions = ordered[first:last]
+        s["rows"] = total
+
+    return {
+        "rows": pd.DataFrame({column: take(df[column], positions) for column in EXPLORER_COLUMNS}),
+        "total": total,
+        "page": page,
+        "pages": pages,
+    }
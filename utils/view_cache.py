@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ViewCache:
+    """
+    Size-bounded LRU cache for computed view models (chart options, metric values).
+
+    One instance is shared by every session in the process, so a view that any
+    user has already looked at is served without redoing the pandas work.
+    Sessions missing the same key together wait for a single computation.
+    Cached values are shared between sessions and must not be mutated.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._base_maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Futures of the values being computed, by key
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key without computing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return default
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, calling compute() to fill it on a miss.
+        Callers asking for a key while it is being computed wait for that
+        computation (and get its exception if it fails) instead of repeating it.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        # Compute outside the lock so slow views do not block other sessions
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        pending.set_result(value)
+        return value
+
+    def items(self, prefixes=None):
+        """
+        Snapshot of the cached (key, value) pairs, optionally only those whose
+        key starts with one of prefixes.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+        if prefixes is None:
+            return entries
+        return [(key, value) for key, value in entries if key[0] in prefixes]
+
+    def update(self, entries):
+        """Insert precomputed (key, value) pairs, e.g. from a snapshot, evicting as usual."""
+        with self._lock:
+            for key, value in entries:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def reserve(self, n):
+        """Make room for n entries on top of the size the cache was created with, e.g. the views of a snapshot."""
+        with self._lock:
+            self.maxsize = max(self.maxsize, self._base_maxsize + n)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by the revenue and feedback sections across all sessions; large enough
+# for every region/location view of a snapshot (see utils.snapshot)
+VIEW_CACHE = ViewCache(maxsize=1024)
+
+# Results of the explorer and search queries, whose keys come from free-form
+# inputs and whose values can hold a sorted selection of up to
+# transactions.SORTED_SELECTION_ROWS positions: kept apart and small, so they
+# never evict the engine and indexes in VIEW_CACHE
+QUERY_CACHE = ViewCache(maxsize=32)